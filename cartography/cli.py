@@ -116,6 +116,41 @@ class CLI:
                 "See https://neo4j.com/docs/api/python-driver/4.4/api.html#database."
             ),
         )
+        parser.add_argument(
+            "--neo4j-background-writes",
+            action="store_true",
+            help=(
+                "Write loaded data to Neo4j from a background thread, so that intel modules can fetch the next batch "
+                "of data from their APIs while the previous one is being written. Writes are applied in order, and "
+                "any other use of the Neo4j session (e.g. cleanup jobs) first waits for pending writes to finish."
+            ),
+        )
+        parser.add_argument(
+            "--batched-cleanup",
+            action="store_true",
+            help=(
+                "Run the cleanup jobs of schema-based intel modules by first collecting the ids of all stale nodes and "
+                "relationships and then deleting them in batches, instead of repeating each cleanup query until "
+                "nothing is left to delete. Recommended for large accounts with many stale elements."
+            ),
+        )
+        parser.add_argument(
+            "--concurrent-cleanup",
+            action="store_true",
+            help=(
+                "Run the queries of schema-based cleanup jobs that delete stale relationships concurrently, each on "
+                "its own Neo4j session. These queries touch the same sub resource node, so Neo4j may have to retry "
+                "some of them after lock conflicts."
+            ),
+        )
+        parser.add_argument(
+            "--precompile-queries",
+            action="store_true",
+            help=(
+                "Build the Neo4j queries of every cartography schema before the sync starts. Queries are cached per "
+                "schema either way; this moves the work from the first use of each schema to startup."
+            ),
+        )
         parser.add_argument(
             "--selected-modules",
             type=str,
@@ -142,6 +177,17 @@ class CLI:
                 "removed from the graph. By default, cartography will use a UNIX timestamp as the update tag."
             ),
         )
+        parser.add_argument(
+            "--stage-workers",
+            type=int,
+            default=None,
+            help=(
+                "Number of top-level sync modules to run concurrently, each one on its own Neo4j session. A module "
+                "only starts once the modules it depends on have finished: `create-indexes` always runs first and "
+                "`analysis` always runs last. If not specified, modules run one at a time in the order given by "
+                "`--selected-modules`."
+            ),
+        )
         parser.add_argument(
             "--aws-sync-all-profiles",
             action="store_true",
@@ -182,6 +228,15 @@ class CLI:
                 "syncing other accounts and delay raising an exception until the very end."
             ),
         )
+        parser.add_argument(
+            "--aws-account-workers",
+            type=int,
+            default=None,
+            help=(
+                "Number of AWS accounts to sync concurrently when syncing multiple accounts. Each account is synced on "
+                "its own Neo4j session. If not specified, accounts are synced one at a time."
+            ),
+        )
         parser.add_argument(
             "--aws-cloudtrail-management-events-lookback-hours",
             type=int,
@@ -190,6 +245,46 @@ class CLI:
                 "Number of hours back to retrieve CloudTrail management events from. If not specified, CloudTrail management events will not be retrieved."
             ),
         )
+        parser.add_argument(
+            "--aws-cloudtrail-management-events-incremental",
+            action="store_true",
+            help=(
+                "Only read the CloudTrail management events after the ones read by the previous sync, and add them to "
+                "the role assumption relationships in the graph. The times_used and first_seen_in_time_window of the "
+                "relationships then count from the first sync in which they were seen, rather than from the start of "
+                "the lookback period. Requires --aws-cloudtrail-management-events-lookback-hours."
+            ),
+        )
+        parser.add_argument(
+            "--aws-s3-details-max-age-hours",
+            type=int,
+            default=None,
+            help=(
+                "Number of hours to reuse the fetched ACL, policy, encryption, versioning, public access block, "
+                "ownership and logging configuration of an S3 bucket for. Buckets whose details are older, or whose "
+                "details were never fetched, are fetched again. If not specified, the details of every bucket are "
+                "fetched on every sync."
+            ),
+        )
+        parser.add_argument(
+            "--aws-inspector-workers",
+            type=int,
+            default=None,
+            help=(
+                "Number of (member account, region) pairs to fetch AWS Inspector findings for concurrently. Fetched "
+                "findings are loaded while the next ones are fetched. Worthwhile for delegated administrator accounts "
+                "with many member accounts. If not specified, findings are fetched and loaded one pair at a time."
+            ),
+        )
+        parser.add_argument(
+            "--gcp-project-workers",
+            type=int,
+            default=None,
+            help=(
+                "Number of GCP projects to sync concurrently. Each worker syncs one project at a time on its own Neo4j "
+                "session. If not specified, projects are synced one at a time."
+            ),
+        )
         parser.add_argument(
             "--oci-sync-all-profiles",
             action="store_true",
@@ -323,6 +418,15 @@ class CLI:
                 "Required if you are using the GitHub intel module. Ignored otherwise."
             ),
         )
+        parser.add_argument(
+            "--github-http-retries",
+            type=int,
+            default=None,
+            help=(
+                "Number of times a GitHub API query that fails with a timeout or an HTTP error is tried, with "
+                "exponential backoff. If not specified, queries are tried 5 times."
+            ),
+        )
         parser.add_argument(
             "--digitalocean-token-env-var",
             type=str,
@@ -341,6 +445,16 @@ class CLI:
                 "If omitted the default permission relationships will be created"
             ),
         )
+        parser.add_argument(
+            "--permission-relationships-workers",
+            type=int,
+            default=None,
+            help=(
+                "Number of processes to evaluate the resource permission relationships of an AWS account with. "
+                "Worthwhile for accounts with many principals and resources. If not specified, they are evaluated in "
+                "the sync process."
+            ),
+        )
         parser.add_argument(
             "--jamf-base-uri",
             type=str,
@@ -413,6 +527,27 @@ class CLI:
             default=None,
             help=("If set, uses the provided NIST NVD API v2.0 key."),
         )
+        parser.add_argument(
+            "--telemetry-report-file",
+            type=str,
+            default=None,
+            help=(
+                "Write performance metrics of the sync to this file when it ends: wall time per stage and per "
+                "function and region, rows loaded, Neo4j transaction latencies and API call counts. Uses the "
+                "Prometheus text format (e.g. for the node_exporter textfile collector) if the file name ends with "
+                "'.prom', and JSON otherwise. Unlike the statsd options, this needs no external service. If not "
+                "specified, no metrics are recorded."
+            ),
+        )
+        parser.add_argument(
+            "--telemetry-account-labels",
+            action="store_true",
+            help=(
+                "Also label the function durations of the --telemetry-report-file report with the AWS account or GCP "
+                "project they ran for. This keeps a metric per function, region and account in memory for the whole "
+                "sync, which can be a lot for large organizations."
+            ),
+        )
         parser.add_argument(
             "--statsd-enabled",
             action="store_true",
@@ -809,11 +944,57 @@ class CLI:
         if config.selected_modules:
             self.sync = cartography.sync.build_sync(config.selected_modules)
 
+        if config.stage_workers is not None and config.stage_workers < 1:
+            raise ValueError(
+                f"--stage-workers must be a positive integer; got {config.stage_workers}.",
+            )
+
+        if (
+            config.aws_s3_details_max_age_hours is not None
+            and config.aws_s3_details_max_age_hours < 0
+        ):
+            raise ValueError(
+                "--aws-s3-details-max-age-hours must not be negative; "
+                f"got {config.aws_s3_details_max_age_hours}.",
+            )
+
+        if (
+            config.aws_inspector_workers is not None
+            and config.aws_inspector_workers < 1
+        ):
+            raise ValueError(
+                f"--aws-inspector-workers must be a positive integer; got {config.aws_inspector_workers}.",
+            )
+
+        if config.gcp_project_workers is not None and config.gcp_project_workers < 1:
+            raise ValueError(
+                f"--gcp-project-workers must be a positive integer; got {config.gcp_project_workers}.",
+            )
+
+        if config.github_http_retries is not None and config.github_http_retries < 1:
+            raise ValueError(
+                f"--github-http-retries must be a positive integer; got {config.github_http_retries}.",
+            )
+
+        if (
+            config.permission_relationships_workers is not None
+            and config.permission_relationships_workers < 1
+        ):
+            raise ValueError(
+                "--permission-relationships-workers must be a positive integer; "
+                f"got {config.permission_relationships_workers}.",
+            )
+
         # AWS config
         if config.aws_requested_syncs:
             # No need to store the returned value; we're using this for input validation.
             parse_and_validate_aws_requested_syncs(config.aws_requested_syncs)
 
+        if config.aws_account_workers is not None and config.aws_account_workers < 1:
+            raise ValueError(
+                f"--aws-account-workers must be a positive integer; got {config.aws_account_workers}.",
+            )
+
         # AWS regions
         if config.aws_regions:
             # No need to store the returned value; we're using this for input validation.
@@ -0,0 +1,191 @@
+import json
+import logging
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import neo4j
+
+from cartography.telemetry import get_telemetry_recorder
+
+logger = logging.getLogger(__name__)
+
+# Batch size used for a query until we have measured how long its writes take. This was the fixed batch size used by
+# `load_graph_data()` before batch sizes became adaptive.
+DEFAULT_INITIAL_BATCH_SIZE = 10000
+MIN_BATCH_SIZE = 1
+# Batches never get larger than the old fixed size: larger transactions hold more locks and heap for longer, for little
+# gain. Growing only recovers the size after slow or failed batches have shrunk it.
+MAX_BATCH_SIZE = DEFAULT_INITIAL_BATCH_SIZE
+
+# A batch whose write takes longer than this shrinks the next batch; one that takes less than half of it grows the next
+# batch.
+TARGET_BATCH_SECONDS = 5.0
+
+# Upper bound on the estimated serialized size of one batch. Neo4j keeps the whole parameter list of a transaction in
+# its heap, so large items (e.g. CVEs with long descriptions) get smaller batches than small ones (e.g. tags).
+MAX_BATCH_BYTES = 16 * 1024 * 1024
+
+# Number of items that are serialized to estimate the average size of an item.
+ITEM_SIZE_SAMPLE_COUNT = 20
+
+# Errors after which the same data is retried in smaller batches. The neo4j driver already retries transient errors
+# with the same batch; these are the ones that remain after that, or that a smaller transaction is likely to avoid.
+_BATCH_SIZE_ERROR_CODES = (
+    "Neo.TransientError.General.MemoryPoolOutOfMemoryError",
+    "Neo.TransientError.General.TransactionMemoryLimit",
+    "Neo.TransientError.General.OutOfMemoryError",
+    "Neo.ClientError.Transaction.TransactionTimedOut",
+    "Neo.ClientError.Transaction.TransactionTimedOutClientConfiguration",
+    "Neo.TransientError.Transaction.LockClientStopped",
+)
+
+
+class AdaptiveBatchSizer:
+    """
+    Chooses the number of items to write per transaction for one kind of write, based on how the previous writes went:
+
+    - A full batch that commits in less than half of `target_seconds` doubles the batch size, and one that takes longer
+      than `target_seconds` halves it.
+    - A batch that fails with a memory or timeout error (see `is_batch_size_error()`) halves the batch size.
+    - A batch never holds more than `max_batch_bytes` of estimated serialized data.
+
+    Sizers are shared by all threads that write the same kind of data; see `get_batch_sizer()`.
+    """
+
+    def __init__(
+        self,
+        initial_size: int = DEFAULT_INITIAL_BATCH_SIZE,
+        min_size: int = MIN_BATCH_SIZE,
+        max_size: int = MAX_BATCH_SIZE,
+        target_seconds: float = TARGET_BATCH_SECONDS,
+        max_batch_bytes: int = MAX_BATCH_BYTES,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_batch_bytes = max_batch_bytes
+        self._size = max(min_size, min(initial_size, max_size))
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get_batch_size(self, item_bytes: int) -> int:
+        """
+        Returns the number of items to put in the next batch, given the estimated serialized size of one item.
+        """
+        size = self._size
+        if item_bytes > 0:
+            size = min(size, self.max_batch_bytes // item_bytes)
+        return max(self.min_size, size)
+
+    def record_success(self, batch_size: int, seconds: float) -> None:
+        """
+        Adjusts the batch size after a batch of `batch_size` items was written in `seconds`.
+        """
+        with self._lock:
+            if seconds > self.target_seconds:
+                self._size = max(self.min_size, min(self._size, batch_size) // 2)
+            elif seconds < self.target_seconds / 2 and batch_size >= self._size:
+                # Only full batches grow the size, so the small last batch of a list does not count as a fast write.
+                self._size = min(self.max_size, self._size * 2)
+
+    def record_failure(self, batch_size: int) -> bool:
+        """
+        Halves the batch size after a batch of `batch_size` items failed with a batch size error. Returns False if the
+        batch was already as small as allowed, in which case retrying with a smaller batch is not possible.
+        """
+        if batch_size <= self.min_size:
+            return False
+        with self._lock:
+            self._size = max(self.min_size, min(self._size, batch_size // 2))
+        return True
+
+
+_batch_sizers: Dict[str, AdaptiveBatchSizer] = {}
+_batch_sizers_lock = threading.Lock()
+
+
+def get_batch_sizer(
+    key: str,
+    initial_size: int = DEFAULT_INITIAL_BATCH_SIZE,
+) -> AdaptiveBatchSizer:
+    """
+    Returns the AdaptiveBatchSizer for the given key, creating it on first use. Use one key per kind of write (e.g. the
+    ingestion query of a schema) so that what we learn about one write applies to the next writes of the same kind
+    for the rest of the sync.
+    """
+    with _batch_sizers_lock:
+        sizer = _batch_sizers.get(key)
+        if sizer is None:
+            sizer = AdaptiveBatchSizer(initial_size=initial_size)
+            _batch_sizers[key] = sizer
+        return sizer
+
+
+def estimate_item_bytes(items: List[Any]) -> int:
+    """
+    Returns the average JSON-serialized size of the items, estimated from a sample spread evenly over the list.
+    """
+    if not items:
+        return 0
+    step = max(1, len(items) // ITEM_SIZE_SAMPLE_COUNT)
+    sample = items[::step][:ITEM_SIZE_SAMPLE_COUNT]
+    total = sum(len(json.dumps(item, default=str)) for item in sample)
+    return max(1, total // len(sample))
+
+
+def is_batch_size_error(e: Exception) -> bool:
+    """
+    Returns True if the error is one that a smaller batch is likely to avoid: running out of memory, or the
+    transaction timing out.
+    """
+    if isinstance(e, MemoryError):
+        return True
+    if isinstance(e, neo4j.exceptions.Neo4jError):
+        return e.code in _BATCH_SIZE_ERROR_CODES
+    return False
+
+
+def write_in_batches(
+    items: List[Any],
+    write_batch: Callable[[List[Any]], None],
+    sizer: AdaptiveBatchSizer,
+) -> int:
+    """
+    Calls `write_batch` on consecutive slices of `items`, with slice sizes chosen by `sizer`. If a write fails with a
+    batch size error, the same items are retried in a smaller batch. This requires each `write_batch` call to run in a
+    single transaction, so that a failed batch leaves nothing behind, and to be safe to repeat, as MERGE queries are.
+
+    :param items: The items to write
+    :param write_batch: Writes the given list of items in one transaction
+    :param sizer: The AdaptiveBatchSizer for this kind of write
+    :return: The number of batches written
+    """
+    item_bytes = estimate_item_bytes(items)
+    start = 0
+    batch_count = 0
+    while start < len(items):
+        data_batch = items[start : start + sizer.get_batch_size(item_bytes)]
+        began = time.monotonic()
+        try:
+            write_batch(data_batch)
+        except Exception as e:
+            if not is_batch_size_error(e) or not sizer.record_failure(len(data_batch)):
+                raise
+            logger.warning(
+                f"Writing a batch of {len(data_batch)} items failed with {type(e).__name__}; retrying with batches of "
+                f"{sizer.size} items.",
+            )
+            continue
+        seconds = time.monotonic() - began
+        sizer.record_success(len(data_batch), seconds)
+        get_telemetry_recorder().observe("neo4j_write_transaction_seconds", seconds)
+        start += len(data_batch)
+        batch_count += 1
+    return batch_count
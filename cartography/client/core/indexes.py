@@ -0,0 +1,148 @@
+import logging
+import re
+import threading
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import neo4j
+
+logger = logging.getLogger(__name__)
+
+# (entity type, label or relationship type, properties), as reported by SHOW INDEXES.
+IndexKey = Tuple[str, str, Tuple[str, ...]]
+
+# Matches the index queries built by cartography.graph.querybuilder and the ones in cartography/data/indexes.cypher,
+# e.g. `CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.id);` and
+# `CREATE INDEX IF NOT EXISTS FOR ()-[r:RESOURCE]->() ON (r.lastupdated, r._sub_resource_label, r._sub_resource_id);`
+_NODE_INDEX_RE = re.compile(
+    r"FOR \(\w*:`?(?P<label>[^`)]+)`?\) ON \((?P<props>[^)]*)\)"
+)
+_REL_INDEX_RE = re.compile(
+    r"FOR \(\)<?-\[\w*:`?(?P<label>[^`\]]+)`?\]->?\(\) ON \((?P<props>[^)]*)\)",
+)
+
+# Only range indexes (called btree indexes before Neo4j 5) are created by `CREATE INDEX`, so indexes of other types on
+# the same properties do not count.
+_SHOW_INDEXES_QUERY = """
+SHOW INDEXES YIELD type, entityType, labelsOrTypes, properties
+WHERE type IN ['RANGE', 'BTREE']
+RETURN entityType, labelsOrTypes, properties
+"""
+
+
+def _parse_index_query(query: str) -> Optional[IndexKey]:
+    for entity_type, regex in (
+        ("NODE", _NODE_INDEX_RE),
+        ("RELATIONSHIP", _REL_INDEX_RE),
+    ):
+        match = regex.search(query)
+        if match:
+            props = tuple(
+                prop.strip().split(".", 1)[-1].strip("`")
+                for prop in match.group("props").split(",")
+            )
+            return entity_type, match.group("label"), props
+    return None
+
+
+class IndexRegistry:
+    """
+    Remembers which indexes exist in one Neo4j database, so that `ensure_index_queries()` only sends the
+    `CREATE INDEX IF NOT EXISTS` queries whose index is not known to exist yet. The registry is filled from
+    `SHOW INDEXES` the first time it is used, and then with every index created through it.
+    """
+
+    def __init__(self) -> None:
+        self._known: Set[IndexKey] = set()
+        self._seeded = False
+        self._lock = threading.Lock()
+
+    def seed(self, neo4j_session: neo4j.Session) -> None:
+        """
+        Adds the indexes that already exist in the database, unless that was already done.
+        """
+        with self._lock:
+            if self._seeded:
+                return
+            try:
+                records = neo4j_session.run(_SHOW_INDEXES_QUERY).data()
+            except neo4j.exceptions.Neo4jError:
+                # E.g. the user is not allowed to list indexes. We then just create every index once.
+                logger.debug("Unable to list existing Neo4j indexes.", exc_info=True)
+                records = []
+            for record in records:
+                labels = record["labelsOrTypes"] or []
+                if len(labels) == 1:
+                    self._known.add(
+                        (record["entityType"], labels[0], tuple(record["properties"])),
+                    )
+            self._seeded = True
+
+    def get_missing(self, queries: List[str]) -> List[str]:
+        """
+        Returns the given index queries whose index is not known to exist, without duplicates.
+        """
+        missing: Dict[Any, str] = {}
+        for query in queries:
+            key = _parse_index_query(query)
+            if key is None:
+                # Not a form we understand: always run it, it is idempotent anyway.
+                missing[query] = query
+            elif key not in self._known:
+                missing[key] = query
+        return list(missing.values())
+
+    def add(self, queries: List[str]) -> None:
+        """
+        Records that the indexes of the given queries exist.
+        """
+        with self._lock:
+            for query in queries:
+                key = _parse_index_query(query)
+                if key is not None:
+                    self._known.add(key)
+
+
+# The registry of the database that the current sync writes to. See set_index_registry().
+_index_registry: Optional[IndexRegistry] = None
+
+
+def set_index_registry(registry: Optional[IndexRegistry]) -> None:
+    """
+    Makes `ensure_index_queries()` use the given registry for the rest of the process. `cartography.sync.Sync.run()`
+    sets a new registry for the driver and database of each sync, and removes it when the sync ends. Without a
+    registry, every index query is run.
+    """
+    global _index_registry
+    _index_registry = registry
+
+
+def _create_indexes_tx(tx: neo4j.Transaction, queries: List[str]) -> None:
+    for query in queries:
+        tx.run(query)
+
+
+def ensure_index_queries(neo4j_session: neo4j.Session, queries: List[str]) -> None:
+    """
+    Runs the given `CREATE INDEX IF NOT EXISTS` queries whose index is not already known to exist in the database of the
+    current sync (see `set_index_registry()`), all in one transaction.
+    :param neo4j_session: The Neo4j session
+    :param queries: The index queries
+    """
+    registry = _index_registry
+    if registry is None:
+        # Only drop the duplicates.
+        missing = IndexRegistry().get_missing(queries)
+    else:
+        registry.seed(neo4j_session)
+        missing = registry.get_missing(queries)
+    if not missing:
+        return
+    logger.debug(f"Creating {len(missing)} indexes: {missing}")
+    neo4j_session.write_transaction(_create_indexes_tx, missing)
+    if registry is not None:
+        registry.add(missing)
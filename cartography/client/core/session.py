@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from typing import cast
+from typing import Iterator
+from typing import Optional
+
+import neo4j
+
+from cartography.client.core.writer import BackgroundWriteSession
+
+
+@contextmanager
+def new_neo4j_session(
+    neo4j_driver: neo4j.Driver,
+    neo4j_session: neo4j.Session,
+    database: Optional[str] = None,
+) -> Iterator[neo4j.Session]:
+    """
+    Opens a new session on the given driver, and closes it on exit. Neo4j sessions are not thread-safe, so intel modules
+    that write to the graph from several threads must give each thread its own session.
+    The new session starts from the bookmarks of `neo4j_session`, so it sees everything that session has written so
+    far. If `neo4j_session` writes in the background, so does the new one.
+    :param neo4j_driver: The Neo4j driver of the sync, see `cartography.config.Config.neo4j_driver`
+    :param neo4j_session: The session of the sync stage that the new session works for
+    :param database: The Neo4j database to open the session on. If None, the default database is used.
+    :return: A context manager yielding the new session
+    """
+    # Going through the wrapper first waits for the background writes of the stage, so that they are in the bookmarks.
+    if hasattr(neo4j_session, "last_bookmarks"):
+        bookmarks = neo4j_session.last_bookmarks()
+    else:
+        # neo4j 4.x
+        last_bookmark = neo4j_session.last_bookmark()
+        bookmarks = [last_bookmark] if last_bookmark else None
+    with neo4j_driver.session(database=database, bookmarks=bookmarks) as session:
+        if isinstance(neo4j_session, BackgroundWriteSession):
+            writer = BackgroundWriteSession(session)
+            try:
+                yield cast(neo4j.Session, writer)
+            except BaseException:
+                writer.abandon()
+                raise
+            writer.close()
+        else:
+            yield session
@@ -8,13 +8,17 @@ from typing import Union
 
 import neo4j
 
+from cartography.client.core.batching import get_batch_sizer
+from cartography.client.core.batching import write_in_batches
+from cartography.client.core.indexes import ensure_index_queries
+from cartography.client.core.writer import BackgroundWriteSession
 from cartography.graph.querybuilder import build_create_index_queries
 from cartography.graph.querybuilder import build_create_index_queries_for_matchlink
 from cartography.graph.querybuilder import build_ingestion_query
 from cartography.graph.querybuilder import build_matchlink_query
 from cartography.models.core.nodes import CartographyNodeSchema
 from cartography.models.core.relationships import CartographyRelSchema
-from cartography.util import batch
+from cartography.telemetry import get_telemetry_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -218,23 +222,28 @@ def load_graph_data(
     query: str,
     dict_list: List[Dict[str, Any]],
     **kwargs,
-) -> None:
+) -> int:
     """
     Writes data to the graph.
+    The data is written in batches whose size adapts to how long previous writes of the same query took, how large the
+    dicts are, and whether previous writes ran out of memory or timed out. See cartography.client.core.batching.
     :param neo4j_session: The Neo4j session
     :param query: The Neo4j write query to run. This query is not meant to be handwritten, rather it should be generated
     with cartography.graph.querybuilder.build_ingestion_query().
     :param dict_list: The data to load to the graph represented as a list of dicts.
     :param kwargs: Allows additional keyword args to be supplied to the Neo4j query.
-    :return: None
+    :return: The number of transactions used to write the data.
     """
-    for data_batch in batch(dict_list, size=10000):
-        neo4j_session.write_transaction(
+    return write_in_batches(
+        dict_list,
+        lambda data_batch: neo4j_session.write_transaction(
             write_list_of_dicts_tx,
             query,
             DictList=data_batch,
             **kwargs,
-        )
+        ),
+        get_batch_sizer(query),
+    )
 
 
 def ensure_indexes(
@@ -248,6 +257,7 @@ def ensure_indexes(
 
     This ensures that every time we need to MATCH on a node to draw a relationship to it, the field used for the MATCH
     will be indexed, making the operation fast.
+    Indexes already known to exist in the database are skipped; see cartography.client.core.indexes.
     :param neo4j_session: The neo4j session
     :param node_schema: The node_schema object to create indexes for.
     """
@@ -258,7 +268,7 @@ def ensure_indexes(
             raise ValueError(
                 'Query provided to `ensure_indexes()` does not start with "CREATE INDEX IF NOT EXISTS".',
             )
-        neo4j_session.run(query)
+    ensure_index_queries(neo4j_session, queries)
 
 
 def ensure_indexes_for_matchlinks(
@@ -277,7 +287,7 @@ def ensure_indexes_for_matchlinks(
             raise ValueError(
                 'Query provided to `ensure_indexes_for_matchlinks()` does not start with "CREATE INDEX IF NOT EXISTS".',
             )
-        neo4j_session.run(query)
+    ensure_index_queries(neo4j_session, queries)
 
 
 def load(
@@ -289,6 +299,9 @@ def load(
     """
     Main entrypoint for intel modules to write data to the graph. Ensures that indexes exist for the datatypes loaded
     to the graph and then performs the load operation.
+    If the session is a BackgroundWriteSession, the load is queued and runs on its writer thread instead. The list is
+    copied, but the dicts in it are not: the caller must not modify them after calling load(). The time spent writing
+    is recorded as the `load` duration of the schema in the telemetry report.
     :param neo4j_session: The Neo4j session
     :param node_schema: The CartographyNodeSchema object to create indexes for and generate a query.
     :param dict_list: The data to load to the graph represented as a list of dicts.
@@ -298,9 +311,17 @@ def load(
     if len(dict_list) == 0:
         # If there is no data to load, save some time.
         return
-    ensure_indexes(neo4j_session, node_schema)
-    ingestion_query = build_ingestion_query(node_schema)
-    load_graph_data(neo4j_session, ingestion_query, dict_list, **kwargs)
+    if isinstance(neo4j_session, BackgroundWriteSession):
+        # Queue a copy so that the caller can reuse its list while the load waits for its turn.
+        neo4j_session.submit(load, node_schema, list(dict_list), **kwargs)
+        return
+    with get_telemetry_recorder().timer("load", schema=node_schema.label):
+        ensure_indexes(neo4j_session, node_schema)
+        ingestion_query = build_ingestion_query(node_schema)
+        batch_count = load_graph_data(
+            neo4j_session, ingestion_query, dict_list, **kwargs
+        )
+    _record_load(node_schema.label, len(dict_list), batch_count)
 
 
 def load_matchlinks(
@@ -311,6 +332,9 @@ def load_matchlinks(
 ) -> None:
     """
     Main entrypoint for intel modules to write relationships to the graph between two existing nodes.
+    If the session is a BackgroundWriteSession, the load is queued and runs on its writer thread instead. The list is
+    copied, but the dicts in it are not: the caller must not modify them after calling load_matchlinks(). The time
+    spent writing is recorded as the `load` duration of the relationship in the telemetry report.
     :param neo4j_session: The Neo4j session
     :param rel_schema: The CartographyRelSchema object to generate a query.
     :param dict_list: The data to load to the graph represented as a list of dicts. The dicts must contain the source and
@@ -334,7 +358,22 @@ def load_matchlinks(
             "This is needed for cleanup queries."
         )
 
-    ensure_indexes_for_matchlinks(neo4j_session, rel_schema)
-    matchlink_query = build_matchlink_query(rel_schema)
-    logger.debug(f"Matchlink query: {matchlink_query}")
-    load_graph_data(neo4j_session, matchlink_query, dict_list, **kwargs)
+    if isinstance(neo4j_session, BackgroundWriteSession):
+        # Queue a copy so that the caller can reuse its list while the load waits for its turn.
+        neo4j_session.submit(load_matchlinks, rel_schema, list(dict_list), **kwargs)
+        return
+
+    with get_telemetry_recorder().timer("load", schema=rel_schema.rel_label):
+        ensure_indexes_for_matchlinks(neo4j_session, rel_schema)
+        matchlink_query = build_matchlink_query(rel_schema)
+        logger.debug(f"Matchlink query: {matchlink_query}")
+        batch_count = load_graph_data(
+            neo4j_session, matchlink_query, dict_list, **kwargs
+        )
+    _record_load(rel_schema.rel_label, len(dict_list), batch_count)
+
+
+def _record_load(schema: str, row_count: int, batch_count: int) -> None:
+    telemetry = get_telemetry_recorder()
+    telemetry.incr("rows_loaded", row_count, schema=schema)
+    telemetry.incr("load_batches", batch_count, schema=schema)
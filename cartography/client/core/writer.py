@@ -0,0 +1,108 @@
+import logging
+import queue
+import threading
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import neo4j
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of load() calls waiting to be written. Once the queue is full, load() blocks until the writer catches
+# up, which bounds the memory held by pending writes.
+DEFAULT_MAX_QUEUED_WRITES = 8
+
+
+class BackgroundWriteSession:
+    """
+    Wraps a neo4j.Session so that `cartography.client.core.tx.load()` and `load_matchlinks()` hand their writes to a
+    background writer thread and return immediately. This lets an intel module fetch the next page or region from its
+    API while the previous one is being written to the graph.
+
+    Writes are applied in the order they were queued, by a single thread on the wrapped session. Every other use of
+    the session (running a query, running a cleanup job, opening a transaction, etc.) first waits for the queue to
+    drain, so that it sees all previously queued writes and never uses the session at the same time as the writer.
+
+    If a queued write fails, the writes queued after it are dropped and the error is raised to the caller on its next
+    use of the session, or by `flush()` or `close()`.
+    """
+
+    def __init__(
+        self,
+        session: neo4j.Session,
+        max_queued_writes: int = DEFAULT_MAX_QUEUED_WRITES,
+    ):
+        self._session = session
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued_writes)
+        self._error: Optional[BaseException] = None
+        self._abandoned = False
+        self._thread = threading.Thread(
+            target=self._drain,
+            name="cartography-neo4j-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Queue `func(session, *args, **kwargs)` to run on the writer thread with the wrapped session. Blocks while the
+        queue is full.
+        """
+        self._raise_writer_error()
+        self._queue.put((func, args, kwargs))
+
+    def flush(self) -> None:
+        """
+        Wait until all queued writes have been applied, and raise the first error that happened while applying them.
+        """
+        self._queue.join()
+        self._raise_writer_error()
+
+    def close(self) -> None:
+        """
+        Flush the queue and stop the writer thread. The wrapped session is left open.
+        """
+        try:
+            self.flush()
+        finally:
+            self._stop()
+
+    def abandon(self) -> None:
+        """
+        Drop the queued writes that have not started yet and stop the writer thread. Used when the caller has failed
+        and the rest of its writes no longer matter.
+        """
+        self._abandoned = True
+        self._stop()
+
+    def _stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None and not self._abandoned:
+                    func, args, kwargs = item
+                    func(self._session, *args, **kwargs)
+            except Exception as e:
+                logger.error(
+                    "Background Neo4j write failed; dropping the writes queued after it.",
+                    exc_info=True,
+                )
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_writer_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined on this class, i.e. everything that is part of the neo4j.Session API.
+        self.flush()
+        return getattr(self._session, name)
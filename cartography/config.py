@@ -19,10 +19,40 @@ class Config:
     :param neo4j_database: The name of the database in Neo4j to connect to. If not specified, uses your Neo4j database
     settings to infer which database is set to default.
     See https://neo4j.com/docs/api/python-driver/4.4/api.html#database. Optional.
+    :type neo4j_background_writes: bool
+    :param neo4j_background_writes: If True, data loaded with cartography.client.core.tx.load() and load_matchlinks() is
+        written to Neo4j by a background thread so that intel modules can keep fetching from their APIs meanwhile.
+        Each sync stage waits for its writes to finish before it ends. Defaults to False. Optional.
+    :type neo4j_driver: neo4j.Driver
+    :param neo4j_driver: The Neo4j driver that the sync runs on. Set by cartography.sync.Sync.run(), so that intel
+        modules that write to the graph from several threads can open a session for each of them. Optional.
+    :type batched_cleanup: bool
+    :param batched_cleanup: If True, cleanup jobs built from schemas collect the ids of all stale nodes and relationships
+        once and then delete them in batches, instead of repeating their queries until nothing is left to delete. This
+        is faster when there is a lot to clean up. Defaults to False. Optional.
+    :type concurrent_cleanup: bool
+    :param concurrent_cleanup: If True, the queries of cleanup jobs built from schemas that delete stale relationships
+        run concurrently, each on its own Neo4j session. Defaults to False. Optional.
+    :type telemetry_report_file: str
+    :param telemetry_report_file: Path of a file to write performance metrics of the sync to when it ends: wall time per
+        stage and per function and region, rows loaded, Neo4j transaction latencies and API call counts. The file is
+        written in the Prometheus text format if its name ends with `.prom`, and as JSON otherwise. See
+        cartography.telemetry. Optional.
+    :type telemetry_account_labels: bool
+    :param telemetry_account_labels: If True, the durations of functions in the telemetry report are also labeled with
+        the AWS account or GCP project they ran for. This keeps a metric per function, region and account in memory,
+        which can be a lot for large organizations. Defaults to False. Optional.
+    :type precompile_queries: bool
+    :param precompile_queries: If True, the ingestion, index and cleanup queries of every schema in cartography.models
+        are built before the sync starts instead of when each intel module first uses them. Defaults to False. Optional.
     :type selected_modules: str
     :param selected_modules: Comma-separated list of cartography top-level modules to sync. Optional.
     :type update_tag: int
     :param update_tag: Update tag for a cartography sync run. Optional.
+    :type stage_workers: int
+    :param stage_workers: Number of sync stages to run concurrently, each one on its own Neo4j session. Stages only
+        start once their upstream stages have finished (see cartography.sync.STAGE_DEPENDENCIES). If None or 1
+        (default), stages run in sequence. Optional.
     :type aws_sync_all_profiles: bool
     :param aws_sync_all_profiles: If True, AWS sync will run for all non-default profiles in the AWS_CONFIG_FILE. If
         False (default), AWS sync will run using the default credentials only. Optional.
@@ -31,8 +61,24 @@ class Config:
     :type aws_best_effort_mode: bool
     :param aws_best_effort_mode: If True, AWS sync will not raise any exceptions, just log. If False (default),
         exceptions will be raised.
+    :type aws_account_workers: int
+    :param aws_account_workers: Number of AWS accounts to sync concurrently, each one on its own Neo4j session. If None
+        or 1 (default), accounts are synced one at a time. Optional.
     :type aws_cloudtrail_management_events_lookback_hours: int
     :param aws_cloudtrail_management_events_lookback_hours: Number of hours back to retrieve CloudTrail management events from. Optional.
+    :type aws_cloudtrail_management_events_incremental: bool
+    :param aws_cloudtrail_management_events_incremental: If True, only the CloudTrail management events after the ones
+        read by the previous sync are read, and added to the role assumption relationships in the graph. Defaults to
+        False. Optional.
+    :type aws_s3_details_max_age_hours: int
+    :param aws_s3_details_max_age_hours: Number of hours the fetched details of an S3 bucket are reused for before they
+        are fetched again. Optional. If not set, the details of every bucket are fetched on every sync.
+    :type aws_inspector_workers: int
+    :param aws_inspector_workers: Number of (account, region) pairs to fetch AWS Inspector findings for concurrently,
+        while loading the fetched findings. Optional. If not set, they are fetched and loaded one at a time.
+    :type gcp_project_workers: int
+    :param gcp_project_workers: Number of GCP projects to sync concurrently, each worker with its own Neo4j session.
+        Optional. If not set, projects are synced one at a time.
     :type azure_sync_all_subscriptions: bool
     :param azure_sync_all_subscriptions: If True, Azure sync will run for all profiles in azureProfile.json. If
         False (default), Azure sync will run using current user session via CLI credentials. Optional.
@@ -68,10 +114,16 @@ class Config:
     :param okta_saml_role_regex: The regex used to map okta groups to AWS roles. Optional.
     :type github_config: str
     :param github_config: Base64 encoded config object for GitHub ingestion. Optional.
+    :type github_http_retries: int
+    :param github_http_retries: Number of times a GitHub API query that fails with a timeout or an HTTP error is
+        tried. Optional. If not set, queries are tried 5 times.
     :type digitalocean_token: str
     :param digitalocean_token: DigitalOcean access token. Optional.
     :type permission_relationships_file: str
     :param permission_relationships_file: File path for the resource permission relationships file. Optional.
+    :type permission_relationships_workers: int
+    :param permission_relationships_workers: Number of processes to evaluate resource permission relationships with.
+        Optional. If not set, they are evaluated in the sync process.
     :type jamf_base_uri: string
     :param jamf_base_uri: Jamf data provider base URI, e.g. https://example.com/JSSResource. Optional.
     :type jamf_user: string
@@ -175,12 +227,25 @@ class Config:
         neo4j_password=None,
         neo4j_max_connection_lifetime=None,
         neo4j_database=None,
+        neo4j_background_writes=False,
+        neo4j_driver=None,
+        batched_cleanup=False,
+        concurrent_cleanup=False,
+        precompile_queries=False,
+        telemetry_report_file=None,
+        telemetry_account_labels=False,
         selected_modules=None,
         update_tag=None,
+        stage_workers=None,
         aws_sync_all_profiles=False,
         aws_regions=None,
         aws_best_effort_mode=False,
+        aws_account_workers=None,
         aws_cloudtrail_management_events_lookback_hours=None,
+        aws_cloudtrail_management_events_incremental=False,
+        aws_s3_details_max_age_hours=None,
+        aws_inspector_workers=None,
+        gcp_project_workers=None,
         azure_sync_all_subscriptions=False,
         azure_sp_auth=None,
         azure_tenant_id=None,
@@ -197,8 +262,10 @@ class Config:
         okta_api_key=None,
         okta_saml_role_regex=None,
         github_config=None,
+        github_http_retries=None,
         digitalocean_token=None,
         permission_relationships_file=None,
+        permission_relationships_workers=None,
         jamf_base_uri=None,
         jamf_user=None,
         jamf_password=None,
@@ -258,14 +325,29 @@ class Config:
         self.neo4j_password = neo4j_password
         self.neo4j_max_connection_lifetime = neo4j_max_connection_lifetime
         self.neo4j_database = neo4j_database
+        self.neo4j_background_writes = neo4j_background_writes
+        self.neo4j_driver = neo4j_driver
+        self.batched_cleanup = batched_cleanup
+        self.concurrent_cleanup = concurrent_cleanup
+        self.precompile_queries = precompile_queries
+        self.telemetry_report_file = telemetry_report_file
+        self.telemetry_account_labels = telemetry_account_labels
         self.selected_modules = selected_modules
         self.update_tag = update_tag
+        self.stage_workers = stage_workers
         self.aws_sync_all_profiles = aws_sync_all_profiles
         self.aws_regions = aws_regions
         self.aws_best_effort_mode = aws_best_effort_mode
+        self.aws_account_workers = aws_account_workers
         self.aws_cloudtrail_management_events_lookback_hours = (
             aws_cloudtrail_management_events_lookback_hours
         )
+        self.aws_cloudtrail_management_events_incremental = (
+            aws_cloudtrail_management_events_incremental
+        )
+        self.aws_s3_details_max_age_hours = aws_s3_details_max_age_hours
+        self.aws_inspector_workers = aws_inspector_workers
+        self.gcp_project_workers = gcp_project_workers
         self.azure_sync_all_subscriptions = azure_sync_all_subscriptions
         self.azure_sp_auth = azure_sp_auth
         self.azure_tenant_id = azure_tenant_id
@@ -282,8 +364,10 @@ class Config:
         self.okta_api_key = okta_api_key
         self.okta_saml_role_regex = okta_saml_role_regex
         self.github_config = github_config
+        self.github_http_retries = github_http_retries
         self.digitalocean_token = digitalocean_token
         self.permission_relationships_file = permission_relationships_file
+        self.permission_relationships_workers = permission_relationships_workers
         self.jamf_base_uri = jamf_base_uri
         self.jamf_user = jamf_user
         self.jamf_password = jamf_password
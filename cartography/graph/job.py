@@ -1,6 +1,7 @@
 import json
 import logging
 import string
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from string import Template
 from typing import Any
@@ -12,6 +13,7 @@ from typing import Union
 
 import neo4j
 
+from cartography.client.core.session import new_neo4j_session
 from cartography.graph.cleanupbuilder import build_cleanup_queries
 from cartography.graph.cleanupbuilder import build_cleanup_query_for_matchlink
 from cartography.graph.statement import get_job_shortname
@@ -21,6 +23,45 @@ from cartography.models.core.relationships import CartographyRelSchema
 
 logger = logging.getLogger(__name__)
 
+# Whether cleanup jobs built from schemas collect the ids of stale nodes and relationships once and delete them in
+# batches, instead of repeating their queries until nothing is left to delete. See GraphStatement._run_batched().
+_batched_cleanup = False
+
+# Number of stale elements deleted per transaction by batched cleanups. Deleting by id does not scan the graph, so
+# batches can be larger than the LIMIT used by iterative cleanups.
+BATCHED_CLEANUP_SIZE = 1000
+
+
+# Maximum number of statements of the same parallel_group that run at once.
+MAX_CONCURRENT_STATEMENTS = 4
+
+# The driver and database that statements of the same parallel_group open their sessions on. If no driver is set, all
+# statements run sequentially on the session of the job. See set_concurrent_cleanup().
+_concurrent_cleanup_driver: Optional[neo4j.Driver] = None
+_concurrent_cleanup_database: Optional[str] = None
+
+
+def set_batched_cleanup(enabled: bool) -> None:
+    """
+    Turns batched execution of cleanup jobs built by `GraphJob.from_node_schema()` and `GraphJob.from_matchlink()` on
+    or off for the rest of the process.
+    """
+    global _batched_cleanup
+    _batched_cleanup = enabled
+
+
+def set_concurrent_cleanup(
+    neo4j_driver: Optional[neo4j.Driver],
+    database: Optional[str] = None,
+) -> None:
+    """
+    Makes consecutive statements of the same `parallel_group` run concurrently, each on its own session of the given
+    driver, for the rest of the process. Passing None runs all statements sequentially again.
+    """
+    global _concurrent_cleanup_driver, _concurrent_cleanup_database
+    _concurrent_cleanup_driver = neo4j_driver
+    _concurrent_cleanup_database = database
+
 
 def _get_identifiers(template: string.Template) -> List[str]:
     """
@@ -94,12 +135,26 @@ class GraphJob:
 
     def run(self, neo4j_session: neo4j.Session) -> None:
         """
-        Run the job. This will execute all statements sequentially.
+        Run the job. This will execute all statements sequentially, except that consecutive statements with the same
+        `parallel_group` run concurrently, each on its own session, if set_concurrent_cleanup() was given a driver.
         """
         logger.debug("Starting job '%s'.", self.name)
-        for stm in self.statements:
+        neo4j_driver = _concurrent_cleanup_driver
+        if neo4j_driver is None:
+            groups = [[stm] for stm in self.statements]
+        else:
+            groups = _group_statements(self.statements)
+        for group in groups:
             try:
-                stm.run(neo4j_session)
+                if len(group) == 1:
+                    group[0].run(neo4j_session)
+                else:
+                    _run_statements_concurrently(
+                        neo4j_driver,
+                        neo4j_session,
+                        _concurrent_cleanup_database,
+                        group,
+                    )
             except Exception as e:
                 logger.error(
                     "Unhandled error while executing statement in job '%s': %s",
@@ -165,9 +220,19 @@ class GraphJob:
                 query,
                 parameters=parameters,
                 iterative=True,
-                iterationsize=100,
+                iterationsize=BATCHED_CLEANUP_SIZE if _batched_cleanup else 100,
                 parent_job_name=node_schema.label,
                 parent_job_sequence_num=idx,
+                batched=_batched_cleanup,
+                # The queries that delete stale relationships may run concurrently if set_concurrent_cleanup() was
+                # called. They share endpoint nodes (at least the sub resource node), so Neo4j may have to retry some of
+                # them after lock conflicts. The query that deletes stale nodes (with DETACH DELETE) runs on its own,
+                # before them.
+                parallel_group=(
+                    None
+                    if "DETACH DELETE" in query
+                    else f"{node_schema.label} relationships"
+                ),
             )
             for idx, query in enumerate(queries, start=1)
         ]
@@ -208,8 +273,9 @@ class GraphJob:
             cleanup_link_query,
             parameters=parameters,
             iterative=True,
-            iterationsize=100,
+            iterationsize=BATCHED_CLEANUP_SIZE if _batched_cleanup else 100,
             parent_job_name=rel_schema.rel_label,
+            batched=_batched_cleanup,
         )
 
         return cls(
@@ -271,6 +337,62 @@ class GraphJob:
         job.run(neo4j_session)
 
 
+def _group_statements(statements: List[GraphStatement]) -> List[List[GraphStatement]]:
+    """
+    Splits the statements into consecutive groups that share the same `parallel_group`. Statements without a
+    `parallel_group` are each in a group of their own.
+    """
+    groups: List[List[GraphStatement]] = []
+    for stm in statements:
+        if (
+            groups
+            and stm.parallel_group
+            and groups[-1][-1].parallel_group == stm.parallel_group
+        ):
+            groups[-1].append(stm)
+        else:
+            groups.append([stm])
+    return groups
+
+
+def _run_statement_in_new_session(
+    neo4j_driver: neo4j.Driver,
+    neo4j_session: neo4j.Session,
+    database: Optional[str],
+    statement: GraphStatement,
+) -> None:
+    with new_neo4j_session(neo4j_driver, neo4j_session, database) as statement_session:
+        statement.run(statement_session)
+
+
+def _run_statements_concurrently(
+    neo4j_driver: neo4j.Driver,
+    neo4j_session: neo4j.Session,
+    database: Optional[str],
+    statements: List[GraphStatement],
+) -> None:
+    """
+    Runs the given statements concurrently, each on a new session of the given driver, and raises the first error once
+    all of them have finished.
+    """
+    with ThreadPoolExecutor(
+        max_workers=min(MAX_CONCURRENT_STATEMENTS, len(statements)),
+        thread_name_prefix="cartography-graph-job",
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_statement_in_new_session,
+                neo4j_driver,
+                neo4j_session,
+                database,
+                stm,
+            )
+            for stm in statements
+        ]
+        for future in futures:
+            future.result()
+
+
 def _get_statements_from_json(
     blob: Dict,
     short_job_name: Optional[str] = None,
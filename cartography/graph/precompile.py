@@ -0,0 +1,75 @@
+import importlib
+import logging
+from pkgutil import iter_modules
+from types import ModuleType
+from typing import Iterator
+from typing import Type
+
+import cartography.models
+from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.cleanupbuilder import build_cleanup_query_for_matchlink
+from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import build_create_index_queries_for_matchlink
+from cartography.graph.querybuilder import build_ingestion_query
+from cartography.graph.querybuilder import build_matchlink_query
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelSchema
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_schema_classes(package: ModuleType) -> Iterator[Type]:
+    """
+    Yields every CartographyNodeSchema and CartographyRelSchema subclass defined in the modules of the given package
+    and its subpackages.
+    """
+    for module_info in iter_modules(package.__path__):
+        module = importlib.import_module(f"{package.__name__}.{module_info.name}")
+        for obj in vars(module).values():
+            if (
+                isinstance(obj, type)
+                and issubclass(obj, (CartographyNodeSchema, CartographyRelSchema))
+                and obj.__module__ == module.__name__
+            ):
+                yield obj
+        if hasattr(module, "__path__"):
+            yield from _iter_schema_classes(module)
+
+
+def precompile_queries(package: ModuleType = cartography.models) -> int:
+    """
+    Builds and caches the ingestion, index and cleanup queries of every schema defined in the given package, so that
+    intel modules don't need to build them during the sync. See `cartography.graph.querybuilder.cache_query_per_schema`.
+
+    :param package: The package to search for schemas. Defaults to `cartography.models`.
+    :return: The number of schemas whose queries were built.
+    """
+    count = 0
+    for schema_class in _iter_schema_classes(package):
+        try:
+            schema = schema_class()
+        except TypeError:
+            # Abstract or otherwise not instantiable without arguments, so it is never passed to load() as-is.
+            continue
+        try:
+            if isinstance(schema, CartographyNodeSchema):
+                build_ingestion_query(schema)
+                build_create_index_queries(schema)
+                build_cleanup_queries(schema)
+            elif schema.source_node_matcher:
+                build_matchlink_query(schema)
+                build_create_index_queries_for_matchlink(schema)
+                build_cleanup_query_for_matchlink(schema)
+            else:
+                # Relationships without a source node matcher are only built as part of a node schema.
+                continue
+        except ValueError:
+            # The same error is raised when the schema is used, so leave it to the module that uses it.
+            logger.debug(
+                f"Skipping precompiling queries for {schema_class.__name__}.",
+                exc_info=True,
+            )
+            continue
+        count += 1
+    logger.info(f"Precompiled queries for {count} schemas.")
+    return count
@@ -1,11 +1,16 @@
 import logging
 from dataclasses import asdict
+from functools import wraps
 from string import Template
+from typing import Callable
+from typing import cast
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Set
 from typing import Tuple
+from typing import TypeVar
+from typing import Union
 
 from cartography.models.core.common import PropertyRef
 from cartography.models.core.nodes import CartographyNodeProperties
@@ -19,6 +24,60 @@ from cartography.models.core.relationships import TargetNodeMatcher
 
 logger = logging.getLogger(__name__)
 
+Schema = Union[CartographyNodeSchema, CartographyRelSchema]
+Q = TypeVar("Q", str, List[str])
+
+# Queries built by the functions decorated with `cache_query_per_schema`, keyed on the builder function, the schema class
+# and the classes of the selected relationships.
+_query_cache: Dict[Tuple[str, type, Optional[frozenset]], Union[str, List[str]]] = {}
+
+
+def cache_query_per_schema(
+    build_func: Callable[..., Q],
+) -> Callable[..., Q]:
+    """
+    Caches the queries built by the given query builder function for each schema class, so that each query is only
+    built once per run instead of on every load or cleanup. Reusing the exact same query string also lets Neo4j reuse
+    the query plan it has cached for it.
+
+    The builder must take the schema as its first argument, optionally followed by `selected_relationships`, and its
+    result must only depend on the schema's class and the classes of the selected relationships. This holds for all
+    cartography schemas, as they are frozen dataclasses whose fields all have defaults.
+    """
+
+    @wraps(build_func)
+    def inner_function(
+        schema: Schema,
+        selected_relationships: Optional[Set[CartographyRelSchema]] = None,
+    ) -> Q:
+        key = (
+            build_func.__name__,
+            type(schema),
+            (
+                frozenset(type(rel) for rel in selected_relationships)
+                if selected_relationships is not None
+                else None
+            ),
+        )
+        query = _query_cache.get(key)
+        if query is None:
+            if selected_relationships is None:
+                query = build_func(schema)
+            else:
+                query = build_func(schema, selected_relationships)
+            _query_cache[key] = query
+        # Return a copy of lists so that callers cannot change what is cached
+        return cast(Q, list(query) if isinstance(query, list) else query)
+
+    return inner_function
+
+
+def clear_query_cache() -> None:
+    """
+    Removes all queries cached by `cache_query_per_schema`.
+    """
+    _query_cache.clear()
+
 
 def _build_node_properties_statement(
     node_property_map: Dict[str, PropertyRef],
@@ -424,6 +483,7 @@ def filter_selected_relationships(
     return sub_resource_rel, filtered_other_rels
 
 
+@cache_query_per_schema
 def build_ingestion_query(
     node_schema: CartographyNodeSchema,
     selected_relationships: Optional[Set[CartographyRelSchema]] = None,
@@ -487,6 +547,7 @@ def build_ingestion_query(
     return ingest_query
 
 
+@cache_query_per_schema
 def build_create_index_queries(node_schema: CartographyNodeSchema) -> List[str]:
     """
     Generate queries to create indexes for the given CartographyNodeSchema and all node types attached to it via its
@@ -551,6 +612,7 @@ def build_create_index_queries(node_schema: CartographyNodeSchema) -> List[str]:
     return result
 
 
+@cache_query_per_schema
 def build_create_index_queries_for_matchlink(
     rel_schema: CartographyRelSchema,
 ) -> list[str]:
@@ -613,6 +675,7 @@ def build_create_index_queries_for_matchlink(
     return result
 
 
+@cache_query_per_schema
 def build_matchlink_query(rel_schema: CartographyRelSchema) -> str:
     """
     Generate a Neo4j query to link two existing nodes when given a CartographyRelSchema object.
@@ -1,9 +1,11 @@
 import json
 import logging
 import os
+import re
 from pathlib import Path
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Union
 
@@ -14,6 +16,28 @@ from cartography.stats import get_stats_client
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Matches the end of the cleanup queries built by cartography.graph.cleanupbuilder, e.g.
+#     WHERE n.lastupdated <> $UPDATE_TAG
+#     WITH n LIMIT $LIMIT_SIZE
+#     DETACH DELETE n;
+# `DETACH DELETE` is used for nodes and `DELETE` for relationships.
+_CLEANUP_DELETE_CLAUSE = re.compile(
+    r"WITH (?P<var>\w+) LIMIT \$LIMIT_SIZE\s+(?P<delete>DETACH DELETE|DELETE) (?P=var);?\s*$",
+)
+
+# Deletes stale elements by internal id. Staleness is checked again in case an id was reused by a newer element since
+# the ids were collected. id() is used instead of elementId() to keep supporting Neo4j 4.
+_DELETE_NODES_BY_ID_QUERY = """
+UNWIND $ids AS node_id
+MATCH (n) WHERE id(n) = node_id AND n.lastupdated <> $UPDATE_TAG
+DETACH DELETE n;
+"""
+_DELETE_RELS_BY_ID_QUERY = """
+UNWIND $ids AS rel_id
+MATCH ()-[r]->() WHERE id(r) = rel_id AND r.lastupdated <> $UPDATE_TAG
+DELETE r;
+"""
+
 
 class GraphStatementJSONEncoder(json.JSONEncoder):
     """
@@ -47,11 +71,17 @@ class GraphStatement:
         iterationsize: int = 0,
         parent_job_name: Optional[str] = None,
         parent_job_sequence_num: Optional[int] = None,
+        batched: bool = False,
+        parallel_group: Optional[str] = None,
     ):
         self.query = query
         self.parameters = parameters or {}
         self.iterative = iterative
         self.iterationsize = iterationsize
+        # Only used for iterative cleanup statements built by cartography.graph.cleanupbuilder; see _run_batched().
+        self.batched = batched
+        # Consecutive statements of a job with the same parallel_group touch disjoint data and may run concurrently.
+        self.parallel_group = parallel_group
         self.parameters["LIMIT_SIZE"] = self.iterationsize
 
         self.parent_job_name = parent_job_name if parent_job_name else None
@@ -71,7 +101,9 @@ class GraphStatement:
         """
         Run the statement. This will execute the query against the graph.
         """
-        if self.iterative:
+        if self.iterative and self.batched:
+            self._run_batched(session)
+        elif self.iterative:
             self._run_iterative(session)
         else:
             session.write_transaction(self._run_noniterative)
@@ -84,12 +116,15 @@ class GraphStatement:
         """
         Convert statement to a dictionary.
         """
-        return {
+        result = {
             "query": self.query,
             "parameters": self.parameters,
             "iterative": self.iterative,
             "iterationsize": self.iterationsize,
         }
+        if self.parallel_group:
+            result["parallel_group"] = self.parallel_group
+        return result
 
     def _run_noniterative(self, tx: neo4j.Transaction) -> neo4j.ResultSummary:
         """
@@ -102,21 +137,7 @@ class GraphStatement:
         summary: neo4j.ResultSummary = result.consume()
 
         # Handle stats
-        stat_handler.incr("constraints_added", summary.counters.constraints_added)
-        stat_handler.incr("constraints_removed", summary.counters.constraints_removed)
-        stat_handler.incr("indexes_added", summary.counters.indexes_added)
-        stat_handler.incr("indexes_removed", summary.counters.indexes_removed)
-        stat_handler.incr("labels_added", summary.counters.labels_added)
-        stat_handler.incr("labels_removed", summary.counters.labels_removed)
-        stat_handler.incr("nodes_created", summary.counters.nodes_created)
-        stat_handler.incr("nodes_deleted", summary.counters.nodes_deleted)
-        stat_handler.incr("properties_set", summary.counters.properties_set)
-        stat_handler.incr(
-            "relationships_created", summary.counters.relationships_created
-        )
-        stat_handler.incr(
-            "relationships_deleted", summary.counters.relationships_deleted
-        )
+        _record_stats(summary)
 
         return summary
 
@@ -136,6 +157,74 @@ class GraphStatement:
             if not summary.counters.contains_updates:
                 break
 
+    def _run_batched(self, session: neo4j.Session) -> None:
+        """
+        Batched cleanup execution. Instead of repeating the whole query until it stops deleting anything, which scans
+        the graph from the sub resource again on every pass, the query is run once to collect the ids of all stale
+        elements, which are then deleted by id in batches of `iterationsize`.
+
+        Falls back to iterative execution if the query does not end with a delete clause of the form used by
+        cartography.graph.cleanupbuilder.
+        """
+        match = _CLEANUP_DELETE_CLAUSE.search(self.query)
+        if not match:
+            logger.debug(
+                f"{self.parent_job_name} statement #{self.parent_job_sequence_num} cannot be batched, running it "
+                "iteratively.",
+            )
+            self._run_iterative(session)
+            return
+
+        var = match.group("var")
+        collect_query = self.query[: match.start()] + f"RETURN DISTINCT id({var}) AS id"
+        delete_query = (
+            _DELETE_NODES_BY_ID_QUERY
+            if match.group("delete") == "DETACH DELETE"
+            else _DELETE_RELS_BY_ID_QUERY
+        )
+
+        ids: List[int] = session.read_transaction(self._collect_ids, collect_query)
+        if not ids:
+            return
+        logger.info(
+            f"Deleting {len(ids)} stale elements for {self.parent_job_name} statement "
+            f"#{self.parent_job_sequence_num}.",
+        )
+        stat_handler.incr("cleanup_stale_found", len(ids))
+
+        batch_size = max(1, self.iterationsize)
+        for start in range(0, len(ids), batch_size):
+            session.write_transaction(
+                self._delete_ids,
+                delete_query,
+                ids[start : start + batch_size],
+            )
+            remaining = max(0, len(ids) - start - batch_size)
+            stat_handler.gauge("cleanup_stale_remaining", remaining)
+            logger.debug(
+                f"{self.parent_job_name} statement #{self.parent_job_sequence_num}: {remaining} stale elements left "
+                "to delete.",
+            )
+
+    def _collect_ids(self, tx: neo4j.Transaction, query: str) -> List[int]:
+        result: neo4j.Result = tx.run(query, self.parameters)
+        return [record["id"] for record in result]
+
+    def _delete_ids(
+        self,
+        tx: neo4j.Transaction,
+        query: str,
+        ids: List[int],
+    ) -> neo4j.ResultSummary:
+        result: neo4j.Result = tx.run(
+            query,
+            ids=ids,
+            UPDATE_TAG=self.parameters["UPDATE_TAG"],
+        )
+        summary: neo4j.ResultSummary = result.consume()
+        _record_stats(summary)
+        return summary
+
     @classmethod
     def create_from_json(
         cls,
@@ -153,6 +242,7 @@ class GraphStatement:
             json_obj.get("iterationsize", 0),
             short_job_name,
             job_sequence_num,
+            parallel_group=json_obj.get("parallel_group"),
         )
 
     @classmethod
@@ -164,3 +254,17 @@ class GraphStatement:
             data = json.load(json_file)
 
         return cls.create_from_json(data, get_job_shortname(file_path))
+
+
+def _record_stats(summary: neo4j.ResultSummary) -> None:
+    stat_handler.incr("constraints_added", summary.counters.constraints_added)
+    stat_handler.incr("constraints_removed", summary.counters.constraints_removed)
+    stat_handler.incr("indexes_added", summary.counters.indexes_added)
+    stat_handler.incr("indexes_removed", summary.counters.indexes_removed)
+    stat_handler.incr("labels_added", summary.counters.labels_added)
+    stat_handler.incr("labels_removed", summary.counters.labels_removed)
+    stat_handler.incr("nodes_created", summary.counters.nodes_created)
+    stat_handler.incr("nodes_deleted", summary.counters.nodes_deleted)
+    stat_handler.incr("properties_set", summary.counters.properties_set)
+    stat_handler.incr("relationships_created", summary.counters.relationships_created)
+    stat_handler.incr("relationships_deleted", summary.counters.relationships_deleted)
@@ -1,6 +1,8 @@
 import datetime
 import logging
 import traceback
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
 from typing import Iterable
@@ -10,10 +12,12 @@ import boto3
 import botocore.exceptions
 import neo4j
 
+from cartography.client.core.session import new_neo4j_session
 from cartography.config import Config
 from cartography.intel.aws.util.common import parse_and_validate_aws_regions
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
 from cartography.stats import get_stats_client
+from cartography.telemetry import record_api_call
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_analysis_and_ensure_deps
 from cartography.util import run_analysis_job
@@ -23,6 +27,7 @@ from cartography.util import timeit
 
 from . import ec2
 from . import organizations
+from . import permission_relationships
 from .resources import RESOURCE_FUNCTIONS
 
 stat_handler = get_stats_client(__name__)
@@ -47,6 +52,22 @@ def _build_aws_sync_kwargs(
     }
 
 
+def _record_aws_api_call(model: Any, **kwargs: Any) -> None:
+    record_api_call(model.service_model.service_name, model.name)
+
+
+def _record_api_calls(boto3_session: boto3.session.Session) -> None:
+    """
+    Counts the AWS API calls made by clients created from the given session in the telemetry report. The handler is only
+    registered once per session.
+    """
+    boto3_session.events.register(
+        "before-call",
+        _record_aws_api_call,
+        unique_id="cartography-telemetry-api-calls",
+    )
+
+
 def _sync_one_account(
     neo4j_session: neo4j.Session,
     boto3_session: boto3.session.Session,
@@ -56,6 +77,8 @@ def _sync_one_account(
     regions: list[str] | None = None,
     aws_requested_syncs: Iterable[str] = RESOURCE_FUNCTIONS.keys(),
 ) -> None:
+    _record_api_calls(boto3_session)
+
     # Autodiscover the regions supported by the account unless the user has specified the regions to sync.
     if not regions:
         regions = _autodiscover_account_regions(boto3_session, current_aws_account_id)
@@ -170,6 +193,157 @@ def _autodiscover_accounts(
         )
 
 
+def _format_account_exception(account_id: str, e: Exception) -> str:
+    timestamp = datetime.datetime.now()
+    exception_traceback = traceback.TracebackException.from_exception(e)
+    traceback_string = "".join(exception_traceback.format())
+    return f"{timestamp} - Exception for account ID: {account_id}\n{traceback_string}"
+
+
+def _sync_account(
+    neo4j_session: neo4j.Session,
+    boto3_session: boto3.session.Session,
+    profile_name: str,
+    account_id: str,
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_best_effort_mode: bool,
+    aws_requested_syncs: List[str],
+    regions: list[str] | None,
+) -> str | None:
+    """
+    Syncs one AWS account. In best effort mode, an exception from the account's sync is logged and returned formatted
+    instead of raised. Exceptions from account autodiscovery are always raised.
+    """
+    logger.info(
+        "Syncing AWS account with ID '%s' using configured profile '%s'.",
+        account_id,
+        profile_name,
+    )
+    _autodiscover_accounts(
+        neo4j_session,
+        boto3_session,
+        account_id,
+        sync_tag,
+        common_job_parameters,
+    )
+
+    try:
+        _sync_one_account(
+            neo4j_session,
+            boto3_session,
+            account_id,
+            sync_tag,
+            common_job_parameters,
+            regions=regions,
+            aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
+        )
+    except Exception as e:
+        if aws_best_effort_mode:
+            logger.warning(
+                f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are continuing "
+                f"on with the other AWS accounts. All exceptions will be aggregated and re-logged at the end of the "
+                f"sync.",
+                exc_info=True,
+            )
+            return _format_account_exception(account_id, e)
+        else:
+            raise
+    return None
+
+
+def _sync_account_in_new_session(
+    neo4j_driver: neo4j.Driver,
+    neo4j_session: neo4j.Session,
+    neo4j_database: str | None,
+    boto3_session: boto3.session.Session,
+    profile_name: str,
+    account_id: str,
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_best_effort_mode: bool,
+    aws_requested_syncs: List[str],
+    regions: list[str] | None,
+) -> str | None:
+    """
+    Syncs one AWS account on its own Neo4j session so that several accounts can be synced from worker threads.
+    """
+    with new_neo4j_session(
+        neo4j_driver,
+        neo4j_session,
+        neo4j_database,
+    ) as account_neo4j_session:
+        return _sync_account(
+            account_neo4j_session,
+            boto3_session,
+            profile_name,
+            account_id,
+            sync_tag,
+            common_job_parameters,
+            aws_best_effort_mode,
+            aws_requested_syncs,
+            regions,
+        )
+
+
+def _sync_accounts_concurrently(
+    neo4j_driver: neo4j.Driver,
+    neo4j_session: neo4j.Session,
+    neo4j_database: str | None,
+    accounts: Dict[str, str],
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_best_effort_mode: bool,
+    aws_requested_syncs: List[str],
+    regions: list[str] | None,
+    max_workers: int,
+) -> Dict[str, str]:
+    """
+    Syncs the given accounts on a pool of `max_workers` threads, each account with its own Neo4j session and its own
+    copy of common_job_parameters. Failures are handled as in the serial path: exceptions are raised, except those of
+    the account syncs in best effort mode, which are aggregated. A raised exception is re-raised once the accounts that
+    are already syncing have finished.
+    :return: A dict of account ID to formatted traceback for every account that failed in best effort mode.
+    """
+    logger.info("Syncing %d AWS accounts with %d workers.", len(accounts), max_workers)
+    # boto3 session creation is not thread-safe, so build all sessions up front on this thread.
+    boto3_sessions = {
+        profile_name: boto3.Session(profile_name=profile_name)
+        for profile_name in accounts
+    }
+    failures: Dict[str, str] = {}
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="cartography-aws-account",
+    )
+    try:
+        futures = {
+            executor.submit(
+                _sync_account_in_new_session,
+                neo4j_driver,
+                neo4j_session,
+                neo4j_database,
+                boto3_sessions[profile_name],
+                profile_name,
+                account_id,
+                sync_tag,
+                {**common_job_parameters, "AWS_ID": account_id},
+                aws_best_effort_mode,
+                aws_requested_syncs,
+                regions,
+            ): account_id
+            for profile_name, account_id in accounts.items()
+        }
+        for future in as_completed(futures):
+            failure = future.result()
+            if failure:
+                failures[futures[future]] = failure
+    finally:
+        # Accounts that have not started yet are skipped if we are raising; running ones are allowed to finish.
+        executor.shutdown(wait=True, cancel_futures=True)
+    return failures
+
+
 def _sync_multiple_accounts(
     neo4j_session: neo4j.Session,
     accounts: Dict[str, str],
@@ -178,70 +352,70 @@ def _sync_multiple_accounts(
     aws_best_effort_mode: bool,
     aws_requested_syncs: List[str] = [],
     regions: list[str] | None = None,
+    aws_account_workers: int | None = None,
+    neo4j_driver: neo4j.Driver | None = None,
+    neo4j_database: str | None = None,
 ) -> bool:
     logger.info("Syncing AWS accounts: %s", ", ".join(accounts.values()))
     organizations.sync(neo4j_session, accounts, sync_tag, common_job_parameters)
 
-    failed_account_ids = []
-    exception_tracebacks = []
+    failed_account_ids: List[str] = []
+    exception_tracebacks: List[str] = []
 
     num_accounts = len(accounts)
 
-    for profile_name, account_id in accounts.items():
-        logger.info(
-            "Syncing AWS account with ID '%s' using configured profile '%s'.",
-            account_id,
-            profile_name,
+    concurrent = bool(
+        aws_account_workers and aws_account_workers > 1 and num_accounts > 1
+    )
+    if concurrent and neo4j_driver is None:
+        logger.warning(
+            "No Neo4j driver was given to open a session for each AWS account, syncing the accounts one by one.",
         )
-        common_job_parameters["AWS_ID"] = account_id
-        if num_accounts == 1:
-            # Use the default boto3 session because boto3 gets confused if you give it a profile name with 1 account
-            boto3_session = boto3.Session()
-        else:
-            boto3_session = boto3.Session(profile_name=profile_name)
 
-        _autodiscover_accounts(
+    if concurrent and neo4j_driver is not None and aws_account_workers:
+        failures = _sync_accounts_concurrently(
+            neo4j_driver,
             neo4j_session,
-            boto3_session,
-            account_id,
+            neo4j_database,
+            accounts,
             sync_tag,
             common_job_parameters,
+            aws_best_effort_mode,
+            aws_requested_syncs,
+            regions,
+            aws_account_workers,
         )
+        failed_account_ids.extend(failures.keys())
+        exception_tracebacks.extend(failures.values())
+    else:
+        for profile_name, account_id in accounts.items():
+            common_job_parameters["AWS_ID"] = account_id
+            if num_accounts == 1:
+                # Use the default boto3 session because boto3 gets confused if you give it a profile name with 1 account
+                boto3_session = boto3.Session()
+            else:
+                boto3_session = boto3.Session(profile_name=profile_name)
 
-        try:
-            _sync_one_account(
+            failure = _sync_account(
                 neo4j_session,
                 boto3_session,
+                profile_name,
                 account_id,
                 sync_tag,
                 common_job_parameters,
-                regions=regions,
-                aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
+                aws_best_effort_mode,
+                aws_requested_syncs,
+                regions,
             )
-        except Exception as e:
-            if aws_best_effort_mode:
-                timestamp = datetime.datetime.now()
+            if failure:
                 failed_account_ids.append(account_id)
-                exception_traceback = traceback.TracebackException.from_exception(e)
-                traceback_string = "".join(exception_traceback.format())
-                exception_tracebacks.append(
-                    f"{timestamp} - Exception for account ID: {account_id}\n{traceback_string}",
-                )
-                logger.warning(
-                    f"Caught exception syncing account {account_id}. aws-best-effort-mode is on so we are continuing "
-                    f"on to the next AWS account. All exceptions will be aggregated and re-logged at the end of the "
-                    f"sync.",
-                    exc_info=True,
-                )
-                continue
-            else:
-                raise
+                exception_tracebacks.append(failure)
 
     if failed_account_ids:
         logger.error(f"AWS sync failed for accounts {failed_account_ids}")
         raise Exception("\n".join(exception_tracebacks))
 
-    del common_job_parameters["AWS_ID"]
+    common_job_parameters.pop("AWS_ID", None)
 
     # There may be orphan Principals which point outside of known AWS accounts. This job cleans
     # up those nodes after all AWS accounts have been synced.
@@ -310,8 +484,12 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
     common_job_parameters = {
         "UPDATE_TAG": config.update_tag,
         "permission_relationships_file": config.permission_relationships_file,
+        "permission_relationships_workers": config.permission_relationships_workers,
         "aws_guardduty_severity_threshold": config.aws_guardduty_severity_threshold,
         "aws_cloudtrail_management_events_lookback_hours": config.aws_cloudtrail_management_events_lookback_hours,
+        "aws_cloudtrail_management_events_incremental": config.aws_cloudtrail_management_events_incremental,
+        "aws_s3_details_max_age_hours": config.aws_s3_details_max_age_hours,
+        "aws_inspector_workers": config.aws_inspector_workers,
     }
     try:
         boto3_session = boto3.Session()
@@ -359,15 +537,22 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
     else:
         regions = None
 
-    sync_successful = _sync_multiple_accounts(
-        neo4j_session,
-        aws_accounts,
-        config.update_tag,
-        common_job_parameters,
-        config.aws_best_effort_mode,
-        requested_syncs,
-        regions=regions,
-    )
+    try:
+        sync_successful = _sync_multiple_accounts(
+            neo4j_session,
+            aws_accounts,
+            config.update_tag,
+            common_job_parameters,
+            config.aws_best_effort_mode,
+            requested_syncs,
+            regions=regions,
+            aws_account_workers=config.aws_account_workers,
+            neo4j_driver=config.neo4j_driver,
+            neo4j_database=config.neo4j_database,
+        )
+    finally:
+        # The compiled policy statements are only shared by the accounts of this sync.
+        permission_relationships.get_compiled_statement_cache().clear()
 
     if sync_successful:
         _perform_aws_analysis(requested_syncs, neo4j_session, common_job_parameters)
@@ -1,10 +1,17 @@
 import json
 import logging
+from dataclasses import asdict
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 import boto3
 import neo4j
@@ -12,6 +19,7 @@ import neo4j
 from cartography.client.core.tx import load_matchlinks
 from cartography.graph.job import GraphJob
 from cartography.intel.aws.ec2.util import get_botocore_config
+from cartography.intel.aws.util.regions import get_data_for_regions
 from cartography.models.aws.cloudtrail.management_events import AssumedRoleMatchLink
 from cartography.models.aws.cloudtrail.management_events import (
     AssumedRoleWithSAMLMatchLink,
@@ -19,129 +27,136 @@ from cartography.models.aws.cloudtrail.management_events import (
 from cartography.models.aws.cloudtrail.management_events import (
     GitHubRepoAssumeRoleWithWebIdentityMatchLink,
 )
+from cartography.models.core.relationships import CartographyRelSchema
 from cartography.util import aws_handle_regions
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+# CloudTrail can take a few minutes to make an event available to LookupEvents. Incremental syncs only read events up
+# to this long ago, so that their high-water mark never passes events that have not been delivered yet.
+CLOUDTRAIL_EVENT_DELIVERY_DELAY = timedelta(minutes=15)
 
-@timeit
-@aws_handle_regions
-def get_assume_role_events(
-    boto3_session: boto3.Session, region: str, lookback_hours: int
-) -> List[Dict[str, Any]]:
-    """
-    Fetch CloudTrail AssumeRole events from the specified time period.
-
-    Focuses specifically on standard AssumeRole events, excluding SAML and WebIdentity variants.
 
-    :type boto3_session: boto3.Session
-    :param boto3_session: The boto3 session to use for API calls
-    :type region: str
-    :param region: The AWS region to fetch events from
-    :type lookback_hours: int
-    :param lookback_hours: Number of hours back to retrieve events from
-    :rtype: List[Dict[str, Any]]
-    :return: List of CloudTrail AssumeRole events
+def _lookup_events(
+    boto3_session: boto3.Session,
+    region: str,
+    event_name: str,
+    lookback_hours: int,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the CloudTrail events with the given name in the given time period, one page at a time as they are
+    consumed, so that callers never hold all events of the period in memory.
     """
     client = boto3_session.client(
         "cloudtrail", region_name=region, config=get_botocore_config()
     )
 
     # Calculate time range
-    end_time = datetime.utcnow()
-    start_time = end_time - timedelta(hours=lookback_hours)
+    if end_time is None:
+        end_time = datetime.now(timezone.utc)
+    if start_time is None:
+        start_time = end_time - timedelta(hours=lookback_hours)
 
     logger.info(
-        f"Fetching CloudTrail AssumeRole events for region '{region}' "
-        f"from {start_time} to {end_time} ({lookback_hours} hours)"
+        f"Fetching CloudTrail {event_name} events for region '{region}' "
+        f"from {start_time} to {end_time}"
     )
 
     paginator = client.get_paginator("lookup_events")
 
     page_iterator = paginator.paginate(
-        LookupAttributes=[
-            {"AttributeKey": "EventName", "AttributeValue": "AssumeRole"}
-        ],
+        LookupAttributes=[{"AttributeKey": "EventName", "AttributeValue": event_name}],
         StartTime=start_time,
         EndTime=end_time,
         PaginationConfig={
-            "MaxItems": 10000,  # Reasonable limit to prevent excessive API calls
             "PageSize": 50,  # CloudTrail API limit per page
         },
     )
 
-    all_events = []
+    event_count = 0
     for page in page_iterator:
-        all_events.extend(page.get("Events", []))
-
-    logger.info(f"Retrieved {len(all_events)} AssumeRole events from region '{region}'")
+        events = page.get("Events", [])
+        event_count += len(events)
+        yield from events
 
-    return all_events
+    logger.info(f"Retrieved {event_count} {event_name} events from region '{region}'")
 
 
-@timeit
-@aws_handle_regions
-def get_saml_role_events(
-    boto3_session: boto3.Session, region: str, lookback_hours: int
-) -> List[Dict[str, Any]]:
+def get_assume_role_events(
+    boto3_session: boto3.Session,
+    region: str,
+    lookback_hours: int,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
     """
-    Fetch CloudTrail AssumeRoleWithSAML events from the specified time period.
+    Fetch CloudTrail AssumeRole events from the specified time period.
 
-    Focuses specifically on SAML-based role assumption events.
+    Focuses specifically on standard AssumeRole events, excluding SAML and WebIdentity variants.
 
     :type boto3_session: boto3.Session
     :param boto3_session: The boto3 session to use for API calls
     :type region: str
     :param region: The AWS region to fetch events from
     :type lookback_hours: int
-    :param lookback_hours: Number of hours back to retrieve events from
-    :rtype: List[Dict[str, Any]]
-    :return: List of CloudTrail AssumeRoleWithSAML events
+    :param lookback_hours: Number of hours back to retrieve events from, if start_time is not given
+    :type start_time: datetime
+    :param start_time: Start of the time period. Optional.
+    :type end_time: datetime
+    :param end_time: End of the time period. Optional, defaults to now.
+    :rtype: Iterator[Dict[str, Any]]
+    :return: Iterator over the CloudTrail AssumeRole events, fetched page by page as it is consumed
     """
-    client = boto3_session.client(
-        "cloudtrail", region_name=region, config=get_botocore_config()
-    )
-
-    # Calculate time range
-    end_time = datetime.utcnow()
-    start_time = end_time - timedelta(hours=lookback_hours)
-
-    logger.info(
-        f"Fetching CloudTrail AssumeRoleWithSAML events for region '{region}' "
-        f"from {start_time} to {end_time} ({lookback_hours} hours)"
+    return _lookup_events(
+        boto3_session, region, "AssumeRole", lookback_hours, start_time, end_time
     )
 
-    paginator = client.get_paginator("lookup_events")
 
-    page_iterator = paginator.paginate(
-        LookupAttributes=[
-            {"AttributeKey": "EventName", "AttributeValue": "AssumeRoleWithSAML"}
-        ],
-        StartTime=start_time,
-        EndTime=end_time,
-        PaginationConfig={
-            "MaxItems": 10000,  # Reasonable limit to prevent excessive API calls
-            "PageSize": 50,  # CloudTrail API limit per page
-        },
-    )
+def get_saml_role_events(
+    boto3_session: boto3.Session,
+    region: str,
+    lookback_hours: int,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch CloudTrail AssumeRoleWithSAML events from the specified time period.
 
-    all_events = []
-    for page in page_iterator:
-        all_events.extend(page.get("Events", []))
+    Focuses specifically on SAML-based role assumption events.
 
-    logger.info(
-        f"Retrieved {len(all_events)} AssumeRoleWithSAML events from region '{region}'"
+    :type boto3_session: boto3.Session
+    :param boto3_session: The boto3 session to use for API calls
+    :type region: str
+    :param region: The AWS region to fetch events from
+    :type lookback_hours: int
+    :param lookback_hours: Number of hours back to retrieve events from, if start_time is not given
+    :type start_time: datetime
+    :param start_time: Start of the time period. Optional.
+    :type end_time: datetime
+    :param end_time: End of the time period. Optional, defaults to now.
+    :rtype: Iterator[Dict[str, Any]]
+    :return: Iterator over the CloudTrail AssumeRoleWithSAML events, fetched page by page as it is consumed
+    """
+    return _lookup_events(
+        boto3_session,
+        region,
+        "AssumeRoleWithSAML",
+        lookback_hours,
+        start_time,
+        end_time,
     )
 
-    return all_events
-
 
-@timeit
-@aws_handle_regions
 def get_web_identity_role_events(
-    boto3_session: boto3.Session, region: str, lookback_hours: int
-) -> List[Dict[str, Any]]:
+    boto3_session: boto3.Session,
+    region: str,
+    lookback_hours: int,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
     """
     Fetch CloudTrail AssumeRoleWithWebIdentity events from the specified time period.
 
@@ -152,51 +167,57 @@ def get_web_identity_role_events(
     :type region: str
     :param region: The AWS region to fetch events from
     :type lookback_hours: int
-    :param lookback_hours: Number of hours back to retrieve events from
-    :rtype: List[Dict[str, Any]]
-    :return: List of CloudTrail AssumeRoleWithWebIdentity events
+    :param lookback_hours: Number of hours back to retrieve events from, if start_time is not given
+    :type start_time: datetime
+    :param start_time: Start of the time period. Optional.
+    :type end_time: datetime
+    :param end_time: End of the time period. Optional, defaults to now.
+    :rtype: Iterator[Dict[str, Any]]
+    :return: Iterator over the CloudTrail AssumeRoleWithWebIdentity events, fetched page by page as it is consumed
     """
-    client = boto3_session.client(
-        "cloudtrail", region_name=region, config=get_botocore_config()
+    return _lookup_events(
+        boto3_session,
+        region,
+        "AssumeRoleWithWebIdentity",
+        lookback_hours,
+        start_time,
+        end_time,
     )
 
-    # Calculate time range
-    end_time = datetime.utcnow()
-    start_time = end_time - timedelta(hours=lookback_hours)
 
-    logger.info(
-        f"Fetching CloudTrail AssumeRoleWithWebIdentity events for region '{region}' "
-        f"from {start_time} to {end_time} ({lookback_hours} hours)"
-    )
-
-    paginator = client.get_paginator("lookup_events")
-
-    page_iterator = paginator.paginate(
-        LookupAttributes=[
-            {"AttributeKey": "EventName", "AttributeValue": "AssumeRoleWithWebIdentity"}
-        ],
-        StartTime=start_time,
-        EndTime=end_time,
-        PaginationConfig={
-            "MaxItems": 10000,  # Reasonable limit to prevent excessive API calls
-            "PageSize": 50,  # CloudTrail API limit per page
-        },
-    )
-
-    all_events = []
-    for page in page_iterator:
-        all_events.extend(page.get("Events", []))
-
-    logger.info(
-        f"Retrieved {len(all_events)} AssumeRoleWithWebIdentity events from region '{region}'"
-    )
+def _merge_role_assumption(
+    aggregated: Dict[tuple, Dict[str, Any]],
+    source_field: str,
+    role_assumption: Dict[str, Any],
+) -> None:
+    """
+    Adds an aggregated role assumption (or a single event in the same format) to the aggregate of its
+    (source, destination) pair.
+    """
+    key = (role_assumption[source_field], role_assumption["destination_principal_arn"])
+    existing = aggregated.get(key)
+    if existing is None:
+        aggregated[key] = dict(role_assumption)
+        return
 
-    return all_events
+    existing["times_used"] += role_assumption["times_used"]
+    # Handle None values safely for time comparisons
+    first_seen = role_assumption["first_seen_in_time_window"]
+    last_used = role_assumption["last_used"]
+    if first_seen and (
+        existing["first_seen_in_time_window"] is None
+        or first_seen < existing["first_seen_in_time_window"]
+    ):
+        existing["first_seen_in_time_window"] = first_seen
+    if last_used and (
+        existing["last_used"] is None or last_used > existing["last_used"]
+    ):
+        existing["last_used"] = last_used
 
 
 @timeit
 def transform_assume_role_events_to_role_assumptions(
-    events: List[Dict[str, Any]],
+    events: Iterable[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     """
     Transform raw CloudTrail AssumeRole events into aggregated role assumption relationships.
@@ -209,17 +230,17 @@ def transform_assume_role_events_to_role_assumptions(
     2. Aggregate events by (source_principal, destination_principal) pairs
     3. Return aggregated relationships ready for loading
 
-    :type events: List[Dict[str, Any]]
-    :param events: List of raw CloudTrail AssumeRole events from lookup_events API
+    :type events: Iterable[Dict[str, Any]]
+    :param events: Raw CloudTrail AssumeRole events from lookup_events API. They are aggregated as they are
+        consumed, so this can be the iterator returned by get_assume_role_events().
     :rtype: List[Dict[str, Any]]
     :return: List of aggregated role assumption relationships ready for loading
     """
     aggregated: Dict[tuple, Dict[str, Any]] = {}
-    logger.info(
-        f"Transforming {len(events)} CloudTrail AssumeRole events to role assumptions"
-    )
+    event_count = 0
 
     for event in events:
+        event_count += 1
 
         cloudtrail_event = json.loads(event["CloudTrailEvent"])
 
@@ -232,7 +253,6 @@ def transform_assume_role_events_to_role_assumptions(
 
         if cloudtrail_event.get("userIdentity", {}).get("arn"):
             source_principal = cloudtrail_event["userIdentity"]["arn"]
-            destination_principal = cloudtrail_event["requestParameters"]["roleArn"]
         else:
             logger.debug(
                 f"Skipping CloudTrail AssumeRole event due to missing UserIdentity.arn. Event: {event.get('EventId', 'unknown')}"
@@ -240,43 +260,33 @@ def transform_assume_role_events_to_role_assumptions(
             continue
 
         destination_principal = cloudtrail_event["requestParameters"]["roleArn"]
-
-        normalized_source_principal = _convert_assumed_role_arn_to_role_arn(
-            source_principal
-        )
-        normalized_destination_principal = _convert_assumed_role_arn_to_role_arn(
-            destination_principal
-        )
         event_time = event.get("EventTime")
 
-        key = (normalized_source_principal, normalized_destination_principal)
-
-        if key in aggregated:
-            aggregated[key]["times_used"] += 1
-            # Handle None values safely for time comparisons
-            if event_time:
-                existing_first = aggregated[key]["first_seen_in_time_window"]
-                existing_last = aggregated[key]["last_used"]
-
-                if existing_first is None or event_time < existing_first:
-                    aggregated[key]["first_seen_in_time_window"] = event_time
-                if existing_last is None or event_time > existing_last:
-                    aggregated[key]["last_used"] = event_time
-        else:
-            aggregated[key] = {
-                "source_principal_arn": normalized_source_principal,
-                "destination_principal_arn": normalized_destination_principal,
+        _merge_role_assumption(
+            aggregated,
+            "source_principal_arn",
+            {
+                "source_principal_arn": _convert_assumed_role_arn_to_role_arn(
+                    source_principal
+                ),
+                "destination_principal_arn": _convert_assumed_role_arn_to_role_arn(
+                    destination_principal
+                ),
                 "times_used": 1,
                 "first_seen_in_time_window": event_time,
                 "last_used": event_time,
-            }
+            },
+        )
 
+    logger.info(
+        f"Transformed {event_count} CloudTrail AssumeRole events into {len(aggregated)} role assumptions"
+    )
     return list(aggregated.values())
 
 
 @timeit
 def transform_saml_role_events_to_role_assumptions(
-    events: List[Dict[str, Any]],
+    events: Iterable[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     """
     Transform raw CloudTrail AssumeRoleWithSAML events into aggregated role assumption relationships.
@@ -289,19 +299,19 @@ def transform_saml_role_events_to_role_assumptions(
     2. Aggregate events by (source_principal, destination_principal) pairs
     3. Return aggregated relationships ready for loading
 
-    :type events: List[Dict[str, Any]]
-    :param events: List of raw CloudTrail AssumeRoleWithSAML events from lookup_events API
+    :type events: Iterable[Dict[str, Any]]
+    :param events: Raw CloudTrail AssumeRoleWithSAML events from lookup_events API. They are aggregated as they are
+        consumed, so this can be the iterator returned by get_saml_role_events().
     :rtype: List[Dict[str, Any]]
     :return: List of aggregated SAML role assumption relationships ready for loading.
              Each dict contains keys: source_principal_arn, destination_principal_arn,
              times_used, first_seen_in_time_window, last_used
     """
     aggregated: Dict[tuple, Dict[str, Any]] = {}
-    logger.info(
-        f"Transforming {len(events)} CloudTrail AssumeRoleWithSAML events to role assumptions"
-    )
+    event_count = 0
 
     for event in events:
+        event_count += 1
 
         cloudtrail_event = json.loads(event["CloudTrailEvent"])
 
@@ -328,34 +338,27 @@ def transform_saml_role_events_to_role_assumptions(
 
         event_time = event.get("EventTime")
 
-        key = (source_principal, destination_principal)
-
-        if key in aggregated:
-            aggregated[key]["times_used"] += 1
-            # Handle None values safely for time comparisons
-            if event_time:
-                existing_first = aggregated[key]["first_seen_in_time_window"]
-                existing_last = aggregated[key]["last_used"]
-
-                if existing_first is None or event_time < existing_first:
-                    aggregated[key]["first_seen_in_time_window"] = event_time
-                if existing_last is None or event_time > existing_last:
-                    aggregated[key]["last_used"] = event_time
-        else:
-            aggregated[key] = {
+        _merge_role_assumption(
+            aggregated,
+            "source_principal_arn",
+            {
                 "source_principal_arn": source_principal,
                 "destination_principal_arn": destination_principal,
                 "times_used": 1,
                 "first_seen_in_time_window": event_time,
                 "last_used": event_time,
-            }
+            },
+        )
 
+    logger.info(
+        f"Transformed {event_count} CloudTrail AssumeRoleWithSAML events into {len(aggregated)} role assumptions"
+    )
     return list(aggregated.values())
 
 
 @timeit
 def transform_web_identity_role_events_to_role_assumptions(
-    events: List[Dict[str, Any]],
+    events: Iterable[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     """
     Transform raw CloudTrail AssumeRoleWithWebIdentity events into aggregated role assumption relationships.
@@ -368,19 +371,19 @@ def transform_web_identity_role_events_to_role_assumptions(
     2. Aggregate events by (source_principal, destination_principal) pairs
     3. Return aggregated relationships ready for loading
 
-    :type events: List[Dict[str, Any]]
-    :param events: List of raw CloudTrail AssumeRoleWithWebIdentity events from lookup_events API
+    :type events: Iterable[Dict[str, Any]]
+    :param events: Raw CloudTrail AssumeRoleWithWebIdentity events from lookup_events API. They are aggregated as
+        they are consumed, so this can be the iterator returned by get_web_identity_role_events().
     :rtype: List[Dict[str, Any]]
     :return: List of aggregated WebIdentity role assumption relationships ready for loading.
              Each dict contains keys: source_repo_fullname, destination_principal_arn,
              times_used, first_seen_in_time_window, last_used
     """
     github_aggregated: Dict[tuple, Dict[str, Any]] = {}
-    logger.info(
-        f"Transforming {len(events)} CloudTrail AssumeRoleWithWebIdentity events to role assumptions"
-    )
+    event_count = 0
 
     for event in events:
+        event_count += 1
 
         cloudtrail_event = json.loads(event["CloudTrailEvent"])
 
@@ -410,37 +413,29 @@ def transform_web_identity_role_events_to_role_assumptions(
                     )
                     continue
 
-                github_repo = _extract_github_repo_from_username(user_name)
-                key = (github_repo, destination_principal)
-
-                if key in github_aggregated:
-                    github_aggregated[key]["times_used"] += 1
-                    # Handle None values safely for time comparisons
-                    if event_time:
-                        existing_first = github_aggregated[key][
-                            "first_seen_in_time_window"
-                        ]
-                        existing_last = github_aggregated[key]["last_used"]
-
-                        if existing_first is None or event_time < existing_first:
-                            github_aggregated[key][
-                                "first_seen_in_time_window"
-                            ] = event_time
-                        if existing_last is None or event_time > existing_last:
-                            github_aggregated[key]["last_used"] = event_time
-                else:
-                    github_aggregated[key] = {
-                        "source_repo_fullname": github_repo,
+                _merge_role_assumption(
+                    github_aggregated,
+                    "source_repo_fullname",
+                    {
+                        "source_repo_fullname": _extract_github_repo_from_username(
+                            user_name
+                        ),
                         "destination_principal_arn": destination_principal,
                         "times_used": 1,
                         "first_seen_in_time_window": event_time,
                         "last_used": event_time,
-                    }
+                    },
+                )
             else:
                 # Skip non-GitHub events for now
                 continue
         else:
             continue
+
+    logger.info(
+        f"Transformed {event_count} CloudTrail AssumeRoleWithWebIdentity events into "
+        f"{len(github_aggregated)} role assumptions"
+    )
     # Return aggregated relationships directly
     return list(github_aggregated.values())
 
@@ -653,6 +648,282 @@ def cleanup(
     cleanup_job.run(neo4j_session)
 
 
+def _get_matcher_field(matcher: Any) -> Tuple[str, str]:
+    """
+    Returns the node property and the data field of a node matcher with a single key.
+    """
+    ((node_property, prop_ref),) = asdict(matcher).items()
+    return node_property, prop_ref.name
+
+
+def _as_utc_datetime(value: Any) -> Optional[datetime]:
+    """
+    Returns an event time as returned by the CloudTrail API, or as read back from the graph, as an aware datetime.
+    """
+    if hasattr(value, "to_native"):
+        # neo4j.time.DateTime
+        value = value.to_native()
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@timeit
+def get_role_assumptions_in_window(
+    neo4j_session: neo4j.Session,
+    matchlink_schema: CartographyRelSchema,
+    current_aws_account_id: str,
+    window_start: datetime,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the role assumption relationships of the given MatchLink schema and account that are in the graph and
+    were last used after `window_start`, in the format returned by the transform functions.
+    """
+    source_property, source_field = _get_matcher_field(
+        matchlink_schema.source_node_matcher
+    )
+    target_property, target_field = _get_matcher_field(
+        matchlink_schema.target_node_matcher
+    )
+    query = f"""
+    MATCH (source:{matchlink_schema.source_node_label})-[r:{matchlink_schema.rel_label}]->
+    (target:{matchlink_schema.target_node_label})
+    WHERE r._sub_resource_label = 'AWSAccount' AND r._sub_resource_id = $AWS_ID
+    RETURN source.{source_property} AS source, target.{target_property} AS target, r.times_used AS times_used,
+    r.first_seen_in_time_window AS first_seen_in_time_window, r.last_used AS last_used
+    """
+    role_assumptions = []
+    for record in neo4j_session.run(query, AWS_ID=current_aws_account_id):
+        last_used = _as_utc_datetime(record["last_used"])
+        if last_used is None or last_used < window_start:
+            continue
+        first_seen = record["first_seen_in_time_window"]
+        role_assumptions.append(
+            {
+                source_field: record["source"],
+                target_field: record["target"],
+                "times_used": record["times_used"] or 0,
+                "first_seen_in_time_window": (
+                    first_seen.to_native()
+                    if hasattr(first_seen, "to_native")
+                    else first_seen
+                ),
+                "last_used": (
+                    record["last_used"].to_native()
+                    if hasattr(record["last_used"], "to_native")
+                    else record["last_used"]
+                ),
+            },
+        )
+    return role_assumptions
+
+
+def _get_high_water_mark_id(current_aws_account_id: str, rel_label: str) -> str:
+    return f"AWSAccount_{current_aws_account_id}_{rel_label}"
+
+
+@timeit
+def get_high_water_mark(
+    neo4j_session: neo4j.Session,
+    current_aws_account_id: str,
+    rel_label: str,
+    regions: List[str],
+) -> Optional[datetime]:
+    """
+    Returns the end of the time period whose events the previous sync of the given relationship type read for the
+    account, if it read the same regions.
+    """
+    query = """
+    MATCH (n:ModuleSyncMetadata{id: $Id})
+    RETURN n.events_end_time AS events_end_time, n.regions AS regions
+    """
+    record = neo4j_session.run(
+        query,
+        Id=_get_high_water_mark_id(current_aws_account_id, rel_label),
+    ).single()
+    if (
+        record is None
+        or record["events_end_time"] is None
+        or sorted(record["regions"] or []) != sorted(regions)
+    ):
+        return None
+    return datetime.fromtimestamp(record["events_end_time"], tz=timezone.utc)
+
+
+@timeit
+def set_high_water_mark(
+    neo4j_session: neo4j.Session,
+    current_aws_account_id: str,
+    rel_label: str,
+    regions: List[str],
+    events_end_time: Optional[datetime],
+    update_tag: int,
+) -> None:
+    """
+    Records the end of the time period whose events were read for the given relationship type, account and regions,
+    on the relationship type's ModuleSyncMetadata node. None records that the events of the regions were not all read,
+    so that the next sync reads the whole lookback period.
+    """
+    query = """
+    MERGE (n:ModuleSyncMetadata{id: $Id})
+    ON CREATE SET n:SyncMetadata, n.firstseen = timestamp()
+    SET n.syncedtype = $SyncedType,
+        n.grouptype = 'AWSAccount',
+        n.groupid = $AWS_ID,
+        n.regions = $Regions,
+        n.events_end_time = $EventsEndTime,
+        n.lastupdated = $UpdateTag
+    """
+    neo4j_session.run(
+        query,
+        Id=_get_high_water_mark_id(current_aws_account_id, rel_label),
+        SyncedType=rel_label,
+        AWS_ID=current_aws_account_id,
+        Regions=sorted(regions),
+        EventsEndTime=(
+            int(events_end_time.timestamp()) if events_end_time is not None else None
+        ),
+        UpdateTag=update_tag,
+    )
+
+
+@timeit
+@aws_handle_regions
+def _get_region_role_assumptions(
+    boto3_session: boto3.Session,
+    region: str,
+    get_events: Callable[..., Iterable[Dict[str, Any]]],
+    transform: Callable[[Iterable[Dict[str, Any]]], List[Dict[str, Any]]],
+    lookback_hours: int,
+    start_time: datetime,
+    end_time: datetime,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Returns the aggregated role assumptions of the region, wrapped in a list so that a region skipped by
+    `aws_handle_regions` (which returns an empty list) can be told apart from a region without events.
+    """
+    # Fetching and aggregating happen together, so a retry of the region starts over with a fresh aggregate.
+    return [
+        transform(
+            get_events(
+                boto3_session=boto3_session,
+                region=region,
+                lookback_hours=lookback_hours,
+                start_time=start_time,
+                end_time=end_time,
+            ),
+        ),
+    ]
+
+
+def _sync_role_assumptions(
+    neo4j_session: neo4j.Session,
+    boto3_session: boto3.Session,
+    regions: List[str],
+    current_aws_account_id: str,
+    update_tag: int,
+    lookback_hours: int,
+    get_events: Callable[..., Iterable[Dict[str, Any]]],
+    transform: Callable[[Iterable[Dict[str, Any]]], List[Dict[str, Any]]],
+    load: Callable[[neo4j.Session, List[Dict[str, Any]], str, int], None],
+    matchlink_schema: CartographyRelSchema,
+    incremental: bool = False,
+) -> int:
+    """
+    Fetches and aggregates the events of all regions concurrently, then loads the role assumptions aggregated over
+    all regions. LookupEvents is rate limited per region, so the pages of one region are read one after the other.
+
+    The end of the period that was read is stored as a high-water mark, unless a region was skipped. If `incremental`
+    is set, the previous sync read the same regions and its high-water mark is within the lookback period, only the
+    events after the high-water mark are read, and they are added to the relationships already in the graph that were
+    used within the lookback period. The others are left to the cleanup job. `times_used` then counts the uses since
+    `first_seen_in_time_window`, which may be before the lookback period. Incremental syncs only read events up to
+    `CLOUDTRAIL_EVENT_DELIVERY_DELAY` ago, so that the next one does not skip events delivered late.
+
+    :return: The number of role assumption relationships loaded
+    """
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(hours=lookback_hours)
+    # The delay only matters to the high-water mark that the next incremental sync starts from
+    end_time = now - CLOUDTRAIL_EVENT_DELIVERY_DELAY if incremental else now
+    rel_label = matchlink_schema.rel_label
+
+    start_time = window_start
+    if incremental:
+        high_water_mark = get_high_water_mark(
+            neo4j_session, current_aws_account_id, rel_label, regions
+        )
+        if high_water_mark is not None and high_water_mark >= window_start:
+            start_time = high_water_mark
+            logger.info(
+                f"Reading {rel_label} events after the high-water mark {high_water_mark} of the previous sync"
+            )
+        else:
+            incremental = False
+
+    region_role_assumptions: Dict[str, List[List[Dict[str, Any]]]] = {}
+    if start_time < end_time:
+        region_role_assumptions = get_data_for_regions(
+            _get_region_role_assumptions,
+            boto3_session,
+            regions,
+            "cloudtrail",
+            get_events,
+            transform,
+            lookback_hours,
+            start_time,
+            end_time,
+        )
+    skipped_regions = [
+        region
+        for region, role_assumptions in region_role_assumptions.items()
+        if not role_assumptions
+    ]
+
+    source_field = _get_matcher_field(matchlink_schema.source_node_matcher)[1]
+    aggregated: Dict[tuple, Dict[str, Any]] = {}
+    if incremental:
+        for role_assumption in get_role_assumptions_in_window(
+            neo4j_session,
+            matchlink_schema,
+            current_aws_account_id,
+            window_start,
+        ):
+            _merge_role_assumption(aggregated, source_field, role_assumption)
+    for wrapped_role_assumptions in region_role_assumptions.values():
+        for role_assumptions in wrapped_role_assumptions:
+            for role_assumption in role_assumptions:
+                _merge_role_assumption(aggregated, source_field, role_assumption)
+
+    load(
+        neo4j_session,
+        list(aggregated.values()),
+        current_aws_account_id,
+        update_tag,
+    )
+    if skipped_regions:
+        logger.warning(
+            f"Skipped the {rel_label} events of regions {skipped_regions}; the next sync reads the whole lookback "
+            f"period again.",
+        )
+    set_high_water_mark(
+        neo4j_session,
+        current_aws_account_id,
+        rel_label,
+        regions,
+        None if skipped_regions else end_time,
+        update_tag,
+    )
+    return len(aggregated)
+
+
 @timeit
 def sync_assume_role_events(
     neo4j_session: neo4j.Session,
@@ -666,9 +937,9 @@ def sync_assume_role_events(
     Sync CloudTrail management events to create ASSUMED_ROLE relationships.
 
     This function orchestrates the complete process:
-    1. Fetch CloudTrail management events region by region
-    2. Transform events into role assumption records per region
-    3. Load role assumption relationships into Neo4j for each region
+    1. Fetch CloudTrail management events of all regions concurrently, aggregating them as they are fetched
+    2. Merge the role assumption records of all regions
+    3. Load role assumption relationships into Neo4j
     4. Run cleanup after processing all regions
 
     The resulting graph contains direct relationships like:
@@ -701,43 +972,28 @@ def sync_assume_role_events(
         f"Syncing {len(regions)} regions with {lookback_hours} hour lookback period"
     )
 
-    total_role_assumptions = 0
-
-    # Process events region by region
-    for region in regions:
-        logger.info(f"Processing CloudTrail events for region {region}")
-
-        # Process AssumeRole events specifically
-        logger.info(f"Fetching AssumeRole events specifically for region {region}")
-        assume_role_events = get_assume_role_events(
-            boto3_session=boto3_session,
-            region=region,
-            lookback_hours=lookback_hours,
-        )
-
-        # Transform AssumeRole events to role assumptions
-        assume_role_assumptions = transform_assume_role_events_to_role_assumptions(
-            events=assume_role_events,
-        )
-
-        # Load AssumeRole assumptions for this region
-        load_role_assumptions(
-            neo4j_session=neo4j_session,
-            aggregated_role_assumptions=assume_role_assumptions,
-            current_aws_account_id=current_aws_account_id,
-            aws_update_tag=update_tag,
-        )
-        total_role_assumptions += len(assume_role_assumptions)
-        logger.info(
-            f"Loaded {len(assume_role_assumptions)} AssumeRole assumptions for region {region}"
-        )
+    total_role_assumptions = _sync_role_assumptions(
+        neo4j_session,
+        boto3_session,
+        regions,
+        current_aws_account_id,
+        update_tag,
+        lookback_hours,
+        get_assume_role_events,
+        transform_assume_role_events_to_role_assumptions,
+        load_role_assumptions,
+        AssumedRoleMatchLink(),
+        incremental=bool(
+            common_job_parameters.get("aws_cloudtrail_management_events_incremental")
+        ),
+    )
 
     # Run cleanup for stale relationships after processing all regions
     cleanup(neo4j_session, current_aws_account_id, update_tag)
 
     logger.info(
         f"CloudTrail management events sync completed successfully. "
-        f"Processed {total_role_assumptions} total role assumption events across {len(regions)} regions."
+        f"Loaded {total_role_assumptions} role assumption relationships across {len(regions)} regions."
     )
 
 
@@ -754,9 +1010,9 @@ def sync_saml_role_events(
     Sync CloudTrail SAML management events to create ASSUMED_ROLE_WITH_SAML relationships.
 
     This function orchestrates the complete process:
-    1. Fetch CloudTrail SAML management events region by region
-    2. Transform events into role assumption records per region
-    3. Load role assumption relationships into Neo4j for each region
+    1. Fetch CloudTrail SAML management events of all regions concurrently, aggregating them as they are fetched
+    2. Merge the role assumption records of all regions
+    3. Load role assumption relationships into Neo4j
 
     The resulting graph contains direct relationships like:
     (AWSRole)-[:ASSUMED_ROLE_WITH_SAML {times_used, first_seen_in_time_window, last_used, lastupdated}]->(AWSRole)
@@ -788,42 +1044,25 @@ def sync_saml_role_events(
         f"Syncing SAML events for {len(regions)} regions with {lookback_hours} hour lookback period"
     )
 
-    total_saml_role_assumptions = 0
-
-    # Process events region by region
-    for region in regions:
-        logger.info(f"Processing CloudTrail SAML events for region {region}")
-
-        # Process AssumeRoleWithSAML events specifically
-        logger.info(
-            f"Fetching AssumeRoleWithSAML events specifically for region {region}"
-        )
-        saml_role_events = get_saml_role_events(
-            boto3_session=boto3_session,
-            region=region,
-            lookback_hours=lookback_hours,
-        )
-
-        # Transform AssumeRoleWithSAML events to role assumptions
-        saml_role_assumptions = transform_saml_role_events_to_role_assumptions(
-            events=saml_role_events,
-        )
-
-        # Load SAML role assumptions for this region
-        load_saml_role_assumptions(
-            neo4j_session=neo4j_session,
-            aggregated_role_assumptions=saml_role_assumptions,
-            current_aws_account_id=current_aws_account_id,
-            aws_update_tag=update_tag,
-        )
-        total_saml_role_assumptions += len(saml_role_assumptions)
-        logger.info(
-            f"Loaded {len(saml_role_assumptions)} SAML role assumptions for region {region}"
-        )
+    total_saml_role_assumptions = _sync_role_assumptions(
+        neo4j_session,
+        boto3_session,
+        regions,
+        current_aws_account_id,
+        update_tag,
+        lookback_hours,
+        get_saml_role_events,
+        transform_saml_role_events_to_role_assumptions,
+        load_saml_role_assumptions,
+        AssumedRoleWithSAMLMatchLink(),
+        incremental=bool(
+            common_job_parameters.get("aws_cloudtrail_management_events_incremental")
+        ),
+    )
 
     logger.info(
         f"CloudTrail SAML management events sync completed successfully. "
-        f"Processed {total_saml_role_assumptions} total SAML role assumption events across {len(regions)} regions."
+        f"Loaded {total_saml_role_assumptions} SAML role assumption relationships across {len(regions)} regions."
     )
 
 
@@ -840,9 +1079,9 @@ def sync_web_identity_role_events(
     Sync CloudTrail WebIdentity management events to create ASSUMED_ROLE_WITH_WEB_IDENTITY relationships.
 
     This function orchestrates the complete process:
-    1. Fetch CloudTrail WebIdentity management events region by region
-    2. Transform events into role assumption records per region
-    3. Load role assumption relationships into Neo4j for each region
+    1. Fetch CloudTrail WebIdentity management events of all regions concurrently, aggregating them as they are fetched
+    2. Merge the role assumption records of all regions
+    3. Load role assumption relationships into Neo4j
 
     The resulting graph contains direct relationships like:
     (GitHubRepository)-[:ASSUMED_ROLE_WITH_WEB_IDENTITY {times_used, first_seen_in_time_window, last_used, lastupdated}]->(AWSRole)
@@ -874,44 +1113,26 @@ def sync_web_identity_role_events(
         f"Syncing WebIdentity events for {len(regions)} regions with {lookback_hours} hour lookback period"
     )
 
-    total_web_identity_role_assumptions = 0
-
-    # Process events region by region
-    for region in regions:
-        logger.info(f"Processing CloudTrail WebIdentity events for region {region}")
-
-        # Process AssumeRoleWithWebIdentity events specifically
-        logger.info(
-            f"Fetching AssumeRoleWithWebIdentity events specifically for region {region}"
-        )
-        web_identity_role_events = get_web_identity_role_events(
-            boto3_session=boto3_session,
-            region=region,
-            lookback_hours=lookback_hours,
-        )
-
-        # Transform AssumeRoleWithWebIdentity events to role assumptions
-        web_identity_role_assumptions = (
-            transform_web_identity_role_events_to_role_assumptions(
-                events=web_identity_role_events,
-            )
-        )
-
-        # Load WebIdentity role assumptions for this region
-        load_web_identity_role_assumptions(
-            neo4j_session=neo4j_session,
-            aggregated_role_assumptions=web_identity_role_assumptions,
-            current_aws_account_id=current_aws_account_id,
-            aws_update_tag=update_tag,
-        )
-        total_web_identity_role_assumptions += len(web_identity_role_assumptions)
-        logger.info(
-            f"Loaded {len(web_identity_role_assumptions)} WebIdentity role assumptions for region {region}"
-        )
+    total_web_identity_role_assumptions = _sync_role_assumptions(
+        neo4j_session,
+        boto3_session,
+        regions,
+        current_aws_account_id,
+        update_tag,
+        lookback_hours,
+        get_web_identity_role_events,
+        transform_web_identity_role_events_to_role_assumptions,
+        load_web_identity_role_assumptions,
+        GitHubRepoAssumeRoleWithWebIdentityMatchLink(),
+        incremental=bool(
+            common_job_parameters.get("aws_cloudtrail_management_events_incremental")
+        ),
+    )
 
     logger.info(
         f"CloudTrail WebIdentity management events sync completed successfully. "
-        f"Processed {total_web_identity_role_assumptions} total WebIdentity role assumption events across {len(regions)} regions."
+        f"Loaded {total_web_identity_role_assumptions} WebIdentity role assumption relationships across "
+        f"{len(regions)} regions."
     )
 
 
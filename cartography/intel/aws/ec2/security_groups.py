@@ -9,6 +9,7 @@ import neo4j
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.intel.aws.util.regions import iter_data_for_regions
 from cartography.models.aws.ec2.security_group_rules import IpPermissionInboundSchema
 from cartography.models.aws.ec2.security_group_rules import IpRangeSchema
 from cartography.models.aws.ec2.security_group_rules import IpRuleSchema
@@ -213,13 +214,15 @@ def sync_ec2_security_groupinfo(
     update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
-    for region in regions:
+    data_by_region = iter_data_for_regions(
+        get_ec2_security_group_data, boto3_session, regions, "ec2"
+    )
+    for region, data in data_by_region:
         logger.info(
             "Syncing EC2 security groups for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_ec2_security_group_data(boto3_session, region)
         transformed = transform_ec2_security_group_data(data)
         load_ec2_security_groupinfo(
             neo4j_session,
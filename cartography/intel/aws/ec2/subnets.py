@@ -6,6 +6,7 @@ import neo4j
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.intel.aws.util.regions import iter_data_for_regions
 from cartography.models.aws.ec2.auto_scaling_groups import (
     EC2SubnetAutoScalingGroupSchema,
 )
@@ -87,13 +88,15 @@ def sync_subnets(
     update_tag: int,
     common_job_parameters: dict[str, Any],
 ) -> None:
-    for region in regions:
+    data_by_region = iter_data_for_regions(
+        get_subnet_data, boto3_session, regions, "ec2"
+    )
+    for region, data in data_by_region:
         logger.info(
             "Syncing EC2 subnets for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_subnet_data(boto3_session, region)
         transformed = transform_subnet_data(data)
         load_subnets(
             neo4j_session,
@@ -9,6 +9,7 @@ import neo4j
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
 from cartography.intel.aws.util.arns import build_arn
+from cartography.intel.aws.util.regions import iter_data_for_regions
 from cartography.models.aws.ec2.volumes import EBSVolumeSchema
 from cartography.util import aws_handle_regions
 from cartography.util import timeit
@@ -113,13 +114,13 @@ def sync_ebs_volumes(
     update_tag: int,
     common_job_parameters: Dict[str, Any],
 ) -> None:
-    for region in regions:
+    data_by_region = iter_data_for_regions(get_volumes, boto3_session, regions, "ec2")
+    for region, data in data_by_region:
         logger.debug(
             "Syncing volumes for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_volumes(boto3_session, region)
         transformed_data = transform_volumes(data, region, current_aws_account_id)
         load_volumes(
             neo4j_session,
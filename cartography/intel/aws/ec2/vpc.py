@@ -6,6 +6,7 @@ from typing import List
 import boto3
 import neo4j
 
+from cartography.intel.aws.util.regions import iter_data_for_regions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -190,12 +191,12 @@ def sync_vpc(
     update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
-    for region in regions:
+    data_by_region = iter_data_for_regions(get_ec2_vpcs, boto3_session, regions, "ec2")
+    for region, data in data_by_region:
         logger.info(
             "Syncing EC2 VPC for region '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
-        data = get_ec2_vpcs(boto3_session, region)
         load_ec2_vpcs(neo4j_session, data, region, current_aws_account_id, update_tag)
     cleanup_ec2_vpcs(neo4j_session, common_job_parameters)
@@ -1,20 +1,29 @@
+import copy
 import enum
 import json
 import logging
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
 from typing import Tuple
 
 import boto3
+import botocore
 import neo4j
 
+from cartography.client.core.tx import load
+from cartography.intel.aws.ec2.util import get_botocore_config
 from cartography.intel.aws.permission_relationships import parse_statement_node
 from cartography.intel.aws.permission_relationships import principal_allowed_on_resource
+from cartography.models.aws.iam.policy import AWSPolicySchema
+from cartography.models.aws.iam.policy_statement import AWSPolicyStatementSchema
 from cartography.stats import get_stats_client
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
+from cartography.util import to_asynchronous
+from cartography.util import to_synchronous
 
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
@@ -70,22 +79,159 @@ def get_group_membership_data(
         return {}
 
 
+def _get_inline_policies(
+    client: botocore.client.BaseClient,
+    principal_type: str,
+    principal_name: str,
+) -> Dict[str, Any]:
+    """
+    Returns the statements of each inline policy of the given principal, by policy name.
+    :param principal_type: "User", "Group" or "Role"
+    """
+    operation = principal_type.lower()
+    name_kwargs = {f"{principal_type}Name": principal_name}
+    policy_names: List[str] = []
+    paginator = client.get_paginator(f"list_{operation}_policies")
+    for page in paginator.paginate(**name_kwargs):
+        policy_names.extend(page["PolicyNames"])
+    get_policy = getattr(client, f"get_{operation}_policy")
+    return {
+        policy_name: get_policy(PolicyName=policy_name, **name_kwargs)[
+            "PolicyDocument"
+        ]["Statement"]
+        for policy_name in policy_names
+    }
+
+
+def _get_attached_policy_arns(
+    client: botocore.client.BaseClient,
+    principal_type: str,
+    principal_name: str,
+) -> List[str]:
+    """
+    Returns the ARNs of the managed policies attached to the given principal.
+    :param principal_type: "User", "Group" or "Role"
+    """
+    paginator = client.get_paginator(
+        f"list_attached_{principal_type.lower()}_policies",
+    )
+    policy_arns: List[str] = []
+    for page in paginator.paginate(**{f"{principal_type}Name": principal_name}):
+        policy_arns.extend(p["PolicyArn"] for p in page["AttachedPolicies"])
+    return policy_arns
+
+
+def _get_managed_policy_statements(
+    client: botocore.client.BaseClient,
+    policy_arn: str,
+) -> Any:
+    policy = client.get_policy(PolicyArn=policy_arn)["Policy"]
+    version = client.get_policy_version(
+        PolicyArn=policy_arn,
+        VersionId=policy["DefaultVersionId"],
+    )
+    return version["PolicyVersion"]["Document"]["Statement"]
+
+
+def _get_principal_details(
+    client: botocore.client.BaseClient,
+    principal_list: List[Dict],
+    principal_type: str,
+    get_details: Callable[[botocore.client.BaseClient, str, str], Any],
+) -> Dict[str, Any]:
+    """
+    Calls `get_details(client, principal_type, principal_name)` for all principals concurrently, retrying throttled
+    calls with backoff, and returns the results by principal ARN. IAM is a global service, so this is the only way to
+    speed up fetching details of many principals. Principals deleted during the sync are skipped.
+    """
+
+    async def _get_principal_detail(principal: Dict) -> Tuple[str, Any]:
+        name = principal[f"{principal_type}Name"]
+        try:
+            detail = await to_asynchronous(get_details, client, principal_type, name)
+        except client.exceptions.NoSuchEntityException:
+            logger.warning(
+                f"Could not get policies for {principal_type.lower()} {name} due to NoSuchEntityException; skipping.",
+            )
+            return principal["Arn"], None
+        return principal["Arn"], detail
+
+    details = to_synchronous(
+        *[_get_principal_detail(principal) for principal in principal_list],
+    )
+    return {arn: detail for arn, detail in details if detail is not None}
+
+
+def _get_principal_policy_data(
+    boto3_session: boto3.session.Session,
+    principal_list: List[Dict],
+    principal_type: str,
+) -> Dict:
+    # Unlike resources, boto3 clients are thread-safe.
+    client = boto3_session.client("iam", config=get_botocore_config())
+    return _get_principal_details(
+        client,
+        principal_list,
+        principal_type,
+        _get_inline_policies,
+    )
+
+
+def _get_principal_managed_policy_data(
+    boto3_session: boto3.session.Session,
+    principal_list: List[Dict],
+    principal_type: str,
+) -> Dict:
+    client = boto3_session.client("iam", config=get_botocore_config())
+    attached_policy_arns = _get_principal_details(
+        client,
+        principal_list,
+        principal_type,
+        _get_attached_policy_arns,
+    )
+
+    # Managed policies are usually attached to many principals, so fetch each of them only once.
+    async def _get_policy_statements(policy_arn: str) -> Tuple[str, Any]:
+        try:
+            statements = await to_asynchronous(
+                _get_managed_policy_statements,
+                client,
+                policy_arn,
+            )
+        except client.exceptions.NoSuchEntityException:
+            logger.warning(
+                f"Could not get managed policy {policy_arn} due to NoSuchEntityException; skipping.",
+            )
+            return policy_arn, None
+        return policy_arn, statements
+
+    unique_policy_arns = {
+        policy_arn
+        for policy_arns in attached_policy_arns.values()
+        for policy_arn in policy_arns
+    }
+    policy_statements = dict(
+        to_synchronous(
+            *[_get_policy_statements(policy_arn) for policy_arn in unique_policy_arns],
+        ),
+    )
+    # transform_policy_data() modifies the statements in place, so every principal gets its own copy.
+    return {
+        principal_arn: {
+            policy_arn: copy.deepcopy(policy_statements[policy_arn])
+            for policy_arn in policy_arns
+            if policy_statements[policy_arn] is not None
+        }
+        for principal_arn, policy_arns in attached_policy_arns.items()
+    }
+
+
 @timeit
 def get_group_policy_data(
     boto3_session: boto3.session.Session,
     group_list: List[Dict],
 ) -> Dict:
-    resource_client = boto3_session.resource("iam")
-    policies = {}
-    for group in group_list:
-        name = group["GroupName"]
-        arn = group["Arn"]
-        resource_group = resource_client.Group(name)
-        policies[arn] = policies[arn] = {
-            p.name: p.policy_document["Statement"]
-            for p in resource_group.policies.all()
-        }
-    return policies
+    return _get_principal_policy_data(boto3_session, group_list, "Group")
 
 
 @timeit
@@ -93,17 +239,7 @@ def get_group_managed_policy_data(
     boto3_session: boto3.session.Session,
     group_list: List[Dict],
 ) -> Dict:
-    resource_client = boto3_session.resource("iam")
-    policies = {}
-    for group in group_list:
-        name = group["GroupName"]
-        group_arn = group["Arn"]
-        resource_group = resource_client.Group(name)
-        policies[group_arn] = {
-            p.arn: p.default_version.document["Statement"]
-            for p in resource_group.attached_policies.all()
-        }
-    return policies
+    return _get_principal_managed_policy_data(boto3_session, group_list, "Group")
 
 
 @timeit
@@ -111,22 +247,7 @@ def get_user_policy_data(
     boto3_session: boto3.session.Session,
     user_list: List[Dict],
 ) -> Dict:
-    resource_client = boto3_session.resource("iam")
-    policies = {}
-    for user in user_list:
-        name = user["UserName"]
-        arn = user["Arn"]
-        resource_user = resource_client.User(name)
-        try:
-            policies[arn] = {
-                p.name: p.policy_document["Statement"]
-                for p in resource_user.policies.all()
-            }
-        except resource_client.meta.client.exceptions.NoSuchEntityException:
-            logger.warning(
-                f"Could not get policies for user {name} due to NoSuchEntityException; skipping.",
-            )
-    return policies
+    return _get_principal_policy_data(boto3_session, user_list, "User")
 
 
 @timeit
@@ -134,22 +255,7 @@ def get_user_managed_policy_data(
     boto3_session: boto3.session.Session,
     user_list: List[Dict],
 ) -> Dict:
-    resource_client = boto3_session.resource("iam")
-    policies = {}
-    for user in user_list:
-        name = user["UserName"]
-        user_arn = user["Arn"]
-        resource_user = resource_client.User(name)
-        try:
-            policies[user_arn] = {
-                p.arn: p.default_version.document["Statement"]
-                for p in resource_user.attached_policies.all()
-            }
-        except resource_client.meta.client.exceptions.NoSuchEntityException:
-            logger.warning(
-                f"Could not get policies for user {name} due to NoSuchEntityException; skipping.",
-            )
-    return policies
+    return _get_principal_managed_policy_data(boto3_session, user_list, "User")
 
 
 @timeit
@@ -157,22 +263,7 @@ def get_role_policy_data(
     boto3_session: boto3.session.Session,
     role_list: List[Dict],
 ) -> Dict:
-    resource_client = boto3_session.resource("iam")
-    policies = {}
-    for role in role_list:
-        name = role["RoleName"]
-        arn = role["Arn"]
-        resource_role = resource_client.Role(name)
-        try:
-            policies[arn] = {
-                p.name: p.policy_document["Statement"]
-                for p in resource_role.policies.all()
-            }
-        except resource_client.meta.client.exceptions.NoSuchEntityException:
-            logger.warning(
-                f"Could not get policies for role {name} due to NoSuchEntityException; skipping.",
-            )
-    return policies
+    return _get_principal_policy_data(boto3_session, role_list, "Role")
 
 
 @timeit
@@ -180,22 +271,7 @@ def get_role_managed_policy_data(
     boto3_session: boto3.session.Session,
     role_list: List[Dict],
 ) -> Dict:
-    resource_client = boto3_session.resource("iam")
-    policies = {}
-    for role in role_list:
-        name = role["RoleName"]
-        role_arn = role["Arn"]
-        resource_role = resource_client.Role(name)
-        try:
-            policies[role_arn] = {
-                p.arn: p.default_version.document["Statement"]
-                for p in resource_role.attached_policies.all()
-            }
-        except resource_client.meta.client.exceptions.NoSuchEntityException:
-            logger.warning(
-                f"Could not get policies for role {name} due to NoSuchEntityException; skipping.",
-            )
-    return policies
+    return _get_principal_managed_policy_data(boto3_session, role_list, "Role")
 
 
 @timeit
@@ -731,16 +807,19 @@ def load_policy_statements(
     ).consume()
 
 
-@timeit
-def load_policy_data(
-    neo4j_session: neo4j.Session,
+def transform_policy_data_for_load(
     principal_policy_map: Dict[str, Dict[str, Any]],
     policy_type: str,
-    aws_update_tag: int,
-) -> None:
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Flattens the output of transform_policy_data() into one list of policies, with one item per policy and principal,
+    and one list of statements, with one item per statement, for loading with AWSPolicySchema and
+    AWSPolicyStatementSchema.
+    """
+    policies: List[Dict] = []
+    statements: Dict[str, Dict] = {}
     for principal_arn, policy_statement_map in principal_policy_map.items():
-        logger.debug(f"Loading policies for principal {principal_arn}")
-        for policy_key, statements in policy_statement_map.items():
+        for policy_key, policy_statements in policy_statement_map.items():
             policy_name = (
                 policy_key
                 if policy_type == PolicyType.inline.value
@@ -755,21 +834,49 @@ def load_policy_data(
                 if policy_type == PolicyType.inline.value
                 else policy_key
             )
-            load_policy(
-                neo4j_session,
-                policy_id,
-                policy_name,
-                policy_type,
-                principal_arn,
-                aws_update_tag,
-            )
-            load_policy_statements(
-                neo4j_session,
-                policy_id,
-                policy_name,
-                statements,
-                aws_update_tag,
+            policies.append(
+                {
+                    "id": policy_id,
+                    "name": policy_name,
+                    "type": policy_type,
+                    "principal_arn": principal_arn,
+                },
             )
+            # A managed policy attached to several principals has the same statements each time.
+            for statement in policy_statements:
+                statements.setdefault(
+                    statement["id"],
+                    {**statement, "policy_id": policy_id},
+                )
+    return policies, list(statements.values())
+
+
+@timeit
+def load_policy_data(
+    neo4j_session: neo4j.Session,
+    principal_policy_map: Dict[str, Dict[str, Any]],
+    policy_type: str,
+    aws_update_tag: int,
+) -> None:
+    policies, statements = transform_policy_data_for_load(
+        principal_policy_map,
+        policy_type,
+    )
+    logger.debug(
+        f"Loading {len(policies)} {policy_type} policies with {len(statements)} statements",
+    )
+    load(
+        neo4j_session,
+        AWSPolicySchema(),
+        policies,
+        lastupdated=aws_update_tag,
+    )
+    load(
+        neo4j_session,
+        AWSPolicyStatementSchema(),
+        statements,
+        lastupdated=aws_update_tag,
+    )
 
 
 @timeit
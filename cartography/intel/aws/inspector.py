@@ -1,4 +1,8 @@
 import logging
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
 from typing import Iterator
@@ -12,6 +16,7 @@ import neo4j
 from cartography.client.core.tx import load
 from cartography.client.core.tx import load_matchlinks
 from cartography.graph.job import GraphJob
+from cartography.intel.aws.util.regions import create_client
 from cartography.models.aws.inspector.findings import AWSInspectorFindingSchema
 from cartography.models.aws.inspector.findings import InspectorFindingToPackageMatchLink
 from cartography.models.aws.inspector.packages import AWSInspectorPackageSchema
@@ -54,6 +59,17 @@ AWS_INSPECTOR_REGIONS = {
 
 BATCH_SIZE = 1000
 
+# Maximum number of transformed batches of findings waiting to be loaded when the findings of several accounts and
+# regions are fetched concurrently. The pipeline holds at most this many batches plus one per worker.
+MAX_QUEUED_BATCHES = 8
+
+# A transformed batch of findings: the region, the account, and the output of transform_inspector_findings().
+FindingsBatch = Tuple[
+    str,
+    str,
+    Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, str]]],
+]
+
 
 @aws_handle_regions
 def get_member_accounts(
@@ -82,7 +98,7 @@ def get_inspector_findings(
     only fetch those in ACTIVE or SUPPRESSED statuses.
     Run the query in batches of 1000 findings and return an iterator to fetch the results.
     """
-    client = session.client("inspector2", region_name=region)
+    client = create_client(session, "inspector2", region_name=region)
     logger.info(
         f"Getting findings in batches of {BATCH_SIZE} for account {account_id} in region {region}"
     )
@@ -289,6 +305,43 @@ def cleanup(
     )
 
 
+def _load_findings_batch(
+    neo4j_session: neo4j.Session,
+    region: str,
+    account_id: str,
+    transformed: Tuple[
+        List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, str]]
+    ],
+    update_tag: int,
+    current_aws_account_id: str,
+) -> None:
+    finding_data, package_data, finding_to_package_map = transformed
+    logger.info(f"Loading {len(finding_data)} findings from account {account_id}")
+    load_inspector_findings(
+        neo4j_session,
+        finding_data,
+        region,
+        update_tag,
+        current_aws_account_id,
+    )
+    logger.info(f"Loading {len(package_data)} packages")
+    load_inspector_packages(
+        neo4j_session,
+        package_data,
+        update_tag,
+        current_aws_account_id,
+    )
+    logger.info(
+        f"Loading {len(finding_to_package_map)} finding to package relationships"
+    )
+    load_inspector_finding_to_package_match_links(
+        neo4j_session,
+        finding_to_package_map,
+        update_tag,
+        current_aws_account_id,
+    )
+
+
 def _sync_findings_for_account(
     neo4j_session: neo4j.Session,
     boto3_session: boto3.session.Session,
@@ -305,33 +358,103 @@ def _sync_findings_for_account(
         logger.info(f"No findings to sync for account {account_id} in region {region}")
         return
     for f_batch in findings:
-        finding_data, package_data, finding_to_package_map = (
-            transform_inspector_findings(f_batch)
-        )
-        logger.info(f"Loading {len(finding_data)} findings from account {account_id}")
-        load_inspector_findings(
+        _load_findings_batch(
             neo4j_session,
-            finding_data,
             region,
+            account_id,
+            transform_inspector_findings(f_batch),
             update_tag,
             current_aws_account_id,
         )
-        logger.info(f"Loading {len(package_data)} packages")
-        load_inspector_packages(
-            neo4j_session,
-            package_data,
-            update_tag,
-            current_aws_account_id,
-        )
-        logger.info(
-            f"Loading {len(finding_to_package_map)} finding to package relationships"
-        )
-        load_inspector_finding_to_package_match_links(
-            neo4j_session,
-            finding_to_package_map,
-            update_tag,
-            current_aws_account_id,
-        )
+
+
+def _fetch_findings_for_account(
+    boto3_session: boto3.session.Session,
+    region: str,
+    account_id: str,
+    batches: "queue.Queue[FindingsBatch]",
+    stop: threading.Event,
+) -> None:
+    """
+    Fetches and transforms the findings for a given account in a given region, and puts each transformed batch on
+    the queue. Blocks while the queue is full, and returns early once `stop` is set.
+    """
+    findings = get_inspector_findings(boto3_session, region, account_id)
+    if not findings:
+        logger.info(f"No findings to sync for account {account_id} in region {region}")
+        return
+    for f_batch in findings:
+        if stop.is_set():
+            return
+        item = (region, account_id, transform_inspector_findings(f_batch))
+        while True:
+            try:
+                batches.put(item, timeout=1)
+                break
+            except queue.Full:
+                if stop.is_set():
+                    return
+
+
+def _sync_findings_pipelined(
+    neo4j_session: neo4j.Session,
+    boto3_session: boto3.session.Session,
+    accounts_by_region: Dict[str, List[str]],
+    update_tag: int,
+    current_aws_account_id: str,
+    workers: int,
+) -> None:
+    """
+    Fetches and transforms the findings of up to `workers` (account, region) pairs at a time, while this thread loads
+    the transformed batches as they come. At most MAX_QUEUED_BATCHES batches wait to be loaded, so fetching pauses
+    when loading falls behind.
+    """
+    batches: "queue.Queue[FindingsBatch]" = queue.Queue(maxsize=MAX_QUEUED_BATCHES)
+    stop = threading.Event()
+    # Interleave the regions so that concurrent fetches spread over the regional Inspector endpoints.
+    pairs = []
+    for i in range(max((len(a) for a in accounts_by_region.values()), default=0)):
+        for region, account_ids in accounts_by_region.items():
+            if i < len(account_ids):
+                pairs.append((region, account_ids[i]))
+
+    executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="inspector",
+    )
+    try:
+        pending: Set[Future] = {
+            executor.submit(
+                _fetch_findings_for_account,
+                boto3_session,
+                region,
+                account_id,
+                batches,
+                stop,
+            )
+            for region, account_id in pairs
+        }
+        while pending or not batches.empty():
+            try:
+                region, account_id, transformed = batches.get(timeout=0.1)
+            except queue.Empty:
+                done = {future for future in pending if future.done()}
+                for future in done:
+                    # Raises the error of a failed fetch.
+                    future.result()
+                pending -= done
+                continue
+            _load_findings_batch(
+                neo4j_session,
+                region,
+                account_id,
+                transformed,
+                update_tag,
+                current_aws_account_id,
+            )
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 @timeit
@@ -346,7 +469,9 @@ def sync(
     inspector_regions = [
         region for region in regions if region in AWS_INSPECTOR_REGIONS
     ]
+    workers: int = common_job_parameters.get("aws_inspector_workers") or 1
 
+    accounts_by_region: Dict[str, List[str]] = {}
     for region in inspector_regions:
         logger.info(
             f"Syncing AWS Inspector findings delegated to account {current_aws_account_id} and region {region}",
@@ -355,6 +480,9 @@ def sync(
         # the current host account may not be considered a "member", but we still fetch its findings
         member_accounts.append(current_aws_account_id)
         logger.info(f"Member accounts to be synced: {member_accounts}")
+        if workers > 1:
+            accounts_by_region[region] = member_accounts
+            continue
         for account_id in member_accounts:
             _sync_findings_for_account(
                 neo4j_session,
@@ -364,7 +492,17 @@ def sync(
                 update_tag,
                 current_aws_account_id,
             )
-        common_job_parameters["ACCOUNT_ID"] = current_aws_account_id
-        common_job_parameters["UPDATE_TAG"] = update_tag
 
+    if accounts_by_region:
+        _sync_findings_pipelined(
+            neo4j_session,
+            boto3_session,
+            accounts_by_region,
+            update_tag,
+            current_aws_account_id,
+            workers,
+        )
+
+    common_job_parameters["ACCOUNT_ID"] = current_aws_account_id
+    common_job_parameters["UPDATE_TAG"] = update_tag
     cleanup(neo4j_session, common_job_parameters)
@@ -9,6 +9,8 @@ import neo4j
 
 from cartography.client.core.tx import load
 from cartography.graph.job import GraphJob
+from cartography.intel.aws.util.regions import create_client
+from cartography.intel.aws.util.regions import iter_data_for_regions
 from cartography.models.aws.lambda_function.alias import AWSLambdaFunctionAliasSchema
 from cartography.models.aws.lambda_function.event_source_mapping import (
     AWSLambdaEventSourceMappingSchema,
@@ -297,15 +299,20 @@ def sync(
     update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
-    for region in regions:
+    data_by_region = iter_data_for_regions(
+        get_lambda_data,
+        boto3_session,
+        regions,
+        "lambda",
+    )
+    for region, data in data_by_region:
         logger.info(
             "Syncing Lambda for region in '%s' in account '%s'.",
             region,
             current_aws_account_id,
         )
 
-        # Get and load core lambda functions
-        data = get_lambda_data(boto3_session, region)
+        # Load core lambda functions
         transformed_data = transform_lambda_functions(data, region)
         load_lambda_functions(
             neo4j_session,
@@ -315,8 +322,8 @@ def sync(
             update_tag,
         )
 
-        # Create Lambda client for sub-entity requests
-        client = boto3_session.client("lambda", region_name=region)
+        # Create Lambda client for sub-entity requests. The next regions are being fetched on the same session.
+        client = create_client(boto3_session, "lambda", region_name=region)
 
         # Sync all sub-entities
         sync_aliases(
@@ -1,11 +1,20 @@
+import hashlib
+import json
 import logging
+import multiprocessing
 import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from string import Template
 from typing import Any
 from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Pattern
+from typing import Set
 from typing import Tuple
 
 import boto3
@@ -178,6 +187,256 @@ def principal_allowed_on_resource(
     return granted
 
 
+# Characters that have a special meaning in the regexes built by `compile_regex()`.
+_REGEX_SPECIAL_CHARS = set("\\.^$*+?{}[]|()")
+_REGEX_QUANTIFIERS = set("*+?{")
+
+
+def _literal_prefix(source: str) -> Tuple[str, bool]:
+    """Return the lowercased literal text that every string matched by the regex `source` must start with, and
+    whether the regex matches nothing but that text.
+
+    Arguments:
+        source {str} -- The source of a regex built by `compile_regex()`
+
+    Returns:
+        [(str, bool)] -- (prefix, is_literal)
+    """
+    if "|" in source:
+        # An alternation can match strings that don't start with the text before it.
+        return "", False
+    prefix: List[str] = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\" and source[i + 1 : i + 2] == ".":
+            prefix.append(".")
+            i += 2
+            continue
+        if char in _REGEX_SPECIAL_CHARS:
+            if char in _REGEX_QUANTIFIERS and prefix:
+                # The quantifier applies to the last character, which may therefore be missing or repeated.
+                prefix.pop()
+            return _lower_ascii("".join(prefix)), False
+        prefix.append(char)
+        i += 1
+    literal = "".join(prefix)
+    return _lower_ascii(literal), literal.isascii()
+
+
+def _lower_ascii(text: str) -> str:
+    # Lowercasing only matches case-insensitive regex matching for ASCII text; AWS ARNs and actions are ASCII.
+    return text.lower() if text.isascii() else ""
+
+
+def _arn_head(arn: str) -> str:
+    """Return the `arn:partition:service:region:account` part of an ARN, or the whole string if it has fewer parts."""
+    return ":".join(arn.split(":", 5)[:5])
+
+
+class ResourceArnIndex:
+    """Indexes a list of resource ARNs so that an IAM resource clause can be matched against all of them at once.
+
+    ARNs are grouped by partition, service, region and account. A literal clause is a single dictionary lookup; a
+    wildcard clause is only tested against the ARNs whose group and text start with the literal part of the clause
+    before its first wildcard. Results are cached per clause, since the same clauses appear in the policies of many
+    principals.
+    """
+
+    def __init__(self, resource_arns: List[str]):
+        self.resource_arns = resource_arns
+        self._lower_arns = [arn.lower() for arn in resource_arns]
+        self._all = frozenset(range(len(resource_arns)))
+        self._by_arn: Dict[str, List[int]] = {}
+        self._by_head: Dict[str, List[int]] = {}
+        for i, arn in enumerate(self._lower_arns):
+            self._by_arn.setdefault(arn, []).append(i)
+            self._by_head.setdefault(_arn_head(arn), []).append(i)
+        self._cache: Dict[str, FrozenSet[int]] = {}
+
+    def match(self, clause: Any) -> FrozenSet[int]:
+        """Return the indexes of the ARNs that the clause (a string or a regex from `compile_regex()`) matches."""
+        pattern = compile_regex(clause)
+        source = pattern.pattern
+        result = self._cache.get(source)
+        if result is not None:
+            return result
+        prefix, is_literal = _literal_prefix(source)
+        if source == ".*":
+            result = self._all
+        elif is_literal:
+            result = frozenset(self._by_arn.get(prefix, ()))
+        else:
+            result = frozenset(
+                i
+                for i in self._candidates(prefix)
+                if pattern.fullmatch(self.resource_arns[i])
+            )
+        self._cache[source] = result
+        return result
+
+    def _candidates(self, prefix: str) -> Iterable[int]:
+        if not prefix:
+            return self._all
+        if prefix.count(":") >= 5:
+            groups: Iterable[List[int]] = [self._by_head.get(_arn_head(prefix), [])]
+        else:
+            groups = (
+                indexes
+                for head, indexes in self._by_head.items()
+                if head.startswith(prefix)
+            )
+        return [
+            i
+            for group in groups
+            for i in group
+            if self._lower_arns[i].startswith(prefix)
+        ]
+
+
+class PermissionEvaluator:
+    """Evaluates which of a list of resources the policies of a principal grant a list of permissions on, for all
+    resources in one pass. This gives the same result as calling `principal_allowed_on_resource()` for each resource,
+    but each distinct clause, statement and policy is evaluated only once per evaluator instead of once per
+    (principal, resource) pair.
+    """
+
+    def __init__(self, resource_arns: List[str], permissions: List[str]):
+        if not isinstance(permissions, list):
+            raise ValueError("permissions is not a list")
+        self.permissions = permissions
+        self.resources = ResourceArnIndex(resource_arns)
+        self._all_permissions = frozenset(range(len(permissions)))
+        self._action_cache: Dict[str, FrozenSet[int]] = {}
+        self._statement_cache: Dict[Tuple, Tuple[FrozenSet[int], FrozenSet[int]]] = {}
+        self._policy_cache: Dict[Tuple, Tuple[FrozenSet[int], FrozenSet[int]]] = {}
+
+    def allowed_resources(self, policies: Dict) -> Set[int]:
+        """Return the indexes of the resources that the given policies allow at least one of the permissions on.
+
+        Arguments:
+            policies {[dict]} -- The policies of a principal, as returned by `get_principals_for_account()`
+
+        Returns:
+            [set] -- Indexes into the resource ARN list
+        """
+        allowed: Set[int] = set()
+        denied: Set[int] = set()
+        for statements in policies.values():
+            policy_allowed, policy_denied = self._evaluate_policy(statements)
+            allowed |= policy_allowed
+            denied |= policy_denied
+        # An explicit deny in any policy overrides the allows of all policies.
+        return allowed - denied
+
+    def _evaluate_policy(
+        self,
+        statements: List[Dict],
+    ) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+        """Return the resources that the policy allows and explicitly denies, following
+        `evaluate_policy_for_permissions()`: for each resource, the first permission that any statement applies to
+        decides, and a deny statement takes precedence over an allow statement for the same permission.
+        """
+        statement_keys = [_statement_key(statement) for statement in statements]
+        policy_key = tuple(statement_keys)
+        cached = self._policy_cache.get(policy_key)
+        if cached is not None:
+            return cached
+
+        allow: List[Set[int]] = [set() for _ in self.permissions]
+        deny: List[Set[int]] = [set() for _ in self.permissions]
+        for statement, key in zip(statements, statement_keys):
+            if statement["effect"] == "Allow":
+                target = allow
+            elif statement["effect"] == "Deny":
+                target = deny
+            else:
+                continue
+            permission_indexes, resource_indexes = self._evaluate_statement(
+                statement, key
+            )
+            if resource_indexes:
+                for p in permission_indexes:
+                    target[p] |= resource_indexes
+
+        allowed: Set[int] = set()
+        denied: Set[int] = set()
+        decided: Set[int] = set()
+        for p in range(len(self.permissions)):
+            newly_denied = deny[p] - decided
+            newly_allowed = allow[p] - deny[p] - decided
+            denied |= newly_denied
+            allowed |= newly_allowed
+            decided |= newly_denied | newly_allowed
+
+        result = frozenset(allowed), frozenset(denied)
+        self._policy_cache[policy_key] = result
+        return result
+
+    def _evaluate_statement(
+        self,
+        statement: Dict,
+        key: Tuple,
+    ) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+        """Return the indexes of the permissions and of the resources that the statement applies to."""
+        cached = self._statement_cache.get(key)
+        if cached is not None:
+            return cached
+        if "action" in statement:
+            permission_indexes = self._union(self._match_action, statement["action"])
+        else:
+            permission_indexes = self._all_permissions
+        permission_indexes -= self._union(
+            self._match_action, statement.get("notaction", [])
+        )
+        if permission_indexes and "resource" in statement:
+            resource_indexes = self._union(self.resources.match, statement["resource"])
+            resource_indexes -= self._union(
+                self.resources.match, statement.get("notresource", [])
+            )
+        else:
+            resource_indexes = frozenset()
+        result = permission_indexes, resource_indexes
+        self._statement_cache[key] = result
+        return result
+
+    def _match_action(self, clause: Any) -> FrozenSet[int]:
+        """Return the indexes of the permissions that the action clause matches."""
+        pattern = compile_regex(clause)
+        result = self._action_cache.get(pattern.pattern)
+        if result is None:
+            prefix, _ = _literal_prefix(pattern.pattern)
+            result = frozenset(
+                i
+                for i, permission in enumerate(self.permissions)
+                if permission.lower().startswith(prefix)
+                and pattern.fullmatch(permission)
+            )
+            self._action_cache[pattern.pattern] = result
+        return result
+
+    @staticmethod
+    def _union(match: Any, clauses: List[Any]) -> FrozenSet[int]:
+        result: FrozenSet[int] = frozenset()
+        for clause in clauses:
+            result = result | match(clause)
+        return result
+
+
+def _statement_key(statement: Dict) -> Tuple:
+    """Return a hashable key that identifies the content of a statement, whether its clauses are compiled or not."""
+    return (statement.get("effect"),) + tuple(
+        _clause_sources(statement.get(field))
+        for field in ("action", "notaction", "resource", "notresource")
+    )
+
+
+def _clause_sources(clauses: Optional[List[Any]]) -> Optional[Tuple[str, ...]]:
+    if clauses is None:
+        return None
+    return tuple(compile_regex(clause).pattern for clause in clauses)
+
+
 def calculate_permission_relationships(
     principals: Dict,
     resource_arns: List[str],
@@ -200,13 +459,91 @@ def calculate_permission_relationships(
     Returns:
         [dict] -- The allowed mappings
     """
+    evaluator = PermissionEvaluator(resource_arns, permissions)
+    principals_by_resource: Dict[int, List[str]] = {}
+    for principal_arn, policies in principals.items():
+        for i in evaluator.allowed_resources(policies):
+            principals_by_resource.setdefault(i, []).append(principal_arn)
+
     allowed_mappings: List[Dict] = []
-    for resource_arn in resource_arns:
-        for principal_arn, policies in principals.items():
-            if principal_allowed_on_resource(policies, resource_arn, permissions):
-                allowed_mappings.append(
-                    {"principal_arn": principal_arn, "resource_arn": resource_arn},
-                )
+    for i, resource_arn in enumerate(resource_arns):
+        for principal_arn in principals_by_resource.get(i, []):
+            allowed_mappings.append(
+                {"principal_arn": principal_arn, "resource_arn": resource_arn},
+            )
+    return allowed_mappings
+
+
+# Below this many resources, evaluating a rule in the sync process is faster than sending it to worker processes.
+MIN_RESOURCES_PER_WORKER = 1000
+
+# Held by the account whose permission relationships are evaluated on a process pool. See `_sync_rprs()`.
+_evaluation_pool_lock = threading.Lock()
+
+# Principals of the account being evaluated, set once in each worker process by `_init_evaluation_worker()`.
+_worker_principals: Dict = {}
+
+
+def _init_evaluation_worker(principals: Dict) -> None:
+    global _worker_principals
+    _worker_principals = principals
+
+
+def _evaluate_resource_chunk(
+    resource_arns: List[str],
+    permissions: List[str],
+) -> List[Dict]:
+    return calculate_permission_relationships(
+        _worker_principals,
+        resource_arns,
+        permissions,
+    )
+
+
+def get_evaluation_pool(principals: Dict, workers: int) -> ProcessPoolExecutor:
+    """Return a process pool whose workers evaluate permission relationships for the given principals. The principals
+    are sent to each worker once, when it starts, and reused for every rule evaluated with the pool.
+
+    Workers are spawned rather than forked, since the sync process has other threads, e.g. the Neo4j driver's.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_evaluation_worker,
+        initargs=(principals,),
+    )
+
+
+def calculate_permission_relationships_in_pool(
+    pool: ProcessPoolExecutor,
+    workers: int,
+    resource_arns: List[str],
+    permissions: List[str],
+) -> List[Dict]:
+    """Same as `calculate_permission_relationships()` for the principals of the pool, with the resources split into
+    one chunk per worker. The mappings are returned in the same order.
+
+    Arguments:
+        pool {ProcessPoolExecutor} -- A pool from `get_evaluation_pool()`
+        workers {int} -- The number of workers of the pool
+        resource_arns {[str]} -- The resources to test the permission against
+        permissions {[str]} -- The permissions to evaluate
+
+    Returns:
+        [dict] -- The allowed mappings
+    """
+    chunk_size = max(MIN_RESOURCES_PER_WORKER, -(-len(resource_arns) // workers))
+    futures = [
+        pool.submit(
+            _evaluate_resource_chunk,
+            resource_arns[start : start + chunk_size],
+            permissions,
+        )
+        for start in range(0, len(resource_arns), chunk_size)
+    ]
+    allowed_mappings: List[Dict] = []
+    for future in futures:
+        allowed_mappings.extend(future.result())
     return allowed_mappings
 
 
@@ -270,6 +607,83 @@ def compile_statement(statements: List[Any]) -> List[Any]:
     return statements
 
 
+class CompiledStatementCache:
+    """Compiled policy statements, keyed by policy ID and a hash of the statement's content, so that a policy attached
+    to many principals or present in many accounts is compiled only once per sync. AWS managed policies such as
+    `arn:aws:iam::aws:policy/ReadOnlyAccess` are the same in every account.
+
+    Since the key includes the content, a policy that changes during the sync is compiled again. Compiled statements
+    are shared between principals and must not be modified.
+    """
+
+    def __init__(self) -> None:
+        self._statements: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_compiled_statements(
+        self,
+        policy_id: str,
+        statements: List[Dict],
+    ) -> List[Dict]:
+        """Return the compiled version of each of the policy's statements, compiling the ones not seen before.
+
+        Arguments:
+            policy_id {str} -- The id of the AWSPolicy node
+            statements {[dict]} -- The properties of its AWSPolicyStatement nodes
+
+        Returns:
+            [dict] -- The compiled statements
+        """
+        compiled_statements = []
+        for statement in statements:
+            key = (policy_id, _statement_hash(statement))
+            with self._lock:
+                compiled = self._statements.get(key)
+                if compiled is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            if compiled is None:
+                compiled = compile_statement([dict(statement)])[0]
+                with self._lock:
+                    self._statements[key] = compiled
+            compiled_statements.append(compiled)
+        return compiled_statements
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _statement_hash(statement: Dict) -> str:
+    # Timestamps change with every sync without changing what the statement means.
+    content = {
+        k: v for k, v in statement.items() if k not in ("lastupdated", "firstseen")
+    }
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, default=str).encode("utf8"),
+    ).hexdigest()
+
+
+def _is_managed_policy(policy_id: str) -> bool:
+    # Managed policies are identified by their ARN, e.g. arn:aws:iam::aws:policy/ReadOnlyAccess. Inline policies are
+    # identified by their principal's ARN and name (see cartography.intel.aws.iam.transform_policy_id), so they never
+    # appear again for another principal and are not worth caching.
+    return ":policy/" in policy_id
+
+
+# Shared by all accounts of a sync, and cleared by cartography.intel.aws.start_aws_ingestion() when the sync ends.
+_compiled_statement_cache = CompiledStatementCache()
+
+
+def get_compiled_statement_cache() -> CompiledStatementCache:
+    return _compiled_statement_cache
+
+
 def get_principals_for_account(neo4j_session: neo4j.Session, account_id: str) -> Dict:
     get_policy_query = """
     MATCH
@@ -291,9 +705,21 @@ def get_principals_for_account(neo4j_session: neo4j.Session, account_id: str) ->
         statements = r["statements"]
         if principal_arn not in principals:
             principals[principal_arn] = {}
-        principals[principal_arn][policy_id] = compile_statement(
-            parse_statement_node(statements),
-        )
+        if _is_managed_policy(policy_id):
+            principals[principal_arn][policy_id] = (
+                _compiled_statement_cache.get_compiled_statements(
+                    policy_id,
+                    parse_statement_node(statements),
+                )
+            )
+        else:
+            principals[principal_arn][policy_id] = compile_statement(
+                parse_statement_node(statements),
+            )
+    logger.debug(
+        f"Compiled policy statement cache: {_compiled_statement_cache.hits} hits, "
+        f"{_compiled_statement_cache.misses} misses.",
+    )
     return principals
 
 
@@ -431,6 +857,56 @@ def sync(
         )
         return
     relationship_mapping = parse_permission_relationships_file(pr_file)
+    workers = common_job_parameters.get("permission_relationships_workers") or 1
+    _sync_rprs(
+        neo4j_session,
+        relationship_mapping,
+        principals,
+        workers,
+        current_aws_account_id,
+        update_tag,
+    )
+
+
+def _load_rpr(
+    neo4j_session: neo4j.Session,
+    rpr: Dict,
+    allowed_mappings: List[Dict],
+    current_aws_account_id: str,
+    update_tag: int,
+) -> None:
+    load_principal_mappings(
+        neo4j_session,
+        allowed_mappings,
+        rpr["target_label"],
+        rpr["relationship_name"],
+        update_tag,
+    )
+    cleanup_rpr(
+        neo4j_session,
+        rpr["target_label"],
+        rpr["relationship_name"],
+        update_tag,
+        current_aws_account_id,
+    )
+
+
+def _sync_rprs(
+    neo4j_session: neo4j.Session,
+    relationship_mapping: List[Any],
+    principals: Dict,
+    workers: int,
+    current_aws_account_id: str,
+    update_tag: int,
+) -> None:
+    """
+    Evaluates and loads the given resource permission relationships. Rules with few resources are evaluated in this
+    process and loaded right away. If `workers` is more than 1, the other rules are evaluated together on a process
+    pool once all rules have been read, and loaded after the pool is shut down. Accounts synced concurrently take turns
+    using a pool, so that a sync never runs more than `workers` evaluation processes, but they only wait for each other
+    while evaluating, not while reading from or writing to the graph.
+    """
+    pooled_rprs: List[Tuple[Dict, List[str]]] = []
     for rpr in relationship_mapping:
         if not is_valid_rpr(rpr):
             raise ValueError(
@@ -439,35 +915,53 @@ def sync(
         Required fields: permissions, relationship_name, target_label"
         """,
             )
-        permissions = rpr["permissions"]
-        relationship_name = rpr["relationship_name"]
-        target_label = rpr["target_label"]
         resource_arns = get_resource_arns(
             neo4j_session,
             current_aws_account_id,
-            target_label,
+            rpr["target_label"],
         )
         logger.info(
             "Syncing relationship '%s' for node label '%s'",
-            relationship_name,
-            target_label,
+            rpr["relationship_name"],
+            rpr["target_label"],
         )
+        if workers > 1 and len(resource_arns) > MIN_RESOURCES_PER_WORKER:
+            pooled_rprs.append((rpr, resource_arns))
+            continue
         allowed_mappings = calculate_permission_relationships(
             principals,
             resource_arns,
-            permissions,
+            rpr["permissions"],
         )
-        load_principal_mappings(
+        _load_rpr(
             neo4j_session,
+            rpr,
             allowed_mappings,
-            target_label,
-            relationship_name,
+            current_aws_account_id,
             update_tag,
         )
-        cleanup_rpr(
+
+    if not pooled_rprs:
+        return
+    with _evaluation_pool_lock:
+        pool = get_evaluation_pool(principals, workers)
+        try:
+            pooled_mappings = [
+                calculate_permission_relationships_in_pool(
+                    pool,
+                    workers,
+                    resource_arns,
+                    rpr["permissions"],
+                )
+                for rpr, resource_arns in pooled_rprs
+            ]
+        finally:
+            pool.shutdown()
+    for (rpr, _), allowed_mappings in zip(pooled_rprs, pooled_mappings):
+        _load_rpr(
             neo4j_session,
-            target_label,
-            relationship_name,
-            update_tag,
+            rpr,
+            allowed_mappings,
             current_aws_account_id,
+            update_tag,
         )
@@ -3,11 +3,19 @@ from string import Template
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Set
+from typing import Tuple
 
 import boto3
 import neo4j
 
+from cartography.client.core.batching import get_batch_sizer
+from cartography.client.core.batching import write_in_batches
+from cartography.client.core.indexes import ensure_index_queries
+from cartography.client.core.tx import load
+from cartography.client.core.tx import read_list_of_values_tx
 from cartography.intel.aws.iam import get_role_tags
+from cartography.models.aws.tag import AWSTagSchema
 from cartography.util import aws_handle_regions
 from cartography.util import batch
 from cartography.util import run_cleanup_job
@@ -212,54 +220,172 @@ def get_tags(
     return resources
 
 
-def _load_tags_tx(
+def _get_tagged_resource_ids(
+    neo4j_session: neo4j.Session,
+    resource_type: str,
+    resource_ids: List[str],
+    current_aws_account_id: str,
+) -> Set[str]:
+    """
+    Returns the given resource IDs that belong to nodes of the resource type in the current account. Tags are only
+    loaded for resources that are in the graph.
+    """
+    query = Template(
+        """
+    UNWIND $ResourceIds AS resource_id
+    MATCH (:AWSAccount{id: $Account})-[:RESOURCE]->(resource:$resource_label{$property: resource_id})
+    RETURN DISTINCT resource_id
+    """,
+    ).safe_substitute(
+        resource_label=TAG_RESOURCE_TYPE_MAPPINGS[resource_type]["label"],
+        property=TAG_RESOURCE_TYPE_MAPPINGS[resource_type]["property"],
+    )
+    existing: Set[str] = set()
+    for resource_ids_batch in batch(resource_ids, size=10000):
+        existing.update(
+            str(resource_id)
+            for resource_id in neo4j_session.read_transaction(
+                read_list_of_values_tx,
+                query,
+                ResourceIds=resource_ids_batch,
+                Account=current_aws_account_id,
+            )
+        )
+    return existing
+
+
+def _load_tagged_relationships_tx(
     tx: neo4j.Transaction,
-    tag_data: Dict,
+    rows: List[Dict],
     resource_type: str,
-    region: str,
     current_aws_account_id: str,
     aws_update_tag: int,
 ) -> None:
-    INGEST_TAG_TEMPLATE = Template(
+    INGEST_TAGGED_TEMPLATE = Template(
         """
-    UNWIND $TagData as tag_mapping
-        UNWIND tag_mapping.Tags as input_tag
-            MATCH
-            (a:AWSAccount{id:$Account})-[res:RESOURCE]->(resource:$resource_label{$property:tag_mapping.resource_id})
-            MERGE
-            (aws_tag:AWSTag:Tag{id:input_tag.Key + ":" + input_tag.Value})
-            ON CREATE SET aws_tag.firstseen = timestamp()
-
-            SET aws_tag.lastupdated = $UpdateTag,
-            aws_tag.key = input_tag.Key,
-            aws_tag.value =  input_tag.Value,
-            aws_tag.region = $Region
-
-            MERGE (resource)-[r:TAGGED]->(aws_tag)
-            SET r.lastupdated = $UpdateTag,
-            r.firstseen = timestamp()
+    UNWIND $Rows AS row
+        MATCH (resource:$resource_label{$property: row.resource_id})<-[:RESOURCE]-(:AWSAccount{id: $Account})
+        MATCH (aws_tag:AWSTag{id: row.tag_id})
+        MERGE (resource)-[r:TAGGED]->(aws_tag)
+        ON CREATE SET r.firstseen = timestamp()
+        SET r.lastupdated = $UpdateTag
     """,
     )
-    if not tag_data:
-        return
-
-    query = INGEST_TAG_TEMPLATE.safe_substitute(
+    query = INGEST_TAGGED_TEMPLATE.safe_substitute(
         resource_label=TAG_RESOURCE_TYPE_MAPPINGS[resource_type]["label"],
         property=TAG_RESOURCE_TYPE_MAPPINGS[resource_type]["property"],
     )
     tx.run(
         query,
-        TagData=tag_data,
+        Rows=rows,
         UpdateTag=aws_update_tag,
-        Region=region,
         Account=current_aws_account_id,
     )
 
 
+def load_tagged_relationships(
+    neo4j_session: neo4j.Session,
+    rows: List[Dict],
+    resource_type: str,
+    current_aws_account_id: str,
+    aws_update_tag: int,
+) -> None:
+    """
+    Creates a (resource)-[:TAGGED]->(AWSTag) relationship for each row, given as a dict with `resource_id` and
+    `tag_id`. Both ends are looked up by an indexed property.
+    """
+    if not rows:
+        return
+    mapping = TAG_RESOURCE_TYPE_MAPPINGS[resource_type]
+    ensure_index_queries(
+        neo4j_session,
+        [
+            f"CREATE INDEX IF NOT EXISTS FOR (n:{mapping['label']}) ON (n.{mapping['property']});",
+        ],
+    )
+    write_in_batches(
+        rows,
+        lambda rows_batch: neo4j_session.write_transaction(
+            _load_tagged_relationships_tx,
+            rows=rows_batch,
+            resource_type=resource_type,
+            current_aws_account_id=current_aws_account_id,
+            aws_update_tag=aws_update_tag,
+        ),
+        get_batch_sizer(f"aws_tags:{resource_type}"),
+    )
+
+
+@timeit
+def load_all_tags(
+    neo4j_session: neo4j.Session,
+    tag_data_by_resource_type: Dict[str, List[Dict]],
+    current_aws_account_id: str,
+    aws_update_tag: int,
+) -> None:
+    """
+    Loads the tags of all resource types and regions of an account: first every distinct AWSTag in one load, then the
+    TAGGED relationships of each resource type.
+    :param tag_data_by_resource_type: Transformed tag mappings (see transform_tags()) by resource type. Each mapping
+    also holds the `region` it was fetched from.
+    """
+    tag_nodes: Dict[str, Dict] = {}
+    rows_by_resource_type: Dict[str, List[Dict]] = {}
+    for resource_type, tag_data in tag_data_by_resource_type.items():
+        if not tag_data:
+            continue
+        existing_resource_ids = _get_tagged_resource_ids(
+            neo4j_session,
+            resource_type,
+            list({tag_mapping["resource_id"] for tag_mapping in tag_data}),
+            current_aws_account_id,
+        )
+        # The same resource can be returned for several regions, e.g. IAM roles.
+        rows: Dict[Tuple[str, str], Dict] = {}
+        for tag_mapping in tag_data:
+            resource_id = tag_mapping["resource_id"]
+            if resource_id not in existing_resource_ids:
+                continue
+            for tag in tag_mapping["Tags"]:
+                tag_id = f"{tag['Key']}:{tag['Value']}"
+                tag_nodes[tag_id] = {
+                    "id": tag_id,
+                    "key": tag["Key"],
+                    "value": tag["Value"],
+                    "region": tag_mapping["region"],
+                }
+                rows[(resource_id, tag_id)] = {
+                    "resource_id": resource_id,
+                    "tag_id": tag_id,
+                }
+        rows_by_resource_type[resource_type] = list(rows.values())
+
+    logger.info(
+        f"Loading {len(tag_nodes)} distinct tags for account {current_aws_account_id}",
+    )
+    load(
+        neo4j_session,
+        AWSTagSchema(),
+        list(tag_nodes.values()),
+        lastupdated=aws_update_tag,
+    )
+    for resource_type, tagged_rows in rows_by_resource_type.items():
+        logger.info(
+            f"Loading {len(tagged_rows)} tag relationships for resource type {resource_type}",
+        )
+        load_tagged_relationships(
+            neo4j_session,
+            tagged_rows,
+            resource_type,
+            current_aws_account_id,
+            aws_update_tag,
+        )
+
+
 @timeit
 def load_tags(
     neo4j_session: neo4j.Session,
-    tag_data: Dict,
+    tag_data: List[Dict],
     resource_type: str,
     region: str,
     current_aws_account_id: str,
@@ -268,15 +394,16 @@ def load_tags(
     if len(tag_data) == 0:
         # If there is no data to load, save some time.
         return
-    for tag_data_batch in batch(tag_data, size=100):
-        neo4j_session.write_transaction(
-            _load_tags_tx,
-            tag_data=tag_data_batch,
-            resource_type=resource_type,
-            region=region,
-            current_aws_account_id=current_aws_account_id,
-            aws_update_tag=aws_update_tag,
-        )
+    load_all_tags(
+        neo4j_session,
+        {
+            resource_type: [
+                {**tag_mapping, "region": region} for tag_mapping in tag_data
+            ],
+        },
+        current_aws_account_id,
+        aws_update_tag,
+    )
 
 
 @timeit
@@ -334,6 +461,9 @@ def sync(
     common_job_parameters: Dict,
     tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
 ) -> None:
+    tag_data_by_resource_type: Dict[str, List[Dict]] = {
+        resource_type: [] for resource_type in tag_resource_type_mappings
+    }
     for region in regions:
         logger.info(
             f"Syncing AWS tags for account {current_aws_account_id} and region {region}",
@@ -347,15 +477,14 @@ def sync(
         for resource_type in tag_resource_type_mappings.keys():
             tag_data = grouped.get(resource_type, [])
             transform_tags(tag_data, resource_type)  # type: ignore
-            logger.info(
-                f"Loading {len(tag_data)} tags for resource type {resource_type}",
-            )
-            load_tags(
-                neo4j_session=neo4j_session,
-                tag_data=tag_data,  # type: ignore
-                resource_type=resource_type,
-                region=region,
-                current_aws_account_id=current_aws_account_id,
-                aws_update_tag=update_tag,
-            )
+            for tag_mapping in tag_data:
+                tag_mapping["region"] = region
+            tag_data_by_resource_type[resource_type].extend(tag_data)
+    # Tags are loaded once all regions are fetched, so that each distinct tag is written only once.
+    load_all_tags(
+        neo4j_session,
+        tag_data_by_resource_type,
+        current_aws_account_id,
+        update_tag,
+    )
     cleanup(neo4j_session, common_job_parameters)
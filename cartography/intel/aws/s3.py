@@ -1,10 +1,18 @@
-import asyncio
 import hashlib
 import json
 import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from datetime import datetime
 from typing import Any
+from typing import Deque
 from typing import Dict
 from typing import Generator
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -18,16 +26,23 @@ from policyuniverse.policy import Policy
 
 from cartography.stats import get_stats_client
 from cartography.util import aws_handle_regions
+from cartography.util import batch
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_analysis_job
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
-from cartography.util import to_asynchronous
-from cartography.util import to_synchronous
 
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Maximum number of buckets whose details are fetched at the same time, overall and per region. The calls for one
+# bucket are made one after the other, so these also bound the number of concurrent S3 API calls.
+S3_DETAILS_MAX_WORKERS = 32
+S3_DETAILS_MAX_WORKERS_PER_REGION = 8
+
+# Number of buckets whose details are written to the graph together.
+S3_DETAILS_LOAD_CHUNK_SIZE = 1000
+
 
 @timeit
 def get_s3_bucket_list(boto3_session: boto3.session.Session) -> List[Dict]:
@@ -59,61 +74,85 @@ def get_s3_bucket_details(
     """
     Iterates over all S3 buckets. Yields bucket name (string), S3 bucket policies (JSON), ACLs (JSON),
     default encryption policy (JSON), Versioning (JSON), and Public Access Block (JSON)
+
+    Details are fetched for up to S3_DETAILS_MAX_WORKERS buckets at a time, and for up to
+    S3_DETAILS_MAX_WORKERS_PER_REGION buckets of the same region, and are yielded as soon as they are fetched. Buckets
+    are therefore yielded in no particular order, and only the details of the buckets in flight are held in memory.
     """
-    # a local store for s3 clients so that we may re-use clients for an AWS region
+    # One client per region, shared by all threads that fetch buckets of that region. Clients are thread-safe; their
+    # connection pool is sized so that each thread gets its own connection.
     s3_regional_clients: Dict[Any, Any] = {}
+    client_config = botocore.config.Config(
+        max_pool_connections=S3_DETAILS_MAX_WORKERS_PER_REGION,
+        retries={"max_attempts": 10, "mode": "standard"},
+    )
 
-    BucketDetail = Tuple[
-        str,
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-        Dict[str, Any],
-    ]
-
-    async def _get_bucket_detail(bucket: Dict[str, Any]) -> BucketDetail:
+    def _get_client(region: Optional[str]) -> botocore.client.BaseClient:
         # Note: bucket['Region'] is sometimes None because
         # client.get_bucket_location() does not return a location constraint for buckets
         # in us-east-1 region
-        client = s3_regional_clients.get(bucket["Region"])
+        client = s3_regional_clients.get(region)
         if not client:
-            client = boto3_session.client("s3", bucket["Region"])
-            s3_regional_clients[bucket["Region"]] = client
-        (
-            acl,
-            policy,
-            encryption,
-            versioning,
-            public_access_block,
-            bucket_ownership_controls,
-            bucket_logging,
-        ) = await asyncio.gather(
-            to_asynchronous(get_acl, bucket, client),
-            to_asynchronous(get_policy, bucket, client),
-            to_asynchronous(get_encryption, bucket, client),
-            to_asynchronous(get_versioning, bucket, client),
-            to_asynchronous(get_public_access_block, bucket, client),
-            to_asynchronous(get_bucket_ownership_controls, bucket, client),
-            to_asynchronous(get_bucket_logging, bucket, client),
-        )
-        return (
-            bucket["Name"],
-            acl,
-            policy,
-            encryption,
-            versioning,
-            public_access_block,
-            bucket_ownership_controls,
-            bucket_logging,
-        )
+            client = boto3_session.client("s3", region, config=client_config)
+            s3_regional_clients[region] = client
+        return client
 
-    bucket_details = to_synchronous(
-        *[_get_bucket_detail(bucket) for bucket in bucket_data["Buckets"]],
+    pending: Dict[Optional[str], Deque[Dict]] = {}
+    for bucket in bucket_data["Buckets"]:
+        pending.setdefault(bucket["Region"], deque()).append(bucket)
+    in_flight: Dict[Future, Optional[str]] = {}
+    in_flight_per_region: Dict[Optional[str], int] = {}
+
+    executor = ThreadPoolExecutor(
+        max_workers=S3_DETAILS_MAX_WORKERS,
+        thread_name_prefix="cartography-s3-details",
+    )
+    try:
+        while pending or in_flight:
+            for region in list(pending):
+                buckets = pending[region]
+                while (
+                    buckets
+                    and len(in_flight) < S3_DETAILS_MAX_WORKERS
+                    and in_flight_per_region.get(region, 0)
+                    < S3_DETAILS_MAX_WORKERS_PER_REGION
+                ):
+                    future = executor.submit(
+                        _get_bucket_detail,
+                        buckets.popleft(),
+                        _get_client(region),
+                    )
+                    in_flight[future] = region
+                    in_flight_per_region[region] = (
+                        in_flight_per_region.get(region, 0) + 1
+                    )
+                if not buckets:
+                    del pending[region]
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                region = in_flight.pop(future)
+                in_flight_per_region[region] -= 1
+                yield future.result()
+    finally:
+        # Stop fetching if the caller fails or stops early.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _get_bucket_detail(
+    bucket: Dict[str, Any],
+    client: botocore.client.BaseClient,
+) -> Tuple[str, Any, Any, Any, Any, Any, Any, Any]:
+    return (
+        bucket["Name"],
+        get_acl(bucket, client),
+        get_policy(bucket, client),
+        get_encryption(bucket, client),
+        get_versioning(bucket, client),
+        get_public_access_block(bucket, client),
+        get_bucket_ownership_controls(bucket, client),
+        get_bucket_logging(bucket, client),
     )
-    yield from bucket_details
 
 
 @timeit
@@ -322,6 +361,19 @@ def _load_s3_acls(
     """
     Ingest S3 ACL into neo4j.
     """
+    _ingest_s3_acls(neo4j_session, acls, update_tag)
+    _run_s3_acl_analysis(
+        neo4j_session,
+        aws_account_id,
+        list({acl["bucket"] for acl in acls}),
+    )
+
+
+def _ingest_s3_acls(
+    neo4j_session: neo4j.Session,
+    acls: List[Dict[str, Any]],
+    update_tag: int,
+) -> None:
     ingest_acls = """
     UNWIND $acls AS acl
     MERGE (a:S3Acl{id: acl.id})
@@ -340,12 +392,20 @@ def _load_s3_acls(
         UpdateTag=update_tag,
     )
 
+
+def _run_s3_acl_analysis(
+    neo4j_session: neo4j.Session,
+    aws_account_id: str,
+    bucket_names: List[str],
+) -> None:
     # implement the acl permission
     # https://docs.aws.amazon.com/AmazonS3/latest/dev/acl-overview.html#permissions
+    # This appends to the anonymous_actions of the given buckets, so it must run once per sync for each bucket whose
+    # details were loaded.
     run_analysis_job(
         "aws_s3acl_analysis.json",
         neo4j_session,
-        {"AWS_ID": aws_account_id},
+        {"AWS_ID": aws_account_id, "BUCKET_NAMES": bucket_names},
         package="cartography.data.jobs.scoped_analysis",
     )
 
@@ -554,7 +614,212 @@ def _set_default_values(neo4j_session: neo4j.Session, aws_account_id: str) -> No
 @timeit
 def load_s3_details(
     neo4j_session: neo4j.Session,
-    s3_details_iter: Generator[Any, Any, Any],
+    s3_details_iter: Iterable[Any],
+    aws_account_id: str,
+    update_tag: int,
+    previous_fingerprints: Optional[Dict[str, Optional[str]]] = None,
+) -> None:
+    """
+    Loads the details of all buckets, S3_DETAILS_LOAD_CHUNK_SIZE buckets at a time as they come from the iterator.
+
+    :param previous_fingerprints: If given, the details fingerprint of each bucket stored by the previous sync (see
+    `get_s3_details_state()`). The details of buckets whose fingerprint did not change are then not written again;
+    only the lastupdated of their ACLs and policy statements is refreshed. Once a chunk is loaded, the fingerprint and
+    fetch time of each of its buckets are stored on its node.
+    """
+    # The details are fetched while iterating, so this is before any of them was fetched.
+    fetched_at = int(time.time())
+    loaded_bucket_names: List[str] = []
+    for s3_details_chunk in batch(s3_details_iter, size=S3_DETAILS_LOAD_CHUNK_SIZE):
+        fingerprints: List[Dict[str, str]] = []
+        if previous_fingerprints is not None:
+            s3_details_chunk, fingerprints = _skip_unchanged_s3_details(
+                neo4j_session,
+                s3_details_chunk,
+                previous_fingerprints,
+                aws_account_id,
+                update_tag,
+            )
+        bucket_names = [s3_details[0] for s3_details in s3_details_chunk]
+        # cleanup existing policy properties set on S3 Buckets
+        run_cleanup_job(
+            "aws_s3_details.json",
+            neo4j_session,
+            {
+                "UPDATE_TAG": update_tag,
+                "AWS_ID": aws_account_id,
+                "BUCKET_NAMES": bucket_names,
+            },
+        )
+        _load_s3_details_chunk(
+            neo4j_session,
+            s3_details_chunk,
+            aws_account_id,
+            update_tag,
+        )
+        if fingerprints:
+            _load_s3_details_fingerprints(neo4j_session, fingerprints, fetched_at)
+        loaded_bucket_names.extend(bucket_names)
+    _run_s3_acl_analysis(neo4j_session, aws_account_id, loaded_bucket_names)
+    _set_default_values(neo4j_session, aws_account_id)
+
+
+def get_s3_details_fingerprint(s3_details: Tuple) -> str:
+    """
+    Returns a hash of the details of one bucket as returned by `get_s3_bucket_details()`, without the response
+    metadata, which differs on every call.
+    """
+    responses = [
+        (
+            {k: v for k, v in response.items() if k != "ResponseMetadata"}
+            if isinstance(response, dict)
+            else response
+        )
+        for response in s3_details
+    ]
+    serialized = json.dumps(responses, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+@timeit
+def get_s3_details_state(
+    neo4j_session: neo4j.Session,
+    aws_account_id: str,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the details fingerprint and the time (in seconds since the epoch) of the last details fetch of every bucket
+    of the account, by bucket name.
+    """
+    query = """
+    MATCH (:AWSAccount{id: $AWS_ID})-[:RESOURCE]->(s:S3Bucket)
+    RETURN s.name AS name, s.details_fingerprint AS fingerprint, s.details_fetched_at AS fetched_at
+    """
+    return {
+        record["name"]: {
+            "fingerprint": record["fingerprint"],
+            "fetched_at": record["fetched_at"],
+        }
+        for record in neo4j_session.run(query, AWS_ID=aws_account_id)
+    }
+
+
+def get_buckets_to_refresh(
+    bucket_data: Dict,
+    details_state: Dict[str, Dict[str, Any]],
+    now: int,
+    max_age_hours: int,
+) -> Tuple[Dict, List[str]]:
+    """
+    Splits the buckets into the ones whose details must be fetched, and the ones whose details were fetched less than
+    `max_age_hours` before `now` (in seconds since the epoch) and are kept as they are. A bucket created after its last
+    details fetch (i.e. deleted and re-created with the same name) is always fetched.
+
+    :return: The bucket data of the buckets to fetch, in the format of `get_s3_bucket_list()`, and the names of the
+    buckets to keep
+    """
+    to_fetch = []
+    to_keep = []
+    for bucket in bucket_data["Buckets"]:
+        fetched_at = details_state.get(bucket["Name"], {}).get("fetched_at")
+        creation_date = bucket.get("CreationDate")
+        if (
+            fetched_at is None
+            or now - fetched_at >= max_age_hours * 3600
+            or (
+                isinstance(creation_date, datetime)
+                and creation_date.timestamp() > fetched_at
+            )
+        ):
+            to_fetch.append(bucket)
+        else:
+            to_keep.append(bucket["Name"])
+    return {**bucket_data, "Buckets": to_fetch}, to_keep
+
+
+def _skip_unchanged_s3_details(
+    neo4j_session: neo4j.Session,
+    s3_details_chunk: List[Tuple],
+    previous_fingerprints: Dict[str, Optional[str]],
+    aws_account_id: str,
+    update_tag: int,
+) -> Tuple[List[Tuple], List[Dict[str, str]]]:
+    """
+    Keeps the graph data of the buckets whose details fingerprint did not change, and returns the details of the
+    others along with the fingerprint of every bucket, to be stored once the details are loaded.
+    """
+    fingerprints = []
+    changed = []
+    unchanged_bucket_names = []
+    for s3_details in s3_details_chunk:
+        fingerprint = get_s3_details_fingerprint(s3_details)
+        fingerprints.append({"bucket": s3_details[0], "fingerprint": fingerprint})
+        if previous_fingerprints.get(s3_details[0]) == fingerprint:
+            unchanged_bucket_names.append(s3_details[0])
+        else:
+            changed.append(s3_details)
+    refresh_s3_details(
+        neo4j_session,
+        unchanged_bucket_names,
+        aws_account_id,
+        update_tag,
+    )
+    return changed, fingerprints
+
+
+def _load_s3_details_fingerprints(
+    neo4j_session: neo4j.Session,
+    fingerprints: List[Dict[str, str]],
+    fetched_at: int,
+) -> None:
+    ingest_fingerprints = """
+    UNWIND $fingerprints AS fingerprint
+    MATCH (s:S3Bucket{id: fingerprint.bucket})
+    SET s.details_fingerprint = fingerprint.fingerprint, s.details_fetched_at = $FetchedAt
+    """
+    neo4j_session.run(
+        ingest_fingerprints,
+        fingerprints=fingerprints,
+        FetchedAt=fetched_at,
+    )
+
+
+@timeit
+def refresh_s3_details(
+    neo4j_session: neo4j.Session,
+    bucket_names: List[str],
+    aws_account_id: str,
+    update_tag: int,
+) -> None:
+    """
+    Keeps the details of the given buckets from the previous sync by updating the lastupdated of their ACLs and
+    policy statements, so that the cleanup jobs don't delete them. The other details are properties of the bucket
+    nodes and stay as they are.
+    """
+    if not bucket_names:
+        return
+    refresh_acls = """
+    UNWIND $BucketNames AS bucket_name
+    MATCH (:AWSAccount{id: $AWS_ID})-[:RESOURCE]->(s:S3Bucket{name: bucket_name})<-[r:APPLIES_TO]-(a:S3Acl)
+    SET a.lastupdated = $UpdateTag, r.lastupdated = $UpdateTag
+    """
+    refresh_statements = """
+    UNWIND $BucketNames AS bucket_name
+    MATCH (:AWSAccount{id: $AWS_ID})-[:RESOURCE]->(s:S3Bucket{name: bucket_name})-[r:POLICY_STATEMENT]->
+    (statement:S3PolicyStatement)
+    SET statement.lastupdated = $UpdateTag, r.lastupdated = $UpdateTag
+    """
+    for query in (refresh_acls, refresh_statements):
+        neo4j_session.run(
+            query,
+            BucketNames=bucket_names,
+            AWS_ID=aws_account_id,
+            UpdateTag=update_tag,
+        )
+
+
+def _load_s3_details_chunk(
+    neo4j_session: neo4j.Session,
+    s3_details: List[Any],
     aws_account_id: str,
     update_tag: int,
 ) -> None:
@@ -578,7 +843,7 @@ def load_s3_details(
         public_access_block,
         bucket_ownership_controls,
         bucket_logging,
-    ) in s3_details_iter:
+    ) in s3_details:
         parsed_acls = parse_acl(acl, bucket, aws_account_id)
         if parsed_acls is not None:
             acls.extend(parsed_acls)
@@ -609,14 +874,7 @@ def load_s3_details(
         if parsed_bucket_logging is not None:
             bucket_logging_configs.append(parsed_bucket_logging)
 
-    # cleanup existing policy properties set on S3 Buckets
-    run_cleanup_job(
-        "aws_s3_details.json",
-        neo4j_session,
-        {"UPDATE_TAG": update_tag, "AWS_ID": aws_account_id},
-    )
-
-    _load_s3_acls(neo4j_session, acls, aws_account_id, update_tag)
+    _ingest_s3_acls(neo4j_session, acls, update_tag)
 
     _load_s3_policies(neo4j_session, policies, update_tag)
     _load_s3_policy_statements(neo4j_session, statements, update_tag)
@@ -627,7 +885,6 @@ def load_s3_details(
         neo4j_session, bucket_ownership_controls_configs, update_tag
     )
     _load_bucket_logging(neo4j_session, bucket_logging_configs, update_tag)
-    _set_default_values(neo4j_session, aws_account_id)
 
 
 @timeit
@@ -1119,12 +1376,38 @@ def sync(
     load_s3_buckets(neo4j_session, bucket_data, current_aws_account_id, update_tag)
     cleanup_s3_buckets(neo4j_session, common_job_parameters)
 
-    acl_and_policy_data_iter = get_s3_bucket_details(boto3_session, bucket_data)
+    max_age_hours = common_job_parameters.get("aws_s3_details_max_age_hours")
+    previous_fingerprints = None
+    buckets_to_fetch = bucket_data
+    if max_age_hours is not None:
+        details_state = get_s3_details_state(neo4j_session, current_aws_account_id)
+        previous_fingerprints = {
+            name: state["fingerprint"] for name, state in details_state.items()
+        }
+        buckets_to_fetch, buckets_to_keep = get_buckets_to_refresh(
+            bucket_data,
+            details_state,
+            int(time.time()),
+            max_age_hours,
+        )
+        logger.info(
+            f"Fetching the details of {len(buckets_to_fetch['Buckets'])} S3 buckets; keeping the details of "
+            f"{len(buckets_to_keep)} buckets fetched less than {max_age_hours} hours ago.",
+        )
+        refresh_s3_details(
+            neo4j_session,
+            buckets_to_keep,
+            current_aws_account_id,
+            update_tag,
+        )
+
+    acl_and_policy_data_iter = get_s3_bucket_details(boto3_session, buckets_to_fetch)
     load_s3_details(
         neo4j_session,
         acl_and_policy_data_iter,
         current_aws_account_id,
         update_tag,
+        previous_fingerprints,
     )
     cleanup_s3_bucket_acl_and_policy(neo4j_session, common_job_parameters)
 
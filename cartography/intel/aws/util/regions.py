@@ -0,0 +1,213 @@
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from functools import wraps
+from itertools import islice
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import TypeVar
+
+import backoff
+import boto3
+import botocore.exceptions
+
+from cartography.util import backoff_handler
+from cartography.util import is_throttling_exception
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# How many regions of the same service we fetch at once. AWS rate limits are mostly per region, so this bounds the
+# number of open connections and threads more than it protects the APIs.
+DEFAULT_MAX_REGION_WORKERS = 8
+
+# Services whose APIs are paged many times per region under low request rate limits. Fetching many regions of these at
+# once mostly turns into throttling retries.
+MAX_REGION_WORKERS_BY_SERVICE: Dict[str, int] = {
+    "cloudtrail": 4,
+    "inspector2": 4,
+}
+
+# boto3 sessions are not thread-safe, so clients for concurrent fetches are created one at a time. The clients
+# themselves are thread-safe.
+_client_lock = threading.Lock()
+
+
+def create_client(
+    boto3_session: boto3.session.Session,
+    service: str,
+    **kwargs: Any,
+) -> Any:
+    """
+    Creates a boto3 client of the given service on the given session while no other thread creates one. Use this to
+    create clients on a session that worker threads fetch AWS data with.
+    """
+    with _client_lock:
+        return boto3_session.client(service, **kwargs)
+
+
+class _ThreadSafeSession:
+    """
+    Wraps the boto3 session that the `get_` functions of `iter_data_for_regions()` receive on worker threads, so that
+    the clients and resources they create are created with `create_client()`'s lock held.
+    """
+
+    def __init__(self, boto3_session: boto3.session.Session) -> None:
+        self._boto3_session = boto3_session
+
+    def client(self, *args: Any, **kwargs: Any) -> Any:
+        with _client_lock:
+            return self._boto3_session.client(*args, **kwargs)
+
+    def resource(self, *args: Any, **kwargs: Any) -> Any:
+        with _client_lock:
+            return self._boto3_session.resource(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._boto3_session, name)
+
+
+def _retry_on_throttling(func: Callable[..., R]) -> Callable[..., R]:
+    """
+    Retries the given function with exponential backoff as long as it fails with a throttling error. All other errors
+    are raised immediately.
+    """
+
+    @wraps(func)
+    @backoff.on_exception(
+        backoff.expo,
+        botocore.exceptions.ClientError,
+        giveup=lambda e: not is_throttling_exception(e),
+        max_time=600,
+        on_backoff=backoff_handler,
+    )
+    def inner_function(*args: Any, **kwargs: Any) -> R:
+        return func(*args, **kwargs)
+
+    return inner_function
+
+
+def get_max_region_workers(service: str) -> int:
+    """
+    Returns how many regions of the given boto3 service are fetched at once.
+    """
+    return MAX_REGION_WORKERS_BY_SERVICE.get(service, DEFAULT_MAX_REGION_WORKERS)
+
+
+def iter_data_for_regions(
+    get_func: Callable[..., R],
+    boto3_session: boto3.session.Session,
+    regions: List[str],
+    service: str,
+    *args: Any,
+    max_workers: int | None = None,
+    **kwargs: Any,
+) -> Iterator[Tuple[str, R]]:
+    """
+    Calls `get_func(boto3_session, region, *args, **kwargs)` for each of the given regions concurrently and yields each
+    region with its result as soon as it is fetched, so that the caller can load one region while the next ones are
+    fetched. A region is only started when a worker is free and the result of a finished one has been taken, so at
+    most `max_workers` results are held in memory at once, not the data of every region. Calls that are throttled are
+    retried with exponential backoff. If a call fails with any other error, regions that have not started yet are
+    skipped and the error is raised once the running calls have finished.
+
+    Worker threads share `boto3_session`, so `get_func` gets a wrapper of it that creates clients one at a time. To
+    create a client of the same session on another thread while the regions are fetched, use `create_client()`.
+
+    Example:
+        for region, reservations in iter_data_for_regions(get_ec2_instances, boto3_session, regions, "ec2"):
+            load(...)
+
+    :param get_func: A `get_` function that takes a boto3 session and a region as its first two arguments
+    :param boto3_session: The boto3 session
+    :param regions: The regions to fetch
+    :param service: The boto3 service name that `get_func` calls, e.g. "ec2". Used to choose the concurrency limit.
+    :param args: Extra positional args passed to `get_func` after the region
+    :param max_workers: Overrides the number of regions fetched at once for this service
+    :param kwargs: Extra keyword args passed to `get_func`
+    :return: An iterator of (region, the value returned by `get_func` for that region), in the order the regions
+    finish
+    """
+    if not regions:
+        return
+    if max_workers is None:
+        max_workers = get_max_region_workers(service)
+    if max_workers <= 1 or len(regions) == 1:
+        for region in regions:
+            yield region, _retry_on_throttling(get_func)(
+                boto3_session,
+                region,
+                *args,
+                **kwargs,
+            )
+        return
+
+    thread_safe_session = _ThreadSafeSession(boto3_session)
+    regions_to_start = iter(regions)
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(regions)),
+        thread_name_prefix=f"cartography-aws-{service}",
+    )
+
+    def start(region: str) -> Future:
+        return executor.submit(
+            _retry_on_throttling(get_func),
+            thread_safe_session,
+            region,
+            *args,
+            **kwargs,
+        )
+
+    try:
+        running: Dict[Future, str] = {
+            start(region): region for region in islice(regions_to_start, max_workers)
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                region = running.pop(future)
+                result = future.result()
+                next_region = next(regions_to_start, None)
+                if next_region is not None:
+                    running[start(next_region)] = next_region
+                yield region, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def get_data_for_regions(
+    get_func: Callable[..., R],
+    boto3_session: boto3.session.Session,
+    regions: List[str],
+    service: str,
+    *args: Any,
+    max_workers: int | None = None,
+    **kwargs: Any,
+) -> Dict[str, R]:
+    """
+    Like `iter_data_for_regions()`, but returns the results of all regions at once, keyed by region in the order of
+    `regions`. The data of every region is then held in memory at the same time; prefer `iter_data_for_regions()`
+    when each region's data can be loaded on its own.
+
+    :return: A dict of region to the value returned by `get_func` for that region
+    """
+    data_by_region = dict(
+        iter_data_for_regions(
+            get_func,
+            boto3_session,
+            regions,
+            service,
+            *args,
+            max_workers=max_workers,
+            **kwargs,
+        ),
+    )
+    return {region: data_by_region[region] for region in regions}
@@ -3,6 +3,7 @@ from typing import List
 
 import neo4j
 
+from cartography.client.core.indexes import ensure_index_queries
 from cartography.config import Config
 from cartography.util import load_resource_binary
 
@@ -21,6 +22,5 @@ def get_index_statements() -> List[str]:
 
 def run(neo4j_session: neo4j.Session, config: Config) -> None:
     logger.info("Creating indexes for cartography node types.")
-    for statement in get_index_statements():
-        logger.debug("Executing statement: %s", statement)
-        neo4j_session.run(statement)
+    # This also records the indexes as existing, so that intel modules loading these node types skip creating them.
+    ensure_index_queries(neo4j_session, get_index_statements())
@@ -1,18 +1,25 @@
 import json
 import logging
+import queue
+import threading
 from collections import namedtuple
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Set
+from typing import Tuple
 
 import googleapiclient.discovery
+import googleapiclient.discovery_cache
 import neo4j
 from google.auth import default
 from google.auth.credentials import Credentials as GoogleCredentials
 from google.auth.exceptions import DefaultCredentialsError
 from googleapiclient.discovery import Resource
 
+from cartography.client.core.session import new_neo4j_session
 from cartography.config import Config
 from cartography.intel.gcp import compute
 from cartography.intel.gcp import crm
@@ -39,6 +46,60 @@ service_names = Services(
     iam="iam.googleapis.com",
 )
 
+# Upper bound on the number of threads that look up the enabled services of projects.
+MAX_ENABLED_SERVICES_WORKERS = 16
+
+
+class DiscoveryDocumentCache:
+    """
+    Keeps the discovery documents that googleapiclient builds resource objects from, so that each one is read from the
+    documents shipped with googleapiclient once per sync instead of once per resource object.
+
+    Documents are kept as strings: googleapiclient modifies the parsed document while it builds a resource object, so
+    a parsed document cannot be shared by threads.
+    """
+
+    def __init__(self) -> None:
+        self._documents: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, service: str, version: str) -> Optional[str]:
+        """
+        :return: The discovery document of the service, or None if googleapiclient does not ship it
+        """
+        with self._lock:
+            if (service, version) not in self._documents:
+                self._documents[(service, version)] = (
+                    googleapiclient.discovery_cache.get_static_doc(service, version)
+                )
+            return self._documents[(service, version)]
+
+
+_discovery_document_cache = DiscoveryDocumentCache()
+
+
+def _build_resource(
+    service: str,
+    version: str,
+    credentials: GoogleCredentials,
+) -> Resource:
+    """
+    Instantiates a googleapiclient resource object from a discovery document in `_discovery_document_cache`, or from
+    the discovery service if googleapiclient does not ship the document.
+    """
+    document = _discovery_document_cache.get(service, version)
+    if document is None:
+        return googleapiclient.discovery.build(
+            service,
+            version,
+            credentials=credentials,
+            cache_discovery=False,
+        )
+    return googleapiclient.discovery.build_from_document(
+        document,
+        credentials=credentials,
+    )
+
 
 def _get_crm_resource_v1(credentials: GoogleCredentials) -> Resource:
     """
@@ -47,14 +108,7 @@ def _get_crm_resource_v1(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A CRM v1 resource object
     """
-    # cache_discovery=False to suppress extra warnings.
-    # See https://github.com/googleapis/google-api-python-client/issues/299#issuecomment-268915510 and related issues
-    return googleapiclient.discovery.build(
-        "cloudresourcemanager",
-        "v1",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("cloudresourcemanager", "v1", credentials)
 
 
 def _get_crm_resource_v2(credentials: GoogleCredentials) -> Resource:
@@ -64,12 +118,7 @@ def _get_crm_resource_v2(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A CRM v2 resource object
     """
-    return googleapiclient.discovery.build(
-        "cloudresourcemanager",
-        "v2",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("cloudresourcemanager", "v2", credentials)
 
 
 def _get_compute_resource(credentials: GoogleCredentials) -> Resource:
@@ -79,12 +128,7 @@ def _get_compute_resource(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A Compute resource object
     """
-    return googleapiclient.discovery.build(
-        "compute",
-        "v1",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("compute", "v1", credentials)
 
 
 def _get_storage_resource(credentials: GoogleCredentials) -> Resource:
@@ -96,12 +140,7 @@ def _get_storage_resource(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A Storage resource object
     """
-    return googleapiclient.discovery.build(
-        "storage",
-        "v1",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("storage", "v1", credentials)
 
 
 def _get_container_resource(credentials: GoogleCredentials) -> Resource:
@@ -112,12 +151,7 @@ def _get_container_resource(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A Container resource object
     """
-    return googleapiclient.discovery.build(
-        "container",
-        "v1",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("container", "v1", credentials)
 
 
 def _get_dns_resource(credentials: GoogleCredentials) -> Resource:
@@ -128,12 +162,7 @@ def _get_dns_resource(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A DNS resource object
     """
-    return googleapiclient.discovery.build(
-        "dns",
-        "v1",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("dns", "v1", credentials)
 
 
 def _get_serviceusage_resource(credentials: GoogleCredentials) -> Resource:
@@ -144,21 +173,14 @@ def _get_serviceusage_resource(credentials: GoogleCredentials) -> Resource:
     :param credentials: The GoogleCredentials object
     :return: A serviceusage resource object
     """
-    return googleapiclient.discovery.build(
-        "serviceusage",
-        "v1",
-        credentials=credentials,
-        cache_discovery=False,
-    )
+    return _build_resource("serviceusage", "v1", credentials)
 
 
 def _get_iam_resource(credentials: GoogleCredentials) -> Resource:
     """
     Instantiates a Google IAM resource object to call the IAM API.
     """
-    return googleapiclient.discovery.build(
-        "iam", "v1", credentials=credentials, cache_discovery=False
-    )
+    return _build_resource("iam", "v1", credentials)
 
 
 def _initialize_resources(credentials: GoogleCredentials) -> Resource:
@@ -170,7 +192,7 @@ def _initialize_resources(credentials: GoogleCredentials) -> Resource:
     return Resources(
         crm_v1=_get_crm_resource_v1(credentials),
         crm_v2=_get_crm_resource_v2(credentials),
-        serviceusage=_get_serviceusage_resource(credentials),
+        serviceusage=None,
         compute=None,
         container=None,
         dns=None,
@@ -216,169 +238,252 @@ def _services_enabled_on_project(serviceusage: Resource, project_id: str) -> Set
         return set()
 
 
-def _sync_single_project_compute(
+@timeit
+def _get_enabled_services_of_projects(
+    credentials: GoogleCredentials,
+    project_ids: List[str],
+) -> Dict[str, Set]:
+    """
+    Return the Google API services that are enabled on each of the given projects, looked up concurrently so that
+    project syncs can start right away.
+    :param credentials: The GoogleCredentials object
+    :param project_ids: The IDs of the projects to look up
+    :return: Dict of project ID to the set of services enabled on the project, see `_services_enabled_on_project()`
+    """
+    # Resource objects are not thread-safe, so every thread builds its own.
+    local = threading.local()
+
+    def get_enabled_services(project_id: str) -> Set:
+        if not hasattr(local, "serviceusage"):
+            local.serviceusage = _get_serviceusage_resource(credentials)
+        return _services_enabled_on_project(local.serviceusage, project_id)
+
+    workers = max(1, min(MAX_ENABLED_SERVICES_WORKERS, len(project_ids)))
+    with ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="cartography-gcp-services",
+    ) as executor:
+        return dict(zip(project_ids, executor.map(get_enabled_services, project_ids)))
+
+
+def _initialize_project_resources(credentials: GoogleCredentials) -> Resources:
+    """
+    Create namedtuple of the resource objects used to sync the data of projects. Resource objects are not thread-safe,
+    so every thread that syncs projects needs its own.
+    :param credentials: The GoogleCredentials object
+    :return: namedtuple of the resource objects; the CRM and serviceusage ones are None
+    """
+    return Resources(
+        crm_v1=None,
+        crm_v2=None,
+        serviceusage=None,
+        compute=_get_compute_resource(credentials),
+        container=_get_container_resource(credentials),
+        dns=_get_dns_resource(credentials),
+        storage=_get_storage_resource(credentials),
+        iam=_get_iam_resource(credentials),
+    )
+
+
+def _sync_single_project(
     neo4j_session: neo4j.Session,
-    resources: Resource,
+    resources: Resources,
     project_id: str,
+    enabled_services: Set,
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
-    Handles graph sync for a single GCP project on Compute resources.
+    Handles graph sync for a single GCP project: Compute, Storage, GKE, DNS and IAM resources, for the services that
+    are enabled on the project.
     :param neo4j_session: The Neo4j session
-    :param resources: namedtuple of the GCP resource objects
+    :param resources: namedtuple of the GCP resource objects, see `_initialize_project_resources()`
     :param project_id: The project ID number to sync.  See  the `projectId` field in
     https://cloud.google.com/resource-manager/reference/rest/v1/projects
+    :param enabled_services: The services enabled on the project, see `_get_enabled_services_of_projects()`
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
-    :param common_job_parameters: Other parameters sent to Neo4j
+    :param common_job_parameters: Other parameters sent to Neo4j, with PROJECT_ID set to project_id
+    :param run_cleanup: Whether to run the cleanup jobs of Compute, Storage, GKE and DNS, see `_cleanup_project()`
     :return: Nothing
     """
-    # Determine the resources available on the project.
-    enabled_services = _services_enabled_on_project(resources.serviceusage, project_id)
-    compute_cred = _get_compute_resource(get_gcp_credentials())
     if service_names.compute in enabled_services:
+        logger.info("Syncing GCP project %s for Compute.", project_id)
         compute.sync(
             neo4j_session,
-            compute_cred,
+            resources.compute,
             project_id,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
 
-
-def _sync_single_project_storage(
-    neo4j_session: neo4j.Session,
-    resources: Resource,
-    project_id: str,
-    gcp_update_tag: int,
-    common_job_parameters: Dict,
-) -> None:
-    """
-    Handles graph sync for a single GCP project on Storage resources.
-    :param neo4j_session: The Neo4j session
-    :param resources: namedtuple of the GCP resource objects
-    :param project_id: The project ID number to sync.  See  the `projectId` field in
-    https://cloud.google.com/resource-manager/reference/rest/v1/projects
-    :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
-    :param common_job_parameters: Other parameters sent to Neo4j
-    :return: Nothing
-    """
-    # Determine the resources available on the project.
-    enabled_services = _services_enabled_on_project(resources.serviceusage, project_id)
-    storage_cred = _get_storage_resource(get_gcp_credentials())
     if service_names.storage in enabled_services:
+        logger.info("Syncing GCP project %s for Storage", project_id)
         storage.sync_gcp_buckets(
             neo4j_session,
-            storage_cred,
+            resources.storage,
             project_id,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
 
-
-def _sync_single_project_gke(
-    neo4j_session: neo4j.Session,
-    resources: Resource,
-    project_id: str,
-    gcp_update_tag: int,
-    common_job_parameters: Dict,
-) -> None:
-    """
-    Handles graph sync for a single GCP project GKE resources.
-    :param neo4j_session: The Neo4j session
-    :param resources: namedtuple of the GCP resource objects
-    :param project_id: The project ID number to sync.  See  the `projectId` field in
-    https://cloud.google.com/resource-manager/reference/rest/v1/projects
-    :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
-    :param common_job_parameters: Other parameters sent to Neo4j
-    :return: Nothing
-    """
-    # Determine the resources available on the project.
-    enabled_services = _services_enabled_on_project(resources.serviceusage, project_id)
-    container_cred = _get_container_resource(get_gcp_credentials())
     if service_names.gke in enabled_services:
+        logger.info("Syncing GCP project %s for GKE", project_id)
         gke.sync_gke_clusters(
             neo4j_session,
-            container_cred,
+            resources.container,
+            project_id,
+            gcp_update_tag,
+            common_job_parameters,
+            run_cleanup=run_cleanup,
+        )
+
+    if service_names.dns in enabled_services:
+        logger.info("Syncing GCP project %s for DNS", project_id)
+        dns.sync(
+            neo4j_session,
+            resources.dns,
+            project_id,
+            gcp_update_tag,
+            common_job_parameters,
+            run_cleanup=run_cleanup,
+        )
+
+    if service_names.iam in enabled_services:
+        logger.info("Syncing GCP project %s for IAM", project_id)
+        iam.sync(
+            neo4j_session,
+            resources.iam,
             project_id,
             gcp_update_tag,
             common_job_parameters,
         )
 
 
-def _sync_single_project_dns(
+def _cleanup_project(
     neo4j_session: neo4j.Session,
-    resources: Resource,
     project_id: str,
-    gcp_update_tag: int,
+    enabled_services: Set,
     common_job_parameters: Dict,
 ) -> None:
     """
-    Handles graph sync for a single GCP project DNS resources.
+    Runs the cleanup jobs of Compute, Storage, GKE and DNS for a single GCP project. Most of these jobs are not scoped
+    to the project, so they must not run while other projects are being loaded.
     :param neo4j_session: The Neo4j session
-    :param resources: namedtuple of the GCP resource objects
-    :param project_id: The project ID number to sync.  See  the `projectId` field in
-    https://cloud.google.com/resource-manager/reference/rest/v1/projects
-    :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
-    :param common_job_parameters: Other parameters sent to Neo4j
+    :param project_id: The project ID of the project that was synced
+    :param enabled_services: The services enabled on the project, see `_get_enabled_services_of_projects()`
+    :param common_job_parameters: Other parameters sent to Neo4j, with PROJECT_ID set to project_id
     :return: Nothing
     """
-    # Determine the resources available on the project.
-    enabled_services = _services_enabled_on_project(resources.serviceusage, project_id)
-    dns_cred = _get_dns_resource(get_gcp_credentials())
+    logger.info("Cleaning up GCP project %s.", project_id)
+    if service_names.compute in enabled_services:
+        compute.cleanup(neo4j_session, common_job_parameters)
+    if service_names.storage in enabled_services:
+        storage.cleanup_gcp_buckets(neo4j_session, common_job_parameters)
+    if service_names.gke in enabled_services:
+        gke.cleanup_gke_clusters(neo4j_session, common_job_parameters)
     if service_names.dns in enabled_services:
-        dns.sync(
+        dns.cleanup_dns_records(neo4j_session, common_job_parameters)
+
+
+def _sync_projects(
+    neo4j_session: neo4j.Session,
+    credentials: GoogleCredentials,
+    project_ids: "queue.SimpleQueue[str]",
+    enabled_services: Dict[str, Set],
+    gcp_update_tag: int,
+    common_job_parameters: Dict,
+    stop: threading.Event,
+    run_cleanup: bool = True,
+) -> None:
+    """
+    Syncs the projects taken from `project_ids` one after the other, until the queue is empty or `stop` is set. Each
+    project is synced with its own copy of common_job_parameters. If `run_cleanup` is False, only the cleanup jobs
+    that are scoped to the project run, see `_cleanup_project()`.
+    """
+    resources = _initialize_project_resources(credentials)
+    while not stop.is_set():
+        try:
+            project_id = project_ids.get_nowait()
+        except queue.Empty:
+            return
+        _sync_single_project(
             neo4j_session,
-            dns_cred,
+            resources,
             project_id,
+            enabled_services.get(project_id, set()),
             gcp_update_tag,
-            common_job_parameters,
+            {**common_job_parameters, "PROJECT_ID": project_id},
+            run_cleanup=run_cleanup,
         )
 
 
-def _sync_single_project_iam(
+def _sync_projects_in_new_session(
+    neo4j_driver: neo4j.Driver,
     neo4j_session: neo4j.Session,
-    resources: Resource,
-    project_id: str,
+    neo4j_database: Optional[str],
+    credentials: GoogleCredentials,
+    project_ids: "queue.SimpleQueue[str]",
+    enabled_services: Dict[str, Set],
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    stop: threading.Event,
 ) -> None:
     """
-    Handles graph sync for a single GCP project's IAM resources.
-    :param neo4j_session: The Neo4j session
-    :param resources: namedtuple of the GCP resource objects
-    :param project_id: The project ID number to sync.  See  the `projectId` field in
-    https://cloud.google.com/resource-manager/reference/rest/v1/projects
-    :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
-    :param common_job_parameters: Other parameters sent to Neo4j
-    :return: Nothing
+    Runs `_sync_projects()` on its own Neo4j session so that several workers can sync projects from worker threads.
+    The workers only load: the cleanup jobs that are not scoped to a project would delete what the other workers have
+    not loaded yet, so they run after all workers are done. If it fails, it sets `stop` so that the other workers
+    don't start syncing new projects.
     """
-    # Determine if IAM service is enabled
-    enabled_services = _services_enabled_on_project(resources.serviceusage, project_id)
-    iam_cred = _get_iam_resource(get_gcp_credentials())
-    if service_names.iam in enabled_services:
-        iam.sync(
-            neo4j_session, iam_cred, project_id, gcp_update_tag, common_job_parameters
-        )
+    with new_neo4j_session(
+        neo4j_driver,
+        neo4j_session,
+        neo4j_database,
+    ) as worker_neo4j_session:
+        try:
+            _sync_projects(
+                worker_neo4j_session,
+                credentials,
+                project_ids,
+                enabled_services,
+                gcp_update_tag,
+                common_job_parameters,
+                stop,
+                run_cleanup=False,
+            )
+        except Exception:
+            stop.set()
+            raise
 
 
 def _sync_multiple_projects(
     neo4j_session: neo4j.Session,
-    resources: Resource,
+    credentials: GoogleCredentials,
     projects: List[Dict],
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    project_workers: Optional[int] = None,
+    neo4j_driver: Optional[neo4j.Driver] = None,
+    neo4j_database: Optional[str] = None,
 ) -> None:
     """
     Handles graph sync for multiple GCP projects.
     :param neo4j_session: The Neo4j session
-    :param resources: namedtuple of the GCP resource objects
+    :param credentials: The GoogleCredentials object
     :param: projects: A list of projects. At minimum, this list should contain a list of dicts with the key "projectId"
      defined; so it would look like this: [{"projectId": "my-project-id-12345"}].
     This is the returned data from `crm.get_gcp_projects()`.
     See https://cloud.google.com/resource-manager/reference/rest/v1/projects.
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: Other parameters sent to Neo4j
+    :param project_workers: Number of projects to sync concurrently, each worker with its own Neo4j session and
+    resource objects. The cleanup jobs then run on the given session after all projects were loaded. If None, projects
+    are synced one at a time on the given session.
+    :param neo4j_driver: The Neo4j driver to open the sessions of the workers on. Projects are synced one at a time on
+    the given session if it is None.
+    :param neo4j_database: The Neo4j database to open the sessions of the workers on
     :return: Nothing
     """
     logger.info("Syncing %d GCP projects.", len(projects))
@@ -388,71 +493,71 @@ def _sync_multiple_projects(
         gcp_update_tag,
         common_job_parameters,
     )
-    # Compute data sync
-    for project in projects:
-        project_id = project["projectId"]
-        common_job_parameters["PROJECT_ID"] = project_id
-        logger.info("Syncing GCP project %s for Compute.", project_id)
-        _sync_single_project_compute(
-            neo4j_session,
-            resources,
-            project_id,
-            gcp_update_tag,
-            common_job_parameters,
-        )
-        del common_job_parameters["PROJECT_ID"]
 
-    # Storage data sync
-    for project in projects:
-        project_id = project["projectId"]
-        common_job_parameters["PROJECT_ID"] = project_id
-        logger.info("Syncing GCP project %s for Storage", project_id)
-        _sync_single_project_storage(
-            neo4j_session,
-            resources,
-            project_id,
-            gcp_update_tag,
-            common_job_parameters,
-        )
-        del common_job_parameters["PROJECT_ID"]
+    # Determine the resources available on each project.
+    enabled_services = _get_enabled_services_of_projects(
+        credentials,
+        [project["projectId"] for project in projects],
+    )
 
-    # GKE data sync
+    project_ids: "queue.SimpleQueue[str]" = queue.SimpleQueue()
     for project in projects:
-        project_id = project["projectId"]
-        common_job_parameters["PROJECT_ID"] = project_id
-        logger.info("Syncing GCP project %s for GKE", project_id)
-        _sync_single_project_gke(
+        project_ids.put(project["projectId"])
+    stop = threading.Event()
+
+    workers = min(project_workers or 1, len(projects))
+    if workers > 1 and neo4j_driver is None:
+        logger.warning(
+            "No Neo4j driver was given to open a session for each worker, syncing the GCP projects one by one.",
+        )
+    if workers <= 1 or neo4j_driver is None:
+        _sync_projects(
             neo4j_session,
-            resources,
-            project_id,
+            credentials,
+            project_ids,
+            enabled_services,
             gcp_update_tag,
             common_job_parameters,
+            stop,
         )
-        del common_job_parameters["PROJECT_ID"]
+        return
+
+    logger.info("Syncing GCP projects with %d workers.", workers)
+    executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="cartography-gcp-project",
+    )
+    try:
+        futures = [
+            executor.submit(
+                _sync_projects_in_new_session,
+                neo4j_driver,
+                neo4j_session,
+                neo4j_database,
+                credentials,
+                project_ids,
+                enabled_services,
+                gcp_update_tag,
+                common_job_parameters,
+                stop,
+            )
+            for _ in range(workers)
+        ]
+        for future in as_completed(futures):
+            future.result()
+    finally:
+        # If a worker failed, the others finish the project they are syncing and stop.
+        stop.set()
+        executor.shutdown(wait=True)
 
-    # DNS data sync
     for project in projects:
         project_id = project["projectId"]
-        common_job_parameters["PROJECT_ID"] = project_id
-        logger.info("Syncing GCP project %s for DNS", project_id)
-        _sync_single_project_dns(
+        _cleanup_project(
             neo4j_session,
-            resources,
             project_id,
-            gcp_update_tag,
-            common_job_parameters,
-        )
-        del common_job_parameters["PROJECT_ID"]
-
-    # IAM data sync
-    for project in projects:
-        project_id = project["projectId"]
-        common_job_parameters["PROJECT_ID"] = project_id
-        logger.info("Syncing GCP project %s for IAM", project_id)
-        _sync_single_project_iam(
-            neo4j_session, resources, project_id, gcp_update_tag, common_job_parameters
+            enabled_services.get(project_id, set()),
+            {**common_job_parameters, "PROJECT_ID": project_id},
         )
-        del common_job_parameters["PROJECT_ID"]
 
 
 @timeit
@@ -523,10 +628,13 @@ def start_gcp_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
 
     _sync_multiple_projects(
         neo4j_session,
-        resources,
+        credentials,
         projects,
         config.update_tag,
         common_job_parameters,
+        project_workers=config.gcp_project_workers,
+        neo4j_driver=config.neo4j_driver,
+        neo4j_database=config.neo4j_database,
     )
 
     run_analysis_job(
@@ -101,12 +101,59 @@ def get_zones_in_project(
             raise
 
 
+def _get_aggregated_list_responses(
+    collection: Resource,
+    project_id: str,
+    scope_type: str,
+    scope_names: List[str],
+    resource_name: str,
+) -> List[Dict]:
+    """
+    Return the resources of the given zonal or regional collection in all zones or regions of a project, fetched with
+    a single paginated aggregatedList call instead of one list call per zone or region.
+    See https://cloud.google.com/compute/docs/reference/rest/v1/instances/aggregatedList.
+    :param collection: The compute collection to list, e.g. compute.instances()
+    :param project_id: The project ID
+    :param scope_type: "zones" or "regions"
+    :param scope_names: The names of the zones or regions to return resources of. Resources in other zones or regions
+    are left out, like they would be if we listed the given zones or regions one by one.
+    :param resource_name: The name of the list of resources in each scope of the response, e.g. "instances"
+    :return: A list of response objects of the form {id: str, items: []}, one per zone or region that has resources,
+    in the same form as returned by the list call of that zone or region.
+    """
+    items_by_scope: Dict[str, List[Dict]] = {}
+    req = collection.aggregatedList(project=project_id)
+    while req is not None:
+        res = req.execute()
+        # Scopes without resources only have a `warning` instead of the resource list.
+        for scope, scoped_list in res.get("items", {}).items():
+            items_by_scope.setdefault(scope, []).extend(
+                scoped_list.get(resource_name, []),
+            )
+        req = collection.aggregatedList_next(
+            previous_request=req,
+            previous_response=res,
+        )
+
+    response_objects: List[Dict] = []
+    for name in scope_names:
+        items = items_by_scope.get(f"{scope_type}/{name}")
+        if items:
+            response_objects.append(
+                {
+                    "id": f"projects/{project_id}/{scope_type}/{name}/{resource_name}",
+                    "items": items,
+                },
+            )
+    return response_objects
+
+
 @timeit
 def get_gcp_instance_responses(
     project_id: str,
     zones: Optional[List[Dict]],
     compute: Resource,
-) -> List[Resource]:
+) -> List[Dict]:
     """
     Return list of GCP instance response objects for a given project and list of zones
     :param project_id: The project ID
@@ -117,25 +164,38 @@ def get_gcp_instance_responses(
     if not zones:
         # If the Compute Engine API is not enabled for a project, there are no zones and therefore no instances.
         return []
-    response_objects: List[Resource] = []
-    for zone in zones:
-        req = compute.instances().list(project=project_id, zone=zone["name"])
-        res = req.execute()
-        response_objects.append(res)
-    return response_objects
+    return _get_aggregated_list_responses(
+        compute.instances(),
+        project_id,
+        "zones",
+        [zone["name"] for zone in zones],
+        "instances",
+    )
 
 
 @timeit
-def get_gcp_subnets(projectid: str, region: str, compute: Resource) -> Resource:
+def get_gcp_subnet_responses(
+    project_id: str,
+    regions: List[str],
+    compute: Resource,
+) -> List[Dict]:
     """
-    Return list of all subnets in the given projectid and region
-    :param projectid: THe projectid
-    :param region: The region to pull subnets from
+    Return the subnets of all the given regions of a project, fetched in a single aggregatedList call.
+    :param project_id: The project ID
+    :param regions: The list of regions to return subnets of
     :param compute: The compute resource object created by googleapiclient.discovery.build()
-    :return: Response object containing data on all GCP subnets for a given project
+    :return: A list of response objects of the form {id: str, items: []}, one per region that has subnets, where each
+    item in `items` is a GCP subnet
     """
-    req = compute.subnetworks().list(project=projectid, region=region)
-    return req.execute()
+    if not regions:
+        return []
+    return _get_aggregated_list_responses(
+        compute.subnetworks(),
+        project_id,
+        "regions",
+        regions,
+        "subnetworks",
+    )
 
 
 @timeit
@@ -151,20 +211,29 @@ def get_gcp_vpcs(projectid: str, compute: Resource) -> Resource:
 
 
 @timeit
-def get_gcp_regional_forwarding_rules(
+def get_gcp_regional_forwarding_rule_responses(
     project_id: str,
-    region: str,
+    regions: List[str],
     compute: Resource,
-) -> Resource:
+) -> List[Dict]:
     """
-    Return list of all regional forwarding rules in the given project_id and region
+    Return the regional forwarding rules of all the given regions of a project, fetched in a single aggregatedList
+    call.
     :param project_id: The project ID
-    :param region: The region to pull forwarding rules from
+    :param regions: The list of regions to return forwarding rules of
     :param compute: The compute resource object created by googleapiclient.discovery.build()
-    :return: Response object containing data on all GCP forwarding rules for a given project
+    :return: A list of response objects of the form {id: str, items: []}, one per region that has forwarding rules,
+    where each item in `items` is a GCP forwarding rule
     """
-    req = compute.forwardingRules().list(project=project_id, region=region)
-    return req.execute()
+    if not regions:
+        return []
+    return _get_aggregated_list_responses(
+        compute.forwardingRules(),
+        project_id,
+        "regions",
+        regions,
+        "forwardingRules",
+    )
 
 
 @timeit
@@ -1206,6 +1275,7 @@ def sync_gcp_instances(
     zones: Optional[List[Dict]],
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Get GCP instances using the Compute resource object, ingest to Neo4j, and clean up old data.
@@ -1217,13 +1287,15 @@ def sync_gcp_instances(
     `get_zones_in_project()`
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param run_cleanup: Whether to clean up old data, see `cleanup()`
     :return: Nothing
     """
     instance_responses = get_gcp_instance_responses(project_id, zones, compute)
     instance_list = transform_gcp_instances(instance_responses)
     load_gcp_instances(neo4j_session, instance_list, gcp_update_tag)
     # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
-    cleanup_gcp_instances(neo4j_session, common_job_parameters)
+    if run_cleanup:
+        cleanup_gcp_instances(neo4j_session, common_job_parameters)
 
 
 @timeit
@@ -1233,6 +1305,7 @@ def sync_gcp_vpcs(
     project_id: str,
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Get GCP VPCs, ingest to Neo4j, and clean up old data.
@@ -1241,12 +1314,14 @@ def sync_gcp_vpcs(
     :param project_id: The project ID to sync
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param run_cleanup: Whether to clean up old data, see `cleanup()`
     :return: Nothing
     """
     vpc_res = get_gcp_vpcs(project_id, compute)
     vpcs = transform_gcp_vpcs(vpc_res)
     load_gcp_vpcs(neo4j_session, vpcs, gcp_update_tag, project_id)
-    cleanup_gcp_vpcs(neo4j_session, common_job_parameters)
+    if run_cleanup:
+        cleanup_gcp_vpcs(neo4j_session, common_job_parameters)
 
 
 @timeit
@@ -1257,12 +1332,13 @@ def sync_gcp_subnets(
     regions: List[str],
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
-    for r in regions:
-        subnet_res = get_gcp_subnets(project_id, r, compute)
+    for subnet_res in get_gcp_subnet_responses(project_id, regions, compute):
         subnets = transform_gcp_subnets(subnet_res)
         load_gcp_subnets(neo4j_session, subnets, gcp_update_tag)
-        # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
+    # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
+    if run_cleanup:
         cleanup_gcp_subnets(neo4j_session, common_job_parameters)
 
 
@@ -1274,6 +1350,7 @@ def sync_gcp_forwarding_rules(
     regions: List[str],
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Sync GCP Both Global and Regional Forwarding Rules, ingest to Neo4j, and clean up old data.
@@ -1283,19 +1360,22 @@ def sync_gcp_forwarding_rules(
     :param regions: List of regions.
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param run_cleanup: Whether to clean up old data, see `cleanup()`
     :return: Nothing
     """
     global_fwd_response = get_gcp_global_forwarding_rules(project_id, compute)
     forwarding_rules = transform_gcp_forwarding_rules(global_fwd_response)
     load_gcp_forwarding_rules(neo4j_session, forwarding_rules, gcp_update_tag)
-    # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
-    cleanup_gcp_forwarding_rules(neo4j_session, common_job_parameters)
 
-    for r in regions:
-        fwd_response = get_gcp_regional_forwarding_rules(project_id, r, compute)
+    for fwd_response in get_gcp_regional_forwarding_rule_responses(
+        project_id,
+        regions,
+        compute,
+    ):
         forwarding_rules = transform_gcp_forwarding_rules(fwd_response)
         load_gcp_forwarding_rules(neo4j_session, forwarding_rules, gcp_update_tag)
-        # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
+    # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
+    if run_cleanup:
         cleanup_gcp_forwarding_rules(neo4j_session, common_job_parameters)
 
 
@@ -1306,6 +1386,7 @@ def sync_gcp_firewall_rules(
     project_id: str,
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Sync GCP firewalls
@@ -1313,13 +1394,31 @@ def sync_gcp_firewall_rules(
     :param compute: The Compute resource object
     :param project_id: The project ID that the firewalls are in
     :param common_job_parameters: dict of other job params to pass to Neo4j
+    :param run_cleanup: Whether to clean up old data, see `cleanup()`
     :return: Nothing
     """
     fw_response = get_gcp_firewall_ingress_rules(project_id, compute)
     fw_list = transform_gcp_firewall(fw_response)
     load_gcp_ingress_firewalls(neo4j_session, fw_list, gcp_update_tag)
     # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
+    if run_cleanup:
+        cleanup_gcp_firewall_rules(neo4j_session, common_job_parameters)
+
+
+@timeit
+def cleanup(neo4j_session: neo4j.Session, common_job_parameters: Dict) -> None:
+    """
+    Delete out-of-date GCP Compute nodes and relationships. Most of the cleanup jobs are not scoped to the project in
+    common_job_parameters, so when several projects are synced at once, this runs after all of them were loaded.
+    :param neo4j_session: The Neo4j session
+    :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :return: Nothing
+    """
+    cleanup_gcp_vpcs(neo4j_session, common_job_parameters)
     cleanup_gcp_firewall_rules(neo4j_session, common_job_parameters)
+    cleanup_gcp_subnets(neo4j_session, common_job_parameters)
+    cleanup_gcp_instances(neo4j_session, common_job_parameters)
+    cleanup_gcp_forwarding_rules(neo4j_session, common_job_parameters)
 
 
 def _zones_to_regions(zones: List[str]) -> List[Set]:
@@ -1342,6 +1441,7 @@ def sync(
     project_id: str,
     gcp_update_tag: int,
     common_job_parameters: dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Sync all objects that we need the GCP Compute resource object for.
@@ -1352,6 +1452,7 @@ def sync(
     https://cloud.google.com/resource-manager/reference/rest/v1/projects
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param run_cleanup: Whether to clean up old data, see `cleanup()`
     :return: Nothing
     """
     logger.info("Syncing Compute objects for project %s.", project_id)
@@ -1367,6 +1468,7 @@ def sync(
             project_id,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
         sync_gcp_firewall_rules(
             neo4j_session,
@@ -1374,6 +1476,7 @@ def sync(
             project_id,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
         sync_gcp_subnets(
             neo4j_session,
@@ -1382,6 +1485,7 @@ def sync(
             regions,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
         sync_gcp_instances(
             neo4j_session,
@@ -1390,6 +1494,7 @@ def sync(
             zones,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
         sync_gcp_forwarding_rules(
             neo4j_session,
@@ -1398,4 +1503,5 @@ def sync(
             regions,
             gcp_update_tag,
             common_job_parameters,
+            run_cleanup=run_cleanup,
         )
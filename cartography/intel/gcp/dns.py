@@ -249,6 +249,7 @@ def sync(
     project_id: str,
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Get GCP DNS Zones and Resource Record Sets using the DNS resource object, ingest to Neo4j, and clean up old data.
@@ -268,6 +269,10 @@ def sync(
     :type common_job_parameters: dict
     :param common_job_parameters: Dictionary of other job parameters to pass to Neo4j
 
+    :type run_cleanup: bool
+    :param run_cleanup: Whether to clean up old data. The cleanup job is not scoped to the project, so when several
+    projects are synced at once, it runs after all of them were loaded.
+
     :rtype: NoneType
     :return: Nothing
     """
@@ -279,4 +284,5 @@ def sync(
     dns_rrs = get_dns_rrs(dns, dns_zones, project_id)
     load_rrs(neo4j_session, dns_rrs, project_id, gcp_update_tag)
     # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
-    cleanup_dns_records(neo4j_session, common_job_parameters)
+    if run_cleanup:
+        cleanup_dns_records(neo4j_session, common_job_parameters)
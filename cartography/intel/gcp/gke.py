@@ -200,6 +200,7 @@ def sync_gke_clusters(
     project_id: str,
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Get GCP GKE Clusters using the Container resource object, ingest to Neo4j, and clean up old data.
@@ -219,6 +220,10 @@ def sync_gke_clusters(
     :type common_job_parameters: dict
     :param common_job_parameters: Dictionary of other job parameters to pass to Neo4j
 
+    :type run_cleanup: bool
+    :param run_cleanup: Whether to clean up old data. The cleanup job is not scoped to the project, so when several
+    projects are synced at once, it runs after all of them were loaded.
+
     :rtype: NoneType
     :return: Nothing
     """
@@ -226,4 +231,5 @@ def sync_gke_clusters(
     gke_res = get_gke_clusters(container, project_id)
     load_gke_clusters(neo4j_session, gke_res, project_id, gcp_update_tag)
     # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
-    cleanup_gke_clusters(neo4j_session, common_job_parameters)
+    if run_cleanup:
+        cleanup_gke_clusters(neo4j_session, common_job_parameters)
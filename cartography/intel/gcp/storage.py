@@ -250,6 +250,7 @@ def sync_gcp_buckets(
     project_id: str,
     gcp_update_tag: int,
     common_job_parameters: Dict,
+    run_cleanup: bool = True,
 ) -> None:
     """
     Get GCP instances using the Storage resource object, ingest to Neo4j, and clean up old data.
@@ -269,6 +270,10 @@ def sync_gcp_buckets(
     :type common_job_parameters: dict
     :param common_job_parameters: Dictionary of other job parameters to pass to Neo4j
 
+    :type run_cleanup: bool
+    :param run_cleanup: Whether to clean up old data. The cleanup job is not scoped to the project, so when several
+    projects are synced at once, it runs after all of them were loaded.
+
     :rtype: NoneType
     :return: Nothing
     """
@@ -277,4 +282,5 @@ def sync_gcp_buckets(
     bucket_list = transform_gcp_buckets(storage_res)
     load_gcp_buckets(neo4j_session, bucket_list, gcp_update_tag)
     # TODO scope the cleanup to the current project - https://github.com/cartography-cncf/cartography/issues/381
-    cleanup_gcp_buckets(neo4j_session, common_job_parameters)
+    if run_cleanup:
+        cleanup_gcp_buckets(neo4j_session, common_job_parameters)
@@ -9,6 +9,8 @@ import cartography.intel.github.repos
 import cartography.intel.github.teams
 import cartography.intel.github.users
 from cartography.config import Config
+from cartography.intel.github.util import configure_retries
+from cartography.intel.github.util import DEFAULT_HTTP_RETRIES
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,13 @@ def start_github_ingestion(neo4j_session: neo4j.Session, config: Config) -> None
         return
 
     auth_tokens = json.loads(base64.b64decode(config.github_config).decode())
+    configure_retries(
+        (
+            config.github_http_retries
+            if config.github_http_retries is not None
+            else DEFAULT_HTTP_RETRIES
+        ),
+    )
     common_job_parameters = {
         "UPDATE_TAG": config.update_tag,
     }
@@ -2,6 +2,7 @@ import configparser
 import logging
 from collections import defaultdict
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from string import Template
 from typing import Any
 from typing import Dict
@@ -16,6 +17,8 @@ from packaging.utils import canonicalize_name
 from cartography.client.core.tx import load as load_data
 from cartography.graph.job import GraphJob
 from cartography.intel.github.util import fetch_all
+from cartography.intel.github.util import fetch_graphql
+from cartography.intel.github.util import GraphqlRateLimit
 from cartography.intel.github.util import PaginatedGraphqlData
 from cartography.models.github.dependencies import GitHubDependencySchema
 from cartography.models.github.manifests import DependencyGraphManifestSchema
@@ -118,14 +121,34 @@ GITHUB_ORG_REPOS_PAGINATED_GRAPHQL = """
 # Note: In the above query, `HEAD` references the default branch.
 # See https://stackoverflow.com/questions/48935381/github-graphql-api-default-branch-in-repository
 
-GITHUB_REPO_COLLABS_PAGINATED_GRAPHQL = """
-    query($login: String!, $repo: String!, $affiliation: CollaboratorAffiliation!, $cursor: String) {
-        organization(login: $login) {
+# Collaborators of this many repos are fetched with one query, each repo under its own alias.
+GITHUB_REPO_COLLABS_REPOS_PER_QUERY = 20
+# Number of such queries that are run at the same time.
+GITHUB_REPO_COLLABS_CONCURRENT_QUERIES = 4
+
+GITHUB_REPO_COLLABS_GRAPHQL = Template(
+    """
+    query($$login: String!, $$affiliation: CollaboratorAffiliation!, $variables) {
+        organization(login: $$login) {
             url
             login
-            repository(name: $repo){
+            $repositories
+        }
+        rateLimit {
+            limit
+            cost
+            remaining
+            resetAt
+        }
+    }
+    """
+)
+
+GITHUB_REPO_COLLABS_REPOSITORY_GRAPHQL = Template(
+    """
+            repo$index: repository(name: $$repo$index){
                 name
-                collaborators(first: 50, affiliation: $affiliation, after: $cursor) {
+                collaborators(first: 100, affiliation: $$affiliation, after: $$cursor$index) {
                     edges {
                         permission
                     }
@@ -142,15 +165,25 @@ GITHUB_REPO_COLLABS_PAGINATED_GRAPHQL = """
                     }
                 }
             }
-        }
-        rateLimit {
-            limit
-            cost
-            remaining
-            resetAt
-        }
-    }
     """
+)
+
+
+def _build_repo_collaborators_query(repo_count: int) -> str:
+    """
+    Return a query for one page of collaborators of each of `repo_count` repos, where the name and the cursor of the
+    i-th repo are given in the `repo{i}` and `cursor{i}` variables, and its collaborators are returned under the
+    `repo{i}` alias.
+    """
+    return GITHUB_REPO_COLLABS_GRAPHQL.substitute(
+        variables=", ".join(
+            f"$repo{i}: String!, $cursor{i}: String" for i in range(repo_count)
+        ),
+        repositories="".join(
+            GITHUB_REPO_COLLABS_REPOSITORY_GRAPHQL.substitute(index=i)
+            for i in range(repo_count)
+        ),
+    )
 
 
 def _get_repo_collaborators_inner_func(
@@ -159,46 +192,55 @@ def _get_repo_collaborators_inner_func(
     token: str,
     repo_raw_data: list[dict[str, Any]],
     affiliation: str,
-    collab_users: list[dict[str, Any]],
-    collab_permission: list[str],
 ) -> dict[str, list[UserAffiliationAndRepoPermission]]:
     result: dict[str, list[UserAffiliationAndRepoPermission]] = {}
 
+    repos_to_fetch = []
     for repo in repo_raw_data:
-        repo_name = repo["name"]
-        repo_url = repo["url"]
-
         if (
             affiliation == "OUTSIDE" and repo["outsideCollaborators"]["totalCount"] == 0
         ) or (
             affiliation == "DIRECT" and repo["directCollaborators"]["totalCount"] == 0
         ):
             # repo has no collabs of the affiliation type we're looking for, so don't waste time making an API call
-            result[repo_url] = []
+            result[repo["url"]] = []
             continue
+        repos_to_fetch.append(repo)
+
+    batches = [
+        repos_to_fetch[i : i + GITHUB_REPO_COLLABS_REPOS_PER_QUERY]
+        for i in range(0, len(repos_to_fetch), GITHUB_REPO_COLLABS_REPOS_PER_QUERY)
+    ]
+    rate_limit = GraphqlRateLimit(token)
 
-        logger.info(f"Loading {affiliation} collaborators for repo {repo_name}.")
-        collaborators = _get_repo_collaborators(
+    def get_batch(batch: list[dict[str, Any]]) -> Dict[str, PaginatedGraphqlData]:
+        return _get_repo_collaborators(
             token,
             api_url,
             org,
-            repo_name,
+            [repo["name"] for repo in batch],
             affiliation,
+            rate_limit,
         )
 
-        # nodes and edges are expected to always be present given that we only call for them if totalCount is > 0
-        # however sometimes GitHub returns None, as in issue 1334 and 1404.
-        for collab in collaborators.nodes or []:
-            collab_users.append(collab)
-
-        # The `or []` is because `.edges` can be None.
-        for perm in collaborators.edges or []:
-            collab_permission.append(perm["permission"])
-
-        result[repo_url] = [
-            UserAffiliationAndRepoPermission(user, permission, affiliation)
-            for user, permission in zip(collab_users, collab_permission)
-        ]
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(GITHUB_REPO_COLLABS_CONCURRENT_QUERIES, len(batches))),
+        thread_name_prefix="cartography-github-collabs",
+    ) as executor:
+        for batch, collaborators_by_repo in zip(
+            batches,
+            executor.map(get_batch, batches),
+        ):
+            for repo in batch:
+                collaborators = collaborators_by_repo.get(repo["name"])
+                if collaborators is None:
+                    continue
+                result[repo["url"]] = [
+                    UserAffiliationAndRepoPermission(
+                        user, perm["permission"], affiliation
+                    )
+                    for user, perm in zip(collaborators.nodes, collaborators.edges)
+                ]
     return result
 
 
@@ -210,21 +252,20 @@ def _get_repo_collaborators_for_multiple_repos(
     token: str,
 ) -> dict[str, list[UserAffiliationAndRepoPermission]]:
     """
-    For every repo in the given list, retrieve the collaborators.
+    For every repo in the given list, retrieve the collaborators. The collaborators of several repos are fetched with
+    one query, and several such queries run at the same time.
     :param repo_raw_data: A list of dicts representing repos. See tests.data.github.repos.GET_REPOS for data shape.
     :param affiliation: The type of affiliation to retrieve collaborators for. Either 'DIRECT' or 'OUTSIDE'.
       See https://docs.github.com/en/graphql/reference/enums#collaboratoraffiliation
     :param org: The name of the target Github organization as string.
     :param api_url: The Github v4 API endpoint as string.
     :param token: The Github API token as string.
-    :return: A dictionary of repo URL to list of UserAffiliationAndRepoPermission
+    :return: A dictionary of repo URL to list of UserAffiliationAndRepoPermission. Repos whose collaborators could not
+    be read are left out.
     """
     logger.info(
         f'Retrieving repo collaborators for affiliation "{affiliation}" on org "{org}".',
     )
-    collab_users: List[dict[str, Any]] = []
-    collab_permission: List[str] = []
-
     result: dict[str, list[UserAffiliationAndRepoPermission]] = retries_with_backoff(
         _get_repo_collaborators_inner_func,
         TypeError,
@@ -236,8 +277,6 @@ def _get_repo_collaborators_for_multiple_repos(
         token=token,
         repo_raw_data=repo_raw_data,
         affiliation=affiliation,
-        collab_users=collab_users,
-        collab_permission=collab_permission,
     )
     return result
 
@@ -246,30 +285,68 @@ def _get_repo_collaborators(
     token: str,
     api_url: str,
     organization: str,
-    repo: str,
+    repos: List[str],
     affiliation: str,
-) -> PaginatedGraphqlData:
+    rate_limit: GraphqlRateLimit,
+) -> Dict[str, PaginatedGraphqlData]:
     """
-    Retrieve a list of collaborators for a given repository, as described in
-    https://docs.github.com/en/graphql/reference/objects#repositorycollaboratorconnection.
+    Retrieve the collaborators of the given repositories, as described in
+    https://docs.github.com/en/graphql/reference/objects#repositorycollaboratorconnection. Each query fetches a page of
+    collaborators of every repo that has more.
     :param token: The Github API token as string.
     :param api_url: The Github v4 API endpoint as string.
     :param organization: The name of the target Github organization as string.
-    :pram repo: The name of the target Github repository as string.
+    :param repos: The names of the target Github repositories.
     :param affiliation: The type of affiliation to retrieve collaborators for. Either 'DIRECT' or 'OUTSIDE'.
       See https://docs.github.com/en/graphql/reference/enums#collaboratoraffiliation
-    :return: A list of dicts representing repos. See tests.data.github.repos for data shape.
+    :param rate_limit: The GraphqlRateLimit of `token`.
+    :return: A dict of repo name to its collaborators. Repos that GitHub returned no collaborators for, e.g. because
+    of missing permissions, are left out.
     """
-    collaborators, _ = fetch_all(
-        token,
-        api_url,
-        organization,
-        GITHUB_REPO_COLLABS_PAGINATED_GRAPHQL,
-        "repository",
-        resource_inner_type="collaborators",
-        repo=repo,
-        affiliation=affiliation,
-    )
+    collaborators: Dict[str, PaginatedGraphqlData] = {}
+    cursors: Dict[str, Optional[str]] = {repo: None for repo in repos}
+    while cursors:
+        page_repos = list(cursors)
+        variables: Dict[str, Any] = {"login": organization, "affiliation": affiliation}
+        for i, repo in enumerate(page_repos):
+            variables[f"repo{i}"] = repo
+            variables[f"cursor{i}"] = cursors[repo]
+        logger.debug(
+            f"Loading {affiliation} collaborators for {len(page_repos)} repos.",
+        )
+        resp = fetch_graphql(
+            token,
+            api_url,
+            _build_repo_collaborators_query(len(page_repos)),
+            variables,
+            rate_limit,
+        )
+        org_data = (resp.get("data") or {}).get("organization")
+        if org_data is None:
+            # The whole query failed, e.g. on a timeout. TypeError makes `retries_with_backoff` try again.
+            raise TypeError(
+                f"Got no {affiliation} collaborators data for org {organization}: {resp.get('errors')}",
+            )
+
+        cursors = {}
+        for i, repo in enumerate(page_repos):
+            # GitHub returns None for repos it could not read, as in issue 1334 and 1404.
+            page = (org_data.get(f"repo{i}") or {}).get("collaborators")
+            if page is None:
+                logger.warning(
+                    f"Got no {affiliation} collaborators for repo {repo}; skipping it.",
+                )
+                collaborators.pop(repo, None)
+                continue
+            repo_collaborators = collaborators.setdefault(
+                repo,
+                PaginatedGraphqlData(nodes=[], edges=[]),
+            )
+            # The `or []` is because `.nodes` and `.edges` can be None.
+            repo_collaborators.nodes.extend(page.get("nodes") or [])
+            repo_collaborators.edges.extend(page.get("edges") or [])
+            if page["pageInfo"]["hasNextPage"]:
+                cursors[repo] = page["pageInfo"]["endCursor"]
     return collaborators
 
 
@@ -1,5 +1,6 @@
 import json
 import logging
+import threading
 import time
 from datetime import datetime
 from datetime import timedelta
@@ -12,11 +13,19 @@ from typing import Optional
 from typing import Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 # Connect and read timeouts of 60 seconds each; see https://requests.readthedocs.io/en/master/user/advanced/#timeouts
 _TIMEOUT = (60, 60)
 _GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD = 500
+# Number of connections per host that the shared session keeps open; more than the concurrent queries in repos.py.
+_POOL_MAXSIZE = 10
+DEFAULT_HTTP_RETRIES = 5
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_retries = DEFAULT_HTTP_RETRIES
 
 
 class PaginatedGraphqlData(NamedTuple):
@@ -24,14 +33,46 @@ class PaginatedGraphqlData(NamedTuple):
     edges: List[Dict[str, Any]]
 
 
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    # The session does not retry failed requests itself: `fetch_all()` and `fetch_graphql()` already do.
+    adapter = HTTPAdapter(pool_maxsize=_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure_retries(retries: int = DEFAULT_HTTP_RETRIES) -> None:
+    """
+    Set the number of retries that `fetch_all()` and `fetch_graphql()` perform when they are not given one.
+    :param retries: Number of retries to perform.
+    """
+    global _retries
+    _retries = retries
+
+
+def get_session() -> requests.Session:
+    """
+    Return the requests.Session shared by all GitHub API calls. It keeps connections to the API open between calls
+    instead of doing a TCP and TLS handshake for every page, and like every requests.Session it asks for gzip
+    compressed responses and decompresses them.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
 def handle_rate_limit_sleep(token: str) -> None:
     """
     Check the remaining rate limit and sleep if remaining is below threshold
     :param token: The Github API token as string.
     """
-    response = requests.get(
+    response = get_session().get(
         "https://api.github.com/rate_limit",
         headers={"Authorization": f"token {token}"},
+        timeout=_TIMEOUT,
     )
     response.raise_for_status()
     response_json = response.json()
@@ -51,6 +92,66 @@ def handle_rate_limit_sleep(token: str) -> None:
     time.sleep(sleep_duration.seconds)
 
 
+class GraphqlRateLimit:
+    """
+    Tracks the remaining GitHub GraphQL rate limit from the `rateLimit` object that queries return, so that callers
+    don't need a REST call to /rate_limit before every page. Until the first response is seen, /rate_limit is checked
+    once, in case the budget is already used up. Shared by the threads that query with the same token.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        threshold: int = _GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD,
+    ) -> None:
+        self.token = token
+        self.threshold = threshold
+        self._checked = False
+        self._remaining: Optional[int] = None
+        self._reset_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def update(self, rate_limit: Optional[Dict[str, Any]]) -> None:
+        """
+        Records the `rateLimit` object of a GraphQL response, if the query asked for it.
+        """
+        if not rate_limit:
+            return
+        with self._lock:
+            self._remaining = rate_limit["remaining"]
+            self._reset_at = datetime.fromisoformat(
+                rate_limit["resetAt"].replace("Z", "+00:00"),
+            )
+
+    def wait(self) -> None:
+        """
+        Sleeps until the rate limit resets if the remaining budget is below the threshold. Other threads that call
+        this in the meantime wait as well.
+        """
+        with self._lock:
+            if not self._checked:
+                handle_rate_limit_sleep(self.token)
+                self._checked = True
+                return
+            if (
+                self._remaining is None
+                or self._reset_at is None
+                or self._remaining > self.threshold
+            ):
+                return
+            # add an extra minute for safety
+            sleep_duration = (
+                self._reset_at - datetime.now(tz.utc) + timedelta(minutes=1)
+            )
+            logger.warning(
+                f"Github graphql ratelimit has {self._remaining} remaining and is under threshold {self.threshold},"
+                f" sleeping until reset at {self._reset_at} for {sleep_duration}",
+            )
+            time.sleep(max(0, sleep_duration.total_seconds()))
+            # The budget is full again; the next response tells us how much of it is left.
+            self._remaining = None
+
+
 def call_github_api(query: str, variables: str, token: str, api_url: str) -> Dict:
     """
     Calls the GitHub v4 API and executes a query
@@ -62,7 +163,7 @@ def call_github_api(query: str, variables: str, token: str, api_url: str) -> Dic
     """
     headers = {"Authorization": f"token {token}"}
     try:
-        response = requests.post(
+        response = get_session().post(
             api_url,
             json={"query": query, "variables": variables},
             headers=headers,
@@ -111,13 +212,59 @@ def fetch_page(
     return response
 
 
+def fetch_graphql(
+    token: str,
+    api_url: str,
+    query: str,
+    variables: Dict[str, Any],
+    rate_limit: GraphqlRateLimit,
+    retries: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run a GraphQL query that selects `rateLimit`, waiting for the rate limit budget tracked by `rate_limit` and
+    retrying flaky requests like `fetch_all()` does.
+    :param token: The Github API token as string.
+    :param api_url: The Github v4 API endpoint as string.
+    :param query: The GraphQL query. It should select the `rateLimit` object, see
+    https://docs.github.com/en/graphql/overview/rate-limits-and-query-limits-for-the-graphql-api.
+    :param variables: The GraphQL query variables.
+    :param rate_limit: The GraphqlRateLimit shared by all queries made with `token`.
+    :param retries: Number of retries to perform.  Github APIs are often flakey and retrying the request helps. If
+    None, the number set with `configure_retries()` is used.
+    :return: The raw response object from the requests.post().json() call.
+    """
+    if retries is None:
+        retries = _retries
+    retry = 0
+    while True:
+        rate_limit.wait()
+        try:
+            resp = call_github_api(query, json.dumps(variables), token, api_url)
+        except (
+            requests.exceptions.Timeout,
+            requests.exceptions.HTTPError,
+            requests.exceptions.ChunkedEncodingError,
+        ):
+            retry += 1
+            if retry >= retries:
+                logger.error(
+                    f"GitHub: Could not run query due to HTTP error after {retry} retries. Raising exception.",
+                    exc_info=True,
+                )
+                raise
+            time.sleep(2**retry)
+            continue
+        rate_limit.update((resp.get("data") or {}).get("rateLimit"))
+        return resp
+
+
 def fetch_all(
     token: str,
     api_url: str,
     organization: str,
     query: str,
     resource_type: str,
-    retries: int = 5,
+    retries: Optional[int] = None,
     resource_inner_type: Optional[str] = None,
     **kwargs: Any,
 ) -> Tuple[PaginatedGraphqlData, Dict[str, Any]]:
@@ -131,7 +278,8 @@ def fetch_all(
     :param resource_type: The name of the paginated resource under the organization e.g. `membersWithRole` or
     `repositories`. See the fields under https://docs.github.com/en/graphql/reference/objects#organization for a full
     list.
-    :param retries: Number of retries to perform.  Github APIs are often flakey and retrying the request helps.
+    :param retries: Number of retries to perform.  Github APIs are often flakey and retrying the request helps. If
+    None, the number set with `configure_retries()` is used.
     :param resource_inner_type: Optional str. Default = None. Sometimes we need to paginate a field that is inside
     `resource_type` - for example: organization['team']['repositories']. In this case, we specify 'repositories' as the
     `resource_inner_type`.
@@ -139,6 +287,8 @@ def fetch_all(
     :return: A 2-tuple containing 1. A list of data items of the given `resource_type` and `field_name`,  and 2. a dict
     containing the `url` and the `login` fields of the organization that the items belong to.
     """
+    if retries is None:
+        retries = _retries
     cursor = None
     has_next_page = True
     org_data: Dict[str, Any] = {}
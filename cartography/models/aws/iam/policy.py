@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import OtherRelationships
+from cartography.models.core.relationships import TargetNodeMatcher
+
+
+@dataclass(frozen=True)
+class AWSPolicyNodeProperties(CartographyNodeProperties):
+    """
+    Schema describing an AWSPolicy. Managed policies are identified by their ARN and inline policies by their
+    principal's ARN and name; see cartography.intel.aws.iam.transform_policy_id().
+    """
+
+    id: PropertyRef = PropertyRef("id")
+    name: PropertyRef = PropertyRef("name")
+    type: PropertyRef = PropertyRef("type")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSPolicyToAWSPrincipalRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSPolicyToAWSPrincipalRel(CartographyRelSchema):
+    target_node_label: str = "AWSPrincipal"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"arn": PropertyRef("principal_arn")},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "POLICY"
+    properties: AWSPolicyToAWSPrincipalRelProperties = (
+        AWSPolicyToAWSPrincipalRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AWSPolicySchema(CartographyNodeSchema):
+    """
+    AWS managed policies are shared by all accounts, so policies have no sub resource relationship. They are cleaned
+    up through their principals by the aws_import_*_cleanup jobs.
+    """
+
+    label: str = "AWSPolicy"
+    properties: AWSPolicyNodeProperties = AWSPolicyNodeProperties()
+    sub_resource_relationship = None
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            AWSPolicyToAWSPrincipalRel(),
+        ],
+    )
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelProperties
+from cartography.models.core.relationships import CartographyRelSchema
+from cartography.models.core.relationships import LinkDirection
+from cartography.models.core.relationships import make_target_node_matcher
+from cartography.models.core.relationships import OtherRelationships
+from cartography.models.core.relationships import TargetNodeMatcher
+
+
+@dataclass(frozen=True)
+class AWSPolicyStatementNodeProperties(CartographyNodeProperties):
+    """
+    Schema describing an AWSPolicyStatement, as transformed by cartography.intel.aws.iam.transform_policy_data().
+    """
+
+    id: PropertyRef = PropertyRef("id")
+    effect: PropertyRef = PropertyRef("Effect")
+    action: PropertyRef = PropertyRef("Action")
+    notaction: PropertyRef = PropertyRef("NotAction")
+    resource: PropertyRef = PropertyRef("Resource")
+    notresource: PropertyRef = PropertyRef("NotResource")
+    condition: PropertyRef = PropertyRef("Condition")
+    sid: PropertyRef = PropertyRef("Sid")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSPolicyStatementToAWSPolicyRelProperties(CartographyRelProperties):
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSPolicyStatementToAWSPolicyRel(CartographyRelSchema):
+    target_node_label: str = "AWSPolicy"
+    target_node_matcher: TargetNodeMatcher = make_target_node_matcher(
+        {"id": PropertyRef("policy_id")},
+    )
+    direction: LinkDirection = LinkDirection.INWARD
+    rel_label: str = "STATEMENT"
+    properties: AWSPolicyStatementToAWSPolicyRelProperties = (
+        AWSPolicyStatementToAWSPolicyRelProperties()
+    )
+
+
+@dataclass(frozen=True)
+class AWSPolicyStatementSchema(CartographyNodeSchema):
+    label: str = "AWSPolicyStatement"
+    properties: AWSPolicyStatementNodeProperties = AWSPolicyStatementNodeProperties()
+    sub_resource_relationship = None
+    other_relationships: OtherRelationships = OtherRelationships(
+        [
+            AWSPolicyStatementToAWSPolicyRel(),
+        ],
+    )
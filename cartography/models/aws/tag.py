@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+
+from cartography.models.core.common import PropertyRef
+from cartography.models.core.nodes import CartographyNodeProperties
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.nodes import ExtraNodeLabels
+
+
+@dataclass(frozen=True)
+class AWSTagNodeProperties(CartographyNodeProperties):
+    """
+    Schema describing an AWSTag, identified by its key and value as `key:value`.
+    """
+
+    id: PropertyRef = PropertyRef("id")
+    key: PropertyRef = PropertyRef("key")
+    value: PropertyRef = PropertyRef("value")
+    region: PropertyRef = PropertyRef("region")
+    lastupdated: PropertyRef = PropertyRef("lastupdated", set_in_kwargs=True)
+
+
+@dataclass(frozen=True)
+class AWSTagSchema(CartographyNodeSchema):
+    """
+    A tag is shared by every resource, in any account, that carries the same key and value, so tags have no sub
+    resource relationship. The (resource)-[:TAGGED]->(AWSTag) relationships are loaded by
+    cartography.intel.aws.resourcegroupstaggingapi, and tags are cleaned up by the aws_import_tags_cleanup job.
+    """
+
+    label: str = "AWSTag"
+    properties: AWSTagNodeProperties = AWSTagNodeProperties()
+    extra_node_labels: ExtraNodeLabels = ExtraNodeLabels(["Tag"])
+    sub_resource_relationship = None
+    other_relationships = None
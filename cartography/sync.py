@@ -3,9 +3,18 @@ import logging
 import re
 import time
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from pkgutil import iter_modules
 from typing import Callable
+from typing import cast
+from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Union
 
@@ -43,8 +52,15 @@ import cartography.intel.sentinelone
 import cartography.intel.snipeit
 import cartography.intel.tailscale
 import cartography.intel.trivy
+from cartography.client.core.indexes import IndexRegistry
+from cartography.client.core.indexes import set_index_registry
+from cartography.client.core.writer import BackgroundWriteSession
 from cartography.config import Config
+from cartography.graph.job import set_batched_cleanup
+from cartography.graph.job import set_concurrent_cleanup
+from cartography.graph.precompile import precompile_queries
 from cartography.stats import set_stats_client
+from cartography.telemetry import get_telemetry_recorder
 from cartography.util import STATUS_FAILURE
 from cartography.util import STATUS_SUCCESS
 
@@ -87,6 +103,28 @@ TOP_LEVEL_MODULES = OrderedDict(
     }
 )
 
+# Upstream stages that a stage needs to have finished before it starts, because it draws relationships to nodes that
+# the upstream stage creates. This only matters when stages run concurrently (see `Config.stage_workers`). On top of
+# these, every stage depends on `create-indexes`, and `analysis` depends on every other stage. Dependencies are not
+# transitive, since the stages in between may not be part of the sync, so every upstream stage is listed.
+# tests/unit/cartography/test_sync.py checks this table against the node labels that each stage matches.
+STAGE_DEPENDENCIES: Dict[str, List[str]] = {
+    # GitHub web identity role assumptions attach to GitHubRepository nodes
+    "aws": ["github"],
+    # CVEs attach to crowdstrike SpotlightVulnerability nodes
+    "cve": ["crowdstrike"],
+    # Duo users attach to Human nodes, which the okta users sync creates
+    "duo": ["okta"],
+    # LastPass users attach to Human nodes, which the okta users sync creates
+    "lastpass": ["okta"],
+    # Okta SAML role mappings attach to AWSRole nodes
+    "okta": ["aws"],
+    # Semgrep findings attach to GitHubRepository nodes, and to the CVE nodes of crowdstrike, cve and trivy
+    "semgrep": ["crowdstrike", "cve", "github", "trivy"],
+    # Trivy findings attach to ECRImage nodes
+    "trivy": ["aws"],
+}
+
 
 class Sync:
     """
@@ -96,13 +134,22 @@ class Sync:
     a sequence of sync "stages" which are responsible for retrieving data from various sources (APIs, files, etc.),
     pushing that data to Neo4j, and removing now-invalid nodes and relationships from the graph. An instance of this
     class can be configured to run any number of stages in a specific order.
+
+    Stages may declare upstream stages that they depend on. When the sync is configured with more than one stage
+    worker, stages whose upstream stages have all finished run concurrently, each one on its own Neo4j session.
     """
 
     def __init__(self):
         # NOTE we may need meta-stages at some point to allow hooking into pre-sync, sync, and post-sync
         self._stages = OrderedDict()
+        self._stage_dependencies: Dict[str, Set[str]] = {}
 
-    def add_stage(self, name: str, func: Callable) -> None:
+    def add_stage(
+        self,
+        name: str,
+        func: Callable,
+        depends_on: Optional[Iterable[str]] = None,
+    ) -> None:
         """
         Add one stage to the sync task.
 
@@ -110,8 +157,12 @@ class Sync:
         :param name: The name of the stage.
         :type func: Callable
         :param func: The object to call when the stage is executed.
+        :type depends_on: Iterable[string]
+        :param depends_on: Optional names of the stages that must finish before this stage starts. Names of stages
+            that are not part of this sync are ignored.
         """
         self._stages[name] = func
+        self._stage_dependencies[name] = set(depends_on) if depends_on else set()
 
     def add_stages(self, stages: List[Tuple[str, Callable]]) -> None:
         """
@@ -123,13 +174,23 @@ class Sync:
         for name, func in stages:
             self.add_stage(name, func)
 
+    def get_upstream_stages(self, name: str) -> Set[str]:
+        """
+        Return the names of the stages in this sync that must finish before the given stage starts.
+
+        :type name: string
+        :param name: The name of the stage.
+        """
+        return self._stage_dependencies.get(name, set()) & self._stages.keys()
+
     def run(
         self,
         neo4j_driver: neo4j.Driver,
         config: Union[Config, argparse.Namespace],
     ) -> int:
         """
-        Execute all stages in the sync task in sequence.
+        Execute all stages in the sync task. Stages run in sequence unless `config.stage_workers` is greater than 1, in
+        which case independent stages run concurrently.
 
         :type neo4j_driver: neo4j.Driver
         :param neo4j_driver: Neo4j driver object.
@@ -137,24 +198,152 @@ class Sync:
         :param config: Configuration for the sync run.
         """
         logger.info("Starting sync with update tag '%d'", config.update_tag)
-        with neo4j_driver.session(database=config.neo4j_database) as neo4j_session:
-            for stage_name, stage_func in self._stages.items():
-                logger.info("Starting sync stage '%s'", stage_name)
-                try:
-                    stage_func(neo4j_session, config)
-                except (KeyboardInterrupt, SystemExit):
-                    logger.warning("Sync interrupted during stage '%s'.", stage_name)
-                    raise
-                except Exception:
-                    logger.exception(
-                        "Unhandled exception during sync stage '%s'",
-                        stage_name,
-                    )
-                    raise  # TODO this should be configurable
-                logger.info("Finishing sync stage '%s'", stage_name)
+        get_telemetry_recorder().reset()
+        # Only record metrics if they are reported, since they are kept in memory until the sync ends.
+        get_telemetry_recorder().configure(
+            enabled=bool(config.telemetry_report_file),
+            account_labels=bool(config.telemetry_account_labels),
+        )
+        # Intel modules that sync from several threads open their own sessions on the driver.
+        config.neo4j_driver = neo4j_driver
+        # Remember the indexes of this sync's database, so that each one is only ensured once.
+        set_index_registry(IndexRegistry())
+        try:
+            if config.stage_workers and config.stage_workers > 1:
+                self._run_concurrently(neo4j_driver, config, config.stage_workers)
+            else:
+                with neo4j_driver.session(
+                    database=config.neo4j_database
+                ) as neo4j_session:
+                    for stage_name, stage_func in self._stages.items():
+                        self._run_stage(stage_name, stage_func, neo4j_session, config)
+        finally:
+            set_index_registry(None)
+            # Also report on failed syncs, which is when the report is most useful.
+            if config.telemetry_report_file:
+                get_telemetry_recorder().write_report(config.telemetry_report_file)
         logger.info("Finishing sync with update tag '%d'", config.update_tag)
         return STATUS_SUCCESS
 
+    def _run_concurrently(
+        self,
+        neo4j_driver: neo4j.Driver,
+        config: Union[Config, argparse.Namespace],
+        max_workers: int,
+    ) -> None:
+        """
+        Execute the stages on a pool of `max_workers` threads, starting each stage as soon as all of its upstream stages
+        have finished. Ready stages are started in the order in which they were added. If a stage fails, no new stages
+        are started and the first exception is raised once the stages that are already running have finished.
+        """
+        for stage_name in self._stages:
+            unknown = self._stage_dependencies[stage_name] - self._stages.keys()
+            if unknown:
+                logger.debug(
+                    "Stage '%s' depends on stages %s that are not part of this sync; ignoring them.",
+                    stage_name,
+                    sorted(unknown),
+                )
+        logger.info("Running sync stages with %d workers", max_workers)
+
+        pending: OrderedDict = OrderedDict(self._stages)
+        completed: Set[str] = set()
+        running: Dict[Future, str] = {}
+        first_failure: Optional[BaseException] = None
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="cartography-stage",
+        )
+        try:
+            while pending or running:
+                if first_failure is None:
+                    for stage_name in list(pending):
+                        if self.get_upstream_stages(stage_name) <= completed:
+                            future = executor.submit(
+                                self._run_stage_in_new_session,
+                                stage_name,
+                                pending.pop(stage_name),
+                                neo4j_driver,
+                                config,
+                            )
+                            running[future] = stage_name
+                if not running:
+                    if first_failure is None:
+                        executor.shutdown(wait=False)
+                        raise ValueError(
+                            f"Unable to schedule sync stages {list(pending)}: their dependencies contain a cycle.",
+                        )
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage_name = running.pop(future)
+                    exc = future.exception()
+                    if exc is None:
+                        completed.add(stage_name)
+                    elif first_failure is None:
+                        first_failure = exc
+        except (KeyboardInterrupt, SystemExit):
+            logger.warning(
+                "Sync interrupted while running stages %s.",
+                sorted(running.values()),
+            )
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+        if first_failure is not None:
+            if pending:
+                logger.warning(
+                    "Skipped sync stages %s because an earlier stage failed.",
+                    list(pending),
+                )
+            raise first_failure
+
+    def _run_stage_in_new_session(
+        self,
+        stage_name: str,
+        stage_func: Callable,
+        neo4j_driver: neo4j.Driver,
+        config: Union[Config, argparse.Namespace],
+    ) -> None:
+        with neo4j_driver.session(database=config.neo4j_database) as neo4j_session:
+            self._run_stage(stage_name, stage_func, neo4j_session, config)
+
+    @staticmethod
+    def _run_stage(
+        stage_name: str,
+        stage_func: Callable,
+        neo4j_session: neo4j.Session,
+        config: Union[Config, argparse.Namespace],
+    ) -> None:
+        logger.info("Starting sync stage '%s'", stage_name)
+        writer: Optional[BackgroundWriteSession] = None
+        if config.neo4j_background_writes:
+            writer = BackgroundWriteSession(neo4j_session)
+            neo4j_session = cast(neo4j.Session, writer)
+        try:
+            with get_telemetry_recorder().timer("stage", stage=stage_name):
+                stage_func(neo4j_session, config)
+            if writer:
+                # The stage is only done once everything it loaded is in the graph.
+                writer.close()
+        except (KeyboardInterrupt, SystemExit):
+            logger.warning("Sync interrupted during stage '%s'.", stage_name)
+            if writer:
+                writer.abandon()
+            raise
+        except Exception:
+            logger.exception(
+                "Unhandled exception during sync stage '%s'",
+                stage_name,
+            )
+            if writer:
+                writer.abandon()
+            raise  # TODO this should be configurable
+        logger.info("Finishing sync stage '%s'", stage_name)
+
     @classmethod
     def list_intel_modules(cls) -> OrderedDict:
         """
@@ -280,6 +469,12 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
     default_update_tag = int(time.time())
     if not config.update_tag:
         config.update_tag = default_update_tag
+    if config.batched_cleanup:
+        set_batched_cleanup(True)
+    if config.concurrent_cleanup:
+        set_concurrent_cleanup(neo4j_driver, config.neo4j_database)
+    if config.precompile_queries:
+        precompile_queries()
     return sync.run(neo4j_driver, config)
 
 
@@ -291,15 +486,35 @@ def build_default_sync() -> Sync:
     :return: The default cartography sync object.
     """
     sync = Sync()
-    sync.add_stages(
-        [
-            (stage_name, stage_func)
-            for stage_name, stage_func in TOP_LEVEL_MODULES.items()
-        ],
-    )
+    for stage_name, stage_func in TOP_LEVEL_MODULES.items():
+        sync.add_stage(
+            stage_name,
+            stage_func,
+            depends_on=get_default_stage_dependencies(
+                stage_name, TOP_LEVEL_MODULES.keys()
+            ),
+        )
     return sync
 
 
+def get_default_stage_dependencies(
+    stage_name: str,
+    stage_names: Iterable[str],
+) -> Set[str]:
+    """
+    Returns the upstream stages of a built-in stage: `create-indexes` runs before every other stage, `analysis` runs
+    after every other stage, and the remaining dependencies come from STAGE_DEPENDENCIES.
+    :param stage_name: The name of the stage
+    :param stage_names: The names of all stages in the sync
+    :return: The names of the stages that must finish before the given stage starts
+    """
+    if stage_name == "create-indexes":
+        return set()
+    if stage_name == "analysis":
+        return {name for name in stage_names if name != "analysis"}
+    return {"create-indexes", *STAGE_DEPENDENCIES.get(stage_name, [])}
+
+
 def parse_and_validate_selected_modules(selected_modules: str) -> List[str]:
     """
     Ensures that user-selected modules passed through the CLI are valid and parses them to a list of str.
@@ -330,7 +545,10 @@ def build_sync(selected_modules_as_str: str) -> Sync:
     """
     selected_modules = parse_and_validate_selected_modules(selected_modules_as_str)
     sync = Sync()
-    sync.add_stages(
-        [(sync_name, TOP_LEVEL_MODULES[sync_name]) for sync_name in selected_modules],
-    )
+    for sync_name in selected_modules:
+        sync.add_stage(
+            sync_name,
+            TOP_LEVEL_MODULES[sync_name],
+            depends_on=get_default_stage_dependencies(sync_name, selected_modules),
+        )
     return sync
@@ -0,0 +1,302 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the buckets of latency histograms.
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+MetricKey = Tuple[str, Labels]
+
+
+def _make_key(metric: str, labels: Dict[str, Any]) -> MetricKey:
+    return metric, tuple(
+        sorted((k, str(v)) for k, v in labels.items() if v is not None)
+    )
+
+
+class _Duration:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+
+class TelemetryRecorder:
+    """
+    Collects performance metrics of a sync in memory: counters (e.g. rows loaded, API calls), durations (e.g. wall time
+    per stage, or per function and region and account) and histograms (e.g. Neo4j transaction latency). Unlike
+    cartography.stats, this needs no external service. At the end of the sync the metrics can be written to a JSON
+    file or a Prometheus textfile; see `write_report()`.
+
+    Every metric is identified by a name and a set of labels, e.g.
+        recorder.incr("rows_loaded", 100, schema="EC2Instance")
+        with recorder.timer("stage", stage="aws"):
+            ...
+
+    Nothing is recorded while the recorder is disabled. The process-wide recorder is only enabled for syncs that write
+    a report, see `configure()`.
+
+    All methods are thread-safe.
+    """
+
+    def __init__(self, enabled: bool = True, account_labels: bool = False) -> None:
+        self.enabled = enabled
+        # Whether callers should label metrics with the AWS account or GCP project they are about. These labels have a
+        # value per account or project, so they multiply the number of metrics kept in memory.
+        self.account_labels = account_labels
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._durations: Dict[MetricKey, _Duration] = {}
+        self._histograms: Dict[MetricKey, _Histogram] = {}
+
+    def configure(self, enabled: bool, account_labels: bool = False) -> None:
+        """
+        Enables or disables recording, and sets whether callers label metrics with the account or project they are
+        about.
+        """
+        self.enabled = enabled
+        self.account_labels = account_labels
+
+    def incr(self, metric: str, value: float = 1, **labels: Any) -> None:
+        """
+        Adds `value` to the counter with the given name and labels.
+        """
+        if not self.enabled:
+            return
+        key = _make_key(metric, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_duration(self, metric: str, seconds: float, **labels: Any) -> None:
+        """
+        Records that something identified by the given name and labels took `seconds`.
+        """
+        if not self.enabled:
+            return
+        key = _make_key(metric, labels)
+        with self._lock:
+            duration = self._durations.setdefault(key, _Duration())
+            duration.count += 1
+            duration.total += seconds
+            duration.max = max(duration.max, seconds)
+
+    def observe(
+        self,
+        metric: str,
+        value: float,
+        buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        **labels: Any,
+    ) -> None:
+        """
+        Adds a value to the histogram with the given name and labels. The buckets are fixed when a histogram gets its
+        first value.
+        """
+        if not self.enabled:
+            return
+        key = _make_key(metric, labels)
+        with self._lock:
+            histogram = self._histograms.setdefault(key, _Histogram(buckets))
+            histogram.count += 1
+            histogram.total += value
+            for i, upper_bound in enumerate(histogram.buckets):
+                if value <= upper_bound:
+                    histogram.bucket_counts[i] += 1
+                    break
+
+    @contextmanager
+    def timer(self, metric: str, **labels: Any) -> Iterator[None]:
+        """
+        Records the wall time of the `with` block as a duration, also if the block raises.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_duration(metric, time.monotonic() - start, **labels)
+
+    def reset(self) -> None:
+        """
+        Removes all recorded metrics.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._durations.clear()
+            self._histograms.clear()
+
+    def as_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Returns all recorded metrics in the format of the JSON report.
+        """
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "durations": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": d.count,
+                        "total_seconds": d.total,
+                        "max_seconds": d.max,
+                    }
+                    for (name, labels), d in sorted(self._durations.items())
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "buckets": {
+                            str(upper_bound): cumulative
+                            for upper_bound, cumulative in zip(
+                                h.buckets,
+                                _cumulative(h.bucket_counts),
+                            )
+                        },
+                        "count": h.count,
+                        "sum": h.total,
+                    }
+                    for (name, labels), h in sorted(self._histograms.items())
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns all recorded metrics in the Prometheus text exposition format, e.g. for the node_exporter textfile
+        collector. Metric names are prefixed with `cartography_`.
+        """
+        lines: List[str] = []
+        report = self.as_dict()
+
+        for name in _unique_names(report["counters"]):
+            metric = f"cartography_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for c in report["counters"]:
+                if c["name"] == name:
+                    lines.append(f"{metric}{_format_labels(c['labels'])} {c['value']}")
+
+        for name in _unique_names(report["durations"]):
+            metric = f"cartography_{name}_duration_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for d in report["durations"]:
+                if d["name"] == name:
+                    labels = _format_labels(d["labels"])
+                    lines.append(f"{metric}_sum{labels} {d['total_seconds']}")
+                    lines.append(f"{metric}_count{labels} {d['count']}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for d in report["durations"]:
+                if d["name"] == name:
+                    labels = _format_labels(d["labels"])
+                    lines.append(f"{metric}_max{labels} {d['max_seconds']}")
+
+        for name in _unique_names(report["histograms"]):
+            metric = f"cartography_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for h in report["histograms"]:
+                if h["name"] != name:
+                    continue
+                for upper_bound, cumulative in h["buckets"].items():
+                    labels = _format_labels({**h["labels"], "le": upper_bound})
+                    lines.append(f"{metric}_bucket{labels} {cumulative}")
+                labels = _format_labels({**h["labels"], "le": "+Inf"})
+                lines.append(f"{metric}_bucket{labels} {h['count']}")
+                labels = _format_labels(h["labels"])
+                lines.append(f"{metric}_sum{labels} {h['sum']}")
+                lines.append(f"{metric}_count{labels} {h['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str) -> None:
+        """
+        Writes all recorded metrics to the given file: in the Prometheus text format if its name ends with `.prom`,
+        and as JSON otherwise.
+        """
+        if path.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.as_dict(), indent=2)
+        with open(path, "w") as f:
+            f.write(content)
+        logger.info(f"Wrote telemetry report to {path}.")
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    result = []
+    total = 0
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+def _unique_names(metrics: List[Dict[str, Any]]) -> List[str]:
+    return list(dict.fromkeys(m["name"] for m in metrics))
+
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in labels.items())
+        + "}"
+    )
+
+
+# Global recorder that all of cartography records into. It is enabled by `Sync.run()` if a report is configured.
+_telemetry_recorder = TelemetryRecorder(enabled=False)
+
+
+def get_telemetry_recorder() -> TelemetryRecorder:
+    """
+    Returns the process-wide TelemetryRecorder.
+    """
+    return _telemetry_recorder
+
+
+def record_api_call(api: str, operation: Optional[str] = None) -> None:
+    """
+    Counts one call to an external API, e.g. `record_api_call("ec2", "DescribeInstances")`.
+    """
+    _telemetry_recorder.incr("api_calls", api=api, operation=operation)
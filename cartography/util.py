@@ -1,4 +1,5 @@
 import asyncio
+import inspect
 import logging
 import re
 from functools import partial
@@ -17,6 +18,7 @@ from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Set
+from typing import Tuple
 from typing import Type
 from typing import TypeVar
 from typing import Union
@@ -30,6 +32,7 @@ from cartography.graph.job import GraphJob
 from cartography.graph.statement import get_job_shortname
 from cartography.stats import get_stats_client
 from cartography.stats import ScopedStatsClient
+from cartography.telemetry import get_telemetry_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -182,26 +185,77 @@ R = TypeVar("R")
 F = TypeVar("F", bound=Callable[..., Any])
 
 
+# Arguments of functions decorated with `timeit` whose values label the function's duration in the telemetry report.
+_TELEMETRY_LABEL_ARGS = {
+    "region": "region",
+}
+# Like _TELEMETRY_LABEL_ARGS, but only used if the recorder is configured with account labels, since they have a value
+# per AWS account or GCP project.
+_TELEMETRY_ACCOUNT_LABEL_ARGS = {
+    "current_aws_account_id": "account",
+    "project_id": "project",
+}
+
+
 def timeit(method: F) -> F:
     """
     This decorator uses statsd to time the execution of the wrapped method and sends it to the statsd server.
     This is only active if config.statsd_enabled is True.
+    If a telemetry report is configured, the execution time is also recorded by cartography.telemetry, labeled with the
+    region the method was called for, and with the AWS account or GCP project if the recorder has account labels, if
+    the method has arguments for them.
     :param method: The function to measure execution
     """
 
+    # Positions of the arguments whose values are used as labels of the telemetry duration, if the method has them.
+    arg_names = list(inspect.signature(method).parameters)
+    label_args = {
+        label: (arg_name, arg_names.index(arg_name))
+        for arg_name, label in _TELEMETRY_LABEL_ARGS.items()
+        if arg_name in arg_names
+    }
+    account_label_args = {
+        label: (arg_name, arg_names.index(arg_name))
+        for arg_name, label in _TELEMETRY_ACCOUNT_LABEL_ARGS.items()
+        if arg_name in arg_names
+    }
+
+    def get_labels(
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        label_args: Dict[str, Tuple[str, int]],
+    ) -> Dict[str, Any]:
+        return {
+            label: kwargs[arg_name] if arg_name in kwargs else args[position]
+            for label, (arg_name, position) in label_args.items()
+            if arg_name in kwargs or position < len(args)
+        }
+
     # Allow access via `inspect` to the wrapped function. This is used in integration tests to standardize param names.
     @wraps(method)
     def timed(*args, **kwargs):  # type: ignore
-        stats_client = get_stats_client(method.__module__)
-        if stats_client.is_enabled():
-            timer = stats_client.timer(method.__name__)
-            timer.start()
-            result = method(*args, **kwargs)
-            timer.stop()
-            return result
-        else:
-            # statsd is disabled, so don't time anything
-            return method(*args, **kwargs)
+        recorder = get_telemetry_recorder()
+        labels = {}
+        if recorder.enabled:
+            labels = get_labels(args, kwargs, label_args)
+            if recorder.account_labels:
+                labels.update(get_labels(args, kwargs, account_label_args))
+        with recorder.timer(
+            "function",
+            module=method.__module__,
+            function=method.__name__,
+            **labels,
+        ):
+            stats_client = get_stats_client(method.__module__)
+            if stats_client.is_enabled():
+                timer = stats_client.timer(method.__name__)
+                timer.start()
+                result = method(*args, **kwargs)
+                timer.stop()
+                return result
+            else:
+                # statsd is disabled, so don't time anything
+                return method(*args, **kwargs)
 
     return cast(F, timed)
 
@@ -384,7 +438,13 @@ def is_throttling_exception(exc: Exception) -> bool:
     """
     # https://boto3.amazonaws.com/v1/documentation/api/1.19.9/guide/error-handling.html
     if isinstance(exc, botocore.exceptions.ClientError):
-        if exc.response["Error"]["Code"] in ["LimitExceededException", "Throttling"]:
+        if exc.response["Error"]["Code"] in [
+            "LimitExceededException",
+            "RequestLimitExceeded",
+            "Throttling",
+            "ThrottlingException",
+            "TooManyRequestsException",
+        ]:
             return True
     # add other exceptions here, if needed, like:
     # https://cloud.google.com/python/docs/reference/storage/1.39.0/retry_timeout#configuring-retries
@@ -395,7 +455,7 @@ def is_throttling_exception(exc: Exception) -> bool:
 
 def to_asynchronous(func: Callable[..., R], *args: Any, **kwargs: Any) -> Awaitable[R]:
     """
-    Returns a Future that will run a function and its arguments in the default threadpool.
+    Returns an Awaitable that will run a function and its arguments in the default threadpool.
     Helper until we start using python 3.9's asyncio.to_thread
 
     Calls are also wrapped within a backoff decorator to handle throttling errors.
@@ -445,7 +505,12 @@ def to_asynchronous(func: Callable[..., R], *args: Any, **kwargs: Any) -> Awaita
         wrapper,
     )
     call = partial(wrapped, *args, **kwargs)
-    return asyncio.get_event_loop().run_in_executor(None, call)
+
+    async def run_in_executor() -> R:
+        # Look the loop up once awaited, so that this can be called on threads that have no event loop of their own.
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    return run_in_executor()
 
 
 def to_synchronous(*awaitables: Awaitable[Any]) -> List[Any]:
@@ -472,4 +537,14 @@ def to_synchronous(*awaitables: Awaitable[Any]) -> List[Any]:
 
     results = to_synchronous(future_1, future_2)
     """
-    return asyncio.get_event_loop().run_until_complete(asyncio.gather(*awaitables))
+
+    async def gather() -> List[Any]:
+        return await asyncio.gather(*awaitables)
+
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        # asyncio only creates an event loop for the main thread, and sync stages and AWS accounts may run on worker
+        # threads. asyncio.run() closes the loop it creates for them.
+        return asyncio.run(gather())
+    return loop.run_until_complete(gather())
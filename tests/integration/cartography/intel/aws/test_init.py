@@ -111,6 +111,93 @@ def test_sync_multiple_accounts(
     assert mock_cleanup.call_count == 1
 
 
+@mock.patch.object(cartography.intel.aws.organizations, "sync", return_value=None)
+@mock.patch("cartography.intel.aws.boto3.Session")
+@mock.patch.object(cartography.intel.aws, "_sync_one_account", return_value=None)
+@mock.patch.object(cartography.intel.aws, "_autodiscover_accounts", return_value=None)
+@mock.patch.object(cartography.intel.aws, "run_cleanup_job", return_value=None)
+@mock.patch.object(cartography.intel.aws, "new_neo4j_session")
+def test_sync_multiple_accounts_concurrently(
+    mock_new_session,
+    mock_cleanup,
+    mock_autodiscover,
+    mock_sync_one,
+    mock_boto3_session,
+    mock_sync_orgs,
+    neo4j_session,
+):
+    account_session = mock_new_session.return_value.__enter__.return_value
+    common_job_parameters = {"UPDATE_TAG": TEST_UPDATE_TAG}
+
+    cartography.intel.aws._sync_multiple_accounts(
+        neo4j_session,
+        TEST_ACCOUNTS,
+        TEST_UPDATE_TAG,
+        common_job_parameters,
+        False,
+        aws_account_workers=2,
+        neo4j_driver=mock.MagicMock(),
+    )
+
+    # Each account is synced on its own session with its own copy of the job parameters.
+    for account_id in TEST_ACCOUNTS.values():
+        mock_sync_one.assert_any_call(
+            account_session,
+            mock_boto3_session(),
+            account_id,
+            TEST_UPDATE_TAG,
+            {"UPDATE_TAG": TEST_UPDATE_TAG, "AWS_ID": account_id},
+            regions=None,
+            aws_requested_syncs=[],
+        )
+    assert mock_sync_one.call_count == len(TEST_ACCOUNTS)
+    assert mock_autodiscover.call_count == len(TEST_ACCOUNTS)
+    assert mock_new_session.call_count == len(TEST_ACCOUNTS)
+    assert common_job_parameters == {"UPDATE_TAG": TEST_UPDATE_TAG}
+
+    # The principals cleanup runs once, on the stage's session, after all accounts are done.
+    mock_cleanup.assert_called_once_with(
+        "aws_post_ingestion_principals_cleanup.json",
+        neo4j_session,
+        common_job_parameters,
+    )
+
+
+@mock.patch.object(cartography.intel.aws.organizations, "sync", return_value=None)
+@mock.patch("cartography.intel.aws.boto3.Session")
+@mock.patch.object(cartography.intel.aws, "_sync_one_account", return_value=None)
+@mock.patch.object(cartography.intel.aws, "_autodiscover_accounts", return_value=None)
+@mock.patch.object(cartography.intel.aws, "run_cleanup_job", return_value=None)
+@mock.patch.object(cartography.intel.aws, "new_neo4j_session")
+def test_sync_multiple_accounts_concurrently_aggregates_exceptions_with_aws_best_effort_mode(
+    mock_new_session,
+    mock_cleanup,
+    mock_autodiscover,
+    mock_sync_one,
+    mock_boto3_session,
+    mock_sync_orgs,
+    neo4j_session,
+):
+    mock_sync_one.side_effect = KeyError("foo")
+
+    with raises(Exception) as e:
+        cartography.intel.aws._sync_multiple_accounts(
+            neo4j_session,
+            TEST_ACCOUNTS,
+            TEST_UPDATE_TAG,
+            {"UPDATE_TAG": TEST_UPDATE_TAG},
+            True,
+            aws_account_workers=2,
+            neo4j_driver=mock.MagicMock(),
+        )
+
+    message = str(e.value)
+    assert message.count("KeyError") == len(TEST_ACCOUNTS)
+    for account_id in TEST_ACCOUNTS.values():
+        assert account_id in message
+    assert mock_cleanup.call_count == 0
+
+
 @mock.patch("cartography.intel.aws.boto3.Session")
 @mock.patch("cartography.intel.aws.organizations")
 @mock.patch.object(cartography.intel.aws, "_sync_multiple_accounts", return_value=True)
@@ -128,20 +215,33 @@ def test_start_aws_ingestion(
         update_tag=TEST_UPDATE_TAG,
         aws_sync_all_profiles=True,
     )
+    cache = (
+        cartography.intel.aws.permission_relationships.get_compiled_statement_cache()
+    )
+    cache.get_compiled_statements(
+        "arn:aws:iam::aws:policy/ReadOnly",
+        [{"action": ["s3:Get*"], "resource": ["*"], "effect": "Allow"}],
+    )
 
     # Act
     cartography.intel.aws.start_aws_ingestion(neo4j_session, test_config)
 
     # Assert
     assert mock_sync_multiple.call_count == 1
+    # The compiled policy statements do not outlive the sync
+    assert cache.misses == 0
     mock_perform_analysis.assert_called_once_with(
         list(RESOURCE_FUNCTIONS.keys()),
         neo4j_session,
         {
             "UPDATE_TAG": test_config.update_tag,
             "permission_relationships_file": test_config.permission_relationships_file,
+            "permission_relationships_workers": test_config.permission_relationships_workers,
             "aws_guardduty_severity_threshold": None,
             "aws_cloudtrail_management_events_lookback_hours": test_config.aws_cloudtrail_management_events_lookback_hours,
+            "aws_cloudtrail_management_events_incremental": test_config.aws_cloudtrail_management_events_incremental,
+            "aws_s3_details_max_age_hours": test_config.aws_s3_details_max_age_hours,
+            "aws_inspector_workers": test_config.aws_inspector_workers,
         },
     )
 
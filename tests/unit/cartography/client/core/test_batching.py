@@ -0,0 +1,78 @@
+import neo4j
+import pytest
+
+from cartography.client.core.batching import AdaptiveBatchSizer
+from cartography.client.core.batching import DEFAULT_INITIAL_BATCH_SIZE
+from cartography.client.core.batching import estimate_item_bytes
+from cartography.client.core.batching import write_in_batches
+
+
+def test_batch_size_grows_on_fast_writes_and_shrinks_on_slow_writes():
+    sizer = AdaptiveBatchSizer(initial_size=100, target_seconds=1.0)
+
+    sizer.record_success(100, 0.1)
+    assert sizer.size == 200
+
+    # A partial batch does not grow the size
+    sizer.record_success(50, 0.1)
+    assert sizer.size == 200
+
+    sizer.record_success(200, 2.0)
+    assert sizer.size == 100
+
+
+def test_batch_size_does_not_grow_beyond_the_default_size():
+    sizer = AdaptiveBatchSizer(target_seconds=1.0)
+
+    sizer.record_success(DEFAULT_INITIAL_BATCH_SIZE, 0.1)
+    assert sizer.size == DEFAULT_INITIAL_BATCH_SIZE
+
+    # After slow writes have shrunk it, the size grows back up to the default.
+    sizer.record_success(DEFAULT_INITIAL_BATCH_SIZE, 2.0)
+    sizer.record_success(DEFAULT_INITIAL_BATCH_SIZE // 2, 0.1)
+    assert sizer.size == DEFAULT_INITIAL_BATCH_SIZE
+
+
+def test_batch_size_is_bounded_by_item_bytes():
+    sizer = AdaptiveBatchSizer(initial_size=1000, max_batch_bytes=10000)
+
+    assert sizer.get_batch_size(item_bytes=10) == 1000
+    assert sizer.get_batch_size(item_bytes=100) == 100
+    assert sizer.get_batch_size(item_bytes=100000) == 1
+
+
+def test_estimate_item_bytes():
+    assert estimate_item_bytes([]) == 0
+    assert estimate_item_bytes([{"id": "a"}, {"id": "b"}]) == len('{"id": "a"}')
+
+
+def test_write_in_batches_retries_smaller_batches_on_memory_errors():
+    batches = []
+
+    def write_batch(data_batch):
+        if len(data_batch) > 2:
+            raise neo4j.exceptions.TransientError._hydrate_neo4j(
+                code="Neo.TransientError.General.MemoryPoolOutOfMemoryError",
+                message="out of memory",
+            )
+        batches.append(data_batch)
+
+    sizer = AdaptiveBatchSizer(initial_size=8)
+    write_in_batches(list(range(5)), write_batch, sizer)
+
+    assert [item for data_batch in batches for item in data_batch] == [0, 1, 2, 3, 4]
+    assert batches[0] == [0, 1]
+    assert all(len(data_batch) <= 2 for data_batch in batches)
+
+
+def test_write_in_batches_raises_other_errors():
+    def write_batch(data_batch):
+        raise neo4j.exceptions.ClientError._hydrate_neo4j(
+            code="Neo.ClientError.Statement.SyntaxError",
+            message="bad query",
+        )
+
+    sizer = AdaptiveBatchSizer(initial_size=8)
+    with pytest.raises(neo4j.exceptions.ClientError):
+        write_in_batches(list(range(5)), write_batch, sizer)
+    assert sizer.size == 8
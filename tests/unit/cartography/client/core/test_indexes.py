@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+from cartography.client.core.indexes import ensure_index_queries
+from cartography.client.core.indexes import IndexRegistry
+from cartography.client.core.indexes import set_index_registry
+
+
+def _mock_session(existing_indexes):
+    session = MagicMock()
+    session.run.return_value.data.return_value = existing_indexes
+    return session
+
+
+def test_ensure_index_queries_skips_existing_indexes():
+    session = _mock_session(
+        [
+            {
+                "entityType": "NODE",
+                "labelsOrTypes": ["AWSAccount"],
+                "properties": ["id"],
+            },
+        ],
+    )
+    queries = [
+        "CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.id);",
+        "CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.lastupdated);",
+        "CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.lastupdated);",
+        "CREATE INDEX IF NOT EXISTS FOR ()-[r:RESOURCE]->() "
+        "ON (r.lastupdated, r._sub_resource_label, r._sub_resource_id);",
+    ]
+
+    set_index_registry(IndexRegistry())
+    try:
+        ensure_index_queries(session, queries)
+
+        # The missing indexes are created in one transaction, without duplicates
+        session.write_transaction.assert_called_once()
+        assert session.write_transaction.call_args[0][1] == [queries[1], queries[3]]
+
+        # Later calls during the same sync, also on other sessions, do not create them again
+        other_session = MagicMock()
+        ensure_index_queries(other_session, queries)
+        other_session.run.assert_not_called()
+        other_session.write_transaction.assert_not_called()
+    finally:
+        set_index_registry(None)
+
+
+def test_ensure_index_queries_without_registry():
+    session = _mock_session([])
+    query = "CREATE INDEX IF NOT EXISTS FOR (n:AWSAccount) ON (n.id);"
+
+    ensure_index_queries(session, [query, query])
+    ensure_index_queries(session, [query])
+
+    # Every call runs its queries, without duplicates, and existing indexes are not listed
+    session.run.assert_not_called()
+    assert [c[0][1] for c in session.write_transaction.call_args_list] == [
+        [query],
+        [query],
+    ]
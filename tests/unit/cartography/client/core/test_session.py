@@ -0,0 +1,28 @@
+from unittest.mock import MagicMock
+
+from cartography.client.core.session import new_neo4j_session
+from cartography.client.core.writer import BackgroundWriteSession
+
+
+def test_new_neo4j_session_starts_from_bookmarks_of_the_stage_session():
+    neo4j_driver = MagicMock()
+    stage_session = MagicMock()
+    stage_session.last_bookmarks.return_value = ["bookmark"]
+
+    with new_neo4j_session(neo4j_driver, stage_session, "mydb") as session:
+        assert session is neo4j_driver.session.return_value.__enter__.return_value
+
+    neo4j_driver.session.assert_called_once_with(
+        database="mydb",
+        bookmarks=["bookmark"],
+    )
+
+
+def test_new_neo4j_session_writes_in_the_background_like_the_stage_session():
+    neo4j_driver = MagicMock()
+    stage_session = BackgroundWriteSession(MagicMock())
+    try:
+        with new_neo4j_session(neo4j_driver, stage_session) as session:
+            assert isinstance(session, BackgroundWriteSession)
+    finally:
+        stage_session.close()
@@ -1,6 +1,10 @@
 from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
 
 from cartography.client.core.tx import load
+from cartography.client.core.writer import BackgroundWriteSession
 from cartography.models.core.nodes import CartographyNodeSchema
 
 
@@ -17,3 +21,65 @@ def test_load_empty_dict_list():
     mock_session.run.assert_not_called()  # Ensure no database calls were made
     # Verify that ensure_indexes was not called since we short-circuit on empty list
     mock_session.write_transaction.assert_not_called()
+
+
+def test_load_with_background_writes():
+    # Setup
+    calls = []
+    mock_session = MagicMock()
+    mock_session.write_transaction.side_effect = lambda *args, **kwargs: calls.append(
+        "write"
+    )
+    writer = BackgroundWriteSession(mock_session)
+    mock_schema = MagicMock(spec=CartographyNodeSchema)
+
+    # Execute
+    with (
+        patch(
+            "cartography.client.core.tx.build_create_index_queries",
+            return_value=["CREATE INDEX IF NOT EXISTS FOR (n:A) ON (n.id);"],
+        ),
+        patch(
+            "cartography.client.core.tx.ensure_index_queries",
+            side_effect=lambda session, queries: calls.append("index"),
+        ),
+        patch("cartography.client.core.tx.build_ingestion_query", return_value="q"),
+    ):
+        load(writer, mock_schema, [{"id": 1}])
+        # Any other use of the session waits for the queued load to finish first
+        writer.read_transaction(lambda tx: calls.append("read"))
+    writer.close()
+
+    # Assert
+    assert calls == ["index", "write"]
+    mock_session.read_transaction.assert_called_once()
+
+
+def test_load_with_background_writes_queues_a_copy_of_the_list():
+    writer = MagicMock(spec=BackgroundWriteSession)
+    mock_schema = MagicMock(spec=CartographyNodeSchema)
+    data = [{"id": 1}]
+
+    load(writer, mock_schema, data, lastupdated=1)
+    # The caller reuses its list for the next page while the load is still queued
+    data.clear()
+
+    func, schema, queued_data = writer.submit.call_args.args
+    assert func is load
+    assert schema is mock_schema
+    assert queued_data == [{"id": 1}]
+
+
+def test_background_writes_raise_errors_on_next_use():
+    mock_session = MagicMock()
+    mock_session.write_transaction.side_effect = RuntimeError("boom")
+    writer = BackgroundWriteSession(mock_session)
+
+    writer.submit(lambda session: session.write_transaction())
+    # Dropped because the write before it failed
+    writer.submit(lambda session: session.run("never"))
+
+    with pytest.raises(RuntimeError, match="boom"):
+        writer.run("MATCH (n) RETURN n")
+    mock_session.run.assert_not_called()
+    writer.abandon()
@@ -1,4 +1,14 @@
+import json
+import threading
+from contextlib import nullcontext
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
 from cartography.graph.job import GraphJob
+from cartography.graph.statement import GraphStatement
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetSchema,
+)
 from tests.data.jobs.sample import SAMPLE_CLEANUP_JOB
 
 
@@ -10,3 +20,82 @@ def test_graphjob_from_json():
     assert job.name == "cleanup stale resources"
     assert len(job.statements) == 3
     assert job.short_name is None
+
+
+def test_graphjob_from_node_schema_parallel_groups():
+    job = GraphJob.from_node_schema(
+        InterestingAssetSchema(),
+        {"UPDATE_TAG": 1, "sub_resource_id": "sub"},
+    )
+
+    # The node cleanup runs first on its own, the relationship cleanups can run concurrently
+    assert job.statements[0].parallel_group is None
+    assert len(job.statements) > 2
+    assert all(
+        stm.parallel_group == "InterestingAsset relationships"
+        for stm in job.statements[1:]
+    )
+
+
+def test_graphjob_runs_parallel_group_concurrently():
+    job = GraphJob.from_json(
+        json.dumps(
+            {
+                "name": "parallel job",
+                "statements": [
+                    {"query": "q1"},
+                    {"query": "q2", "parallel_group": "a"},
+                    {"query": "q3", "parallel_group": "a"},
+                    {"query": "q4"},
+                ],
+            },
+        ),
+    )
+    # Both statements of the group must be running at the same time to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    sessions = {}
+
+    def run_statement(stm, session):
+        sessions[stm.query] = session
+        if stm.parallel_group:
+            barrier.wait()
+
+    main_session = MagicMock()
+    with (
+        patch.object(GraphStatement, "run", autospec=True, side_effect=run_statement),
+        patch(
+            "cartography.graph.job.new_neo4j_session",
+            side_effect=lambda driver, session, database: nullcontext(MagicMock()),
+        ),
+        patch("cartography.graph.job._concurrent_cleanup_driver", MagicMock()),
+    ):
+        job.run(main_session)
+
+    assert sessions["q1"] is main_session
+    assert sessions["q4"] is main_session
+    assert sessions["q2"] is not main_session
+    assert sessions["q3"] is not main_session
+
+
+def test_graphjob_runs_parallel_group_sequentially_without_driver():
+    job = GraphJob.from_json(
+        json.dumps(
+            {
+                "name": "parallel job",
+                "statements": [
+                    {"query": "q1", "parallel_group": "a"},
+                    {"query": "q2", "parallel_group": "a"},
+                ],
+            },
+        ),
+    )
+    sessions = {}
+
+    def run_statement(stm, session):
+        sessions[stm.query] = session
+
+    main_session = MagicMock()
+    with patch.object(GraphStatement, "run", autospec=True, side_effect=run_statement):
+        job.run(main_session)
+
+    assert sessions == {"q1": main_session, "q2": main_session}
@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import cartography.graph.querybuilder
+from cartography.graph.precompile import precompile_queries
+from cartography.graph.querybuilder import build_create_index_queries
+from cartography.graph.querybuilder import build_ingestion_query
+from cartography.graph.querybuilder import clear_query_cache
+from tests.data.graph.querybuilder import sample_models
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetSchema,
+)
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetToHelloAssetRel,
+)
+
+
+def test_build_ingestion_query_is_cached_per_schema_class():
+    clear_query_cache()
+    with patch.object(
+        cartography.graph.querybuilder,
+        "_build_node_properties_statement",
+        wraps=cartography.graph.querybuilder._build_node_properties_statement,
+    ) as mock_build_props:
+        query = build_ingestion_query(InterestingAssetSchema())
+        # A new instance of the same schema class reuses the cached query
+        assert build_ingestion_query(InterestingAssetSchema()) is query
+        assert mock_build_props.call_count == 1
+
+        # Selecting relationships builds and caches a separate query
+        selected = build_ingestion_query(
+            InterestingAssetSchema(),
+            {InterestingAssetToHelloAssetRel()},
+        )
+        assert selected != query
+        assert (
+            build_ingestion_query(
+                InterestingAssetSchema(),
+                {InterestingAssetToHelloAssetRel()},
+            )
+            is selected
+        )
+        assert build_ingestion_query(InterestingAssetSchema(), set()) != query
+        assert mock_build_props.call_count == 3
+
+
+def test_cached_index_queries_cannot_be_changed_by_callers():
+    clear_query_cache()
+    queries = build_create_index_queries(InterestingAssetSchema())
+    queries.append("something else")
+
+    assert "something else" not in build_create_index_queries(InterestingAssetSchema())
+
+
+def test_precompile_queries():
+    clear_query_cache()
+
+    assert precompile_queries(sample_models) > 0
+
+    with patch.object(
+        cartography.graph.querybuilder,
+        "_build_node_properties_statement",
+    ) as mock_build_props:
+        build_ingestion_query(InterestingAssetSchema())
+        mock_build_props.assert_not_called()
@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from cartography.graph.cleanupbuilder import build_cleanup_queries
+from cartography.graph.statement import GraphStatement
+from tests.data.graph.querybuilder.sample_models.interesting_asset import (
+    InterestingAssetSchema,
+)
+
+
+def test_batched_cleanup_deletes_collected_ids_in_batches():
+    node_query, rel_query = build_cleanup_queries(InterestingAssetSchema())[:2]
+    session = MagicMock()
+    session.read_transaction.return_value = [1, 2, 3, 4, 5]
+
+    statement = GraphStatement(
+        node_query,
+        {"UPDATE_TAG": 1, "sub_resource_id": "sub"},
+        iterative=True,
+        iterationsize=2,
+        batched=True,
+    )
+    statement.run(session)
+
+    collect_query = session.read_transaction.call_args[0][1]
+    assert "LIMIT" not in collect_query
+    assert collect_query.strip().endswith(
+        "WHERE n.lastupdated <> $UPDATE_TAG\n        RETURN DISTINCT id(n) AS id"
+    )
+    batches = [call[0][2] for call in session.write_transaction.call_args_list]
+    assert batches == [[1, 2], [3, 4], [5]]
+    assert "DETACH DELETE n" in session.write_transaction.call_args[0][1]
+
+    # Relationship cleanups delete relationships by id
+    session.reset_mock()
+    GraphStatement(
+        rel_query,
+        {"UPDATE_TAG": 1, "sub_resource_id": "sub"},
+        iterative=True,
+        iterationsize=2,
+        batched=True,
+    ).run(session)
+    assert "DELETE r" in session.write_transaction.call_args[0][1]
+
+
+def test_batched_cleanup_falls_back_to_iterative():
+    session = MagicMock()
+    session.write_transaction.return_value.counters.contains_updates = False
+
+    GraphStatement(
+        "MATCH (n:A) WHERE n.lastupdated <> $UPDATE_TAG WITH n LIMIT $LIMIT_SIZE SET n.stale = true",
+        {"UPDATE_TAG": 1},
+        iterative=True,
+        iterationsize=2,
+        batched=True,
+    ).run(session)
+
+    session.read_transaction.assert_not_called()
+    session.write_transaction.assert_called_once()
@@ -1,3 +1,7 @@
+from unittest import mock
+
+import boto3
+
 from cartography.intel.aws import iam
 from cartography.intel.aws.iam import PolicyType
 from cartography.intel.aws.iam import transform_policy_data
@@ -120,3 +124,92 @@ def test_transform_policy_data_correctly_creates_lists_of_statements():
 
     # Assert that we correctly converted the statement to a list
     assert isinstance(pol_statement_map["some-arn"]["pol-name"], list)
+
+
+def _fake_iam_client():
+    client = boto3.session.Session(region_name="us-east-1").client("iam")
+    attached = {
+        "role1": ["arn:aws:iam::aws:policy/ReadOnlyAccess"],
+        "role2": [
+            "arn:aws:iam::aws:policy/ReadOnlyAccess",
+            "arn:aws:iam::1234:policy/custom",
+        ],
+    }
+
+    def paginate(RoleName):
+        if RoleName == "deleted":
+            raise client.exceptions.NoSuchEntityException(
+                {"Error": {"Code": "NoSuchEntity"}},
+                "ListAttachedRolePolicies",
+            )
+        return [
+            {"AttachedPolicies": [{"PolicyArn": arn} for arn in attached[RoleName]]},
+        ]
+
+    client.get_paginator = mock.MagicMock()
+    client.get_paginator.return_value.paginate.side_effect = paginate
+    client.get_policy = mock.MagicMock(
+        side_effect=lambda PolicyArn: {"Policy": {"DefaultVersionId": "v2"}},
+    )
+    client.get_policy_version = mock.MagicMock(
+        side_effect=lambda PolicyArn, VersionId: {
+            "PolicyVersion": {
+                "Document": {
+                    "Statement": [
+                        {"Effect": "Allow", "Action": "s3:*", "Resource": PolicyArn},
+                    ],
+                },
+            },
+        },
+    )
+    return client
+
+
+def test_get_role_managed_policy_data_fetches_each_policy_once():
+    client = _fake_iam_client()
+    boto3_session = mock.MagicMock()
+    boto3_session.client.return_value = client
+    roles = [
+        {"RoleName": name, "Arn": f"arn:aws:iam::1234:role/{name}"}
+        for name in ("role1", "role2", "deleted")
+    ]
+
+    policies = iam.get_role_managed_policy_data(boto3_session, roles)
+
+    assert policies == {
+        "arn:aws:iam::1234:role/role1": {
+            "arn:aws:iam::aws:policy/ReadOnlyAccess": [
+                {
+                    "Effect": "Allow",
+                    "Action": "s3:*",
+                    "Resource": "arn:aws:iam::aws:policy/ReadOnlyAccess",
+                },
+            ],
+        },
+        "arn:aws:iam::1234:role/role2": {
+            "arn:aws:iam::aws:policy/ReadOnlyAccess": [
+                {
+                    "Effect": "Allow",
+                    "Action": "s3:*",
+                    "Resource": "arn:aws:iam::aws:policy/ReadOnlyAccess",
+                },
+            ],
+            "arn:aws:iam::1234:policy/custom": [
+                {
+                    "Effect": "Allow",
+                    "Action": "s3:*",
+                    "Resource": "arn:aws:iam::1234:policy/custom",
+                },
+            ],
+        },
+    }
+    assert client.get_policy.call_count == 2
+    client.get_policy_version.assert_any_call(
+        PolicyArn="arn:aws:iam::1234:policy/custom",
+        VersionId="v2",
+    )
+    # Each principal gets its own copy, since transform_policy_data() modifies statements in place.
+    role1 = policies["arn:aws:iam::1234:role/role1"]
+    role2 = policies["arn:aws:iam::1234:role/role2"]
+    policy_arn = "arn:aws:iam::aws:policy/ReadOnlyAccess"
+    assert role1[policy_arn] is not role2[policy_arn]
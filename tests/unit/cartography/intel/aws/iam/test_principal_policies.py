@@ -5,13 +5,15 @@ from unittest.mock import MagicMock
 import cartography.intel.aws.iam
 from cartography.intel.aws.iam import PolicyType
 from cartography.intel.aws.iam import sync_user_managed_policies
+from cartography.models.aws.iam.policy import AWSPolicySchema
+from cartography.models.aws.iam.policy_statement import AWSPolicyStatementSchema
 from tests.data.aws.iam.user_policies import GET_USER_LIST_DATA
 from tests.data.aws.iam.user_policies import GET_USER_MANAGED_POLS_SAMPLE
 
 AWS_UPDATE_TAG = 111111
 
 
-@mock.patch.object(cartography.intel.aws.iam, "load_policy")
+@mock.patch.object(cartography.intel.aws.iam, "load")
 @mock.patch.object(
     cartography.intel.aws.iam,
     "get_user_managed_policy_data",
@@ -19,7 +21,7 @@ AWS_UPDATE_TAG = 111111
 )
 def test_sync_user_managed_policies(
     mock_get_user_pols: MagicMock,
-    mock_load_pol: MagicMock,
+    mock_load: MagicMock,
 ):
     # Arrange
     boto3_session = mock.MagicMock()
@@ -33,41 +35,42 @@ def test_sync_user_managed_policies(
         AWS_UPDATE_TAG,
     )
 
-    # Assert that we attempt to create policies with expected values for ids.
-    mock_load_pol.assert_has_calls(
+    # Assert that we create policies with expected values for ids, in a single load for all principals.
+    policy_load, statement_load = mock_load.call_args_list
+    assert policy_load == call(
+        neo4j_session,
+        AWSPolicySchema(),
         [
-            call(
-                neo4j_session,
-                "arn:aws:iam::1234:policy/user1-user-policy",
-                "user1-user-policy",
-                PolicyType.managed.value,
-                "arn:aws:iam::1234:user/user1",
-                AWS_UPDATE_TAG,
-            ),
-            call(
-                neo4j_session,
-                "arn:aws:iam::aws:policy/AmazonS3FullAccess",
-                "AmazonS3FullAccess",
-                PolicyType.managed.value,
-                "arn:aws:iam::1234:user/user1",
-                AWS_UPDATE_TAG,
-            ),
-            call(
-                neo4j_session,
-                "arn:aws:iam::aws:policy/AWSLambda_FullAccess",
-                "AWSLambda_FullAccess",
-                PolicyType.managed.value,
-                "arn:aws:iam::1234:user/user1",
-                AWS_UPDATE_TAG,
-            ),
-            call(
-                neo4j_session,
-                "arn:aws:iam::aws:policy/AdministratorAccess",
-                "AdministratorAccess",
-                PolicyType.managed.value,
-                "arn:aws:iam::1234:user/user3",
-                AWS_UPDATE_TAG,
-            ),
+            {
+                "id": "arn:aws:iam::1234:policy/user1-user-policy",
+                "name": "user1-user-policy",
+                "type": PolicyType.managed.value,
+                "principal_arn": "arn:aws:iam::1234:user/user1",
+            },
+            {
+                "id": "arn:aws:iam::aws:policy/AmazonS3FullAccess",
+                "name": "AmazonS3FullAccess",
+                "type": PolicyType.managed.value,
+                "principal_arn": "arn:aws:iam::1234:user/user1",
+            },
+            {
+                "id": "arn:aws:iam::aws:policy/AWSLambda_FullAccess",
+                "name": "AWSLambda_FullAccess",
+                "type": PolicyType.managed.value,
+                "principal_arn": "arn:aws:iam::1234:user/user1",
+            },
+            {
+                "id": "arn:aws:iam::aws:policy/AdministratorAccess",
+                "name": "AdministratorAccess",
+                "type": PolicyType.managed.value,
+                "principal_arn": "arn:aws:iam::1234:user/user3",
+            },
         ],
-        any_order=False,
+        lastupdated=AWS_UPDATE_TAG,
     )
+
+    # Assert that each statement is loaded once and linked to its policy.
+    statements = statement_load.args[2]
+    assert statement_load.args[1] == AWSPolicyStatementSchema()
+    assert len({s["id"] for s in statements}) == len(statements)
+    assert all(s["id"].startswith(f"{s['policy_id']}/statement/") for s in statements)
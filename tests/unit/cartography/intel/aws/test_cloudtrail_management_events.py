@@ -1,3 +1,16 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import botocore.exceptions
+
+import cartography.intel.aws.cloudtrail_management_events
+from cartography.intel.aws.cloudtrail_management_events import _sync_role_assumptions
+from cartography.intel.aws.cloudtrail_management_events import (
+    CLOUDTRAIL_EVENT_DELIVERY_DELAY,
+)
 from cartography.intel.aws.cloudtrail_management_events import (
     transform_assume_role_events_to_role_assumptions,
 )
@@ -7,6 +20,7 @@ from cartography.intel.aws.cloudtrail_management_events import (
 from cartography.intel.aws.cloudtrail_management_events import (
     transform_web_identity_role_events_to_role_assumptions,
 )
+from cartography.models.aws.cloudtrail.management_events import AssumedRoleMatchLink
 from tests.data.aws.cloudtrail_management_events import (
     ACCESS_DENIED_ASSUME_ROLE_CLOUDTRAIL_EVENTS,
 )
@@ -156,3 +170,182 @@ def test_transform_web_identity_role_events_with_null_request_parameters():
 
     # Assert - Events with null requestParameters should be skipped, resulting in empty list
     assert len(result) == 0
+
+
+@patch.object(cartography.intel.aws.cloudtrail_management_events, "set_high_water_mark")
+@patch.object(
+    cartography.intel.aws.cloudtrail_management_events,
+    "get_role_assumptions_in_window",
+)
+@patch.object(cartography.intel.aws.cloudtrail_management_events, "get_high_water_mark")
+def test_sync_role_assumptions_reads_after_high_water_mark(
+    mock_get_high_water_mark,
+    mock_get_role_assumptions_in_window,
+    mock_set_high_water_mark,
+):
+    """
+    Test that an incremental sync reads each region from the high-water mark on, and adds the events of all regions
+    to the relationships already in the graph.
+    """
+    # Arrange
+    high_water_mark = datetime.now(timezone.utc) - timedelta(hours=1)
+    mock_get_high_water_mark.return_value = high_water_mark
+    mock_get_role_assumptions_in_window.return_value = [
+        {
+            "source_principal_arn": "arn:aws:iam::123456789012:user/john.doe",
+            "destination_principal_arn": "arn:aws:iam::987654321098:role/ApplicationRole",
+            "times_used": 5,
+            "first_seen_in_time_window": "2024-01-15T08:00:00.000000",
+            "last_used": "2024-01-15T09:00:00.000000",
+        },
+    ]
+    get_events = MagicMock(
+        side_effect=lambda **kwargs: iter([SAMPLE_ASSUME_ROLE_EVENT]),
+    )
+    load = MagicMock()
+
+    # Act
+    loaded = _sync_role_assumptions(
+        MagicMock(),
+        MagicMock(),
+        ["us-east-1", "us-west-2"],
+        "123456789012",
+        1,
+        24,
+        get_events,
+        transform_assume_role_events_to_role_assumptions,
+        load,
+        AssumedRoleMatchLink(),
+        incremental=True,
+    )
+
+    # Assert
+    assert loaded == 1
+    assert sorted(c.kwargs["region"] for c in get_events.call_args_list) == [
+        "us-east-1",
+        "us-west-2",
+    ]
+    assert all(
+        c.kwargs["start_time"] == high_water_mark for c in get_events.call_args_list
+    )
+    delivered_before = datetime.now(timezone.utc) - CLOUDTRAIL_EVENT_DELIVERY_DELAY
+    assert all(
+        c.kwargs["end_time"] <= delivered_before for c in get_events.call_args_list
+    )
+    role_assumptions = load.call_args.args[1]
+    assert role_assumptions == [
+        {
+            "source_principal_arn": "arn:aws:iam::123456789012:user/john.doe",
+            "destination_principal_arn": "arn:aws:iam::987654321098:role/ApplicationRole",
+            "times_used": 7,
+            "first_seen_in_time_window": "2024-01-15T08:00:00.000000",
+            "last_used": "2024-01-15T10:30:15.123000",
+        },
+    ]
+    assert mock_set_high_water_mark.call_count == 1
+    assert mock_set_high_water_mark.call_args.args[4] is not None
+
+
+@patch.object(cartography.intel.aws.cloudtrail_management_events, "set_high_water_mark")
+@patch.object(
+    cartography.intel.aws.cloudtrail_management_events,
+    "get_role_assumptions_in_window",
+)
+@patch.object(cartography.intel.aws.cloudtrail_management_events, "get_high_water_mark")
+def test_sync_role_assumptions_ignores_high_water_mark_by_default(
+    mock_get_high_water_mark,
+    mock_get_role_assumptions_in_window,
+    mock_set_high_water_mark,
+):
+    """
+    Test that a sync that is not incremental reads the whole lookback period and replaces the relationships.
+    """
+    # Arrange
+    mock_get_high_water_mark.return_value = datetime.now(timezone.utc) - timedelta(
+        hours=1
+    )
+    get_events = MagicMock(
+        side_effect=lambda **kwargs: iter([SAMPLE_ASSUME_ROLE_EVENT]),
+    )
+    load = MagicMock()
+
+    # Act
+    loaded = _sync_role_assumptions(
+        MagicMock(),
+        MagicMock(),
+        ["us-east-1", "us-west-2"],
+        "123456789012",
+        1,
+        24,
+        get_events,
+        transform_assume_role_events_to_role_assumptions,
+        load,
+        AssumedRoleMatchLink(),
+    )
+
+    # Assert
+    assert loaded == 1
+    window_start = datetime.now(timezone.utc) - timedelta(hours=24)
+    assert all(
+        c.kwargs["start_time"] <= window_start for c in get_events.call_args_list
+    )
+    delivered_before = datetime.now(timezone.utc) - CLOUDTRAIL_EVENT_DELIVERY_DELAY
+    assert all(
+        c.kwargs["end_time"] > delivered_before for c in get_events.call_args_list
+    )
+    mock_get_high_water_mark.assert_not_called()
+    mock_get_role_assumptions_in_window.assert_not_called()
+    assert load.call_args.args[1][0]["times_used"] == 2
+
+
+@patch.object(cartography.intel.aws.cloudtrail_management_events, "set_high_water_mark")
+@patch.object(
+    cartography.intel.aws.cloudtrail_management_events,
+    "get_role_assumptions_in_window",
+)
+@patch.object(cartography.intel.aws.cloudtrail_management_events, "get_high_water_mark")
+def test_sync_role_assumptions_clears_high_water_mark_when_a_region_is_skipped(
+    mock_get_high_water_mark,
+    mock_get_role_assumptions_in_window,
+    mock_set_high_water_mark,
+):
+    """
+    Test that the high-water mark is not advanced when the events of a region could not be read, so that the next
+    sync reads the whole lookback period of that region.
+    """
+    # Arrange
+    mock_get_high_water_mark.return_value = datetime.now(timezone.utc) - timedelta(
+        hours=1
+    )
+    mock_get_role_assumptions_in_window.return_value = []
+    access_denied = botocore.exceptions.ClientError(
+        {"Error": {"Code": "AccessDeniedException", "Message": "Denied"}},
+        "LookupEvents",
+    )
+
+    def get_events(**kwargs):
+        if kwargs["region"] == "us-west-2":
+            raise access_denied
+        return iter([SAMPLE_ASSUME_ROLE_EVENT])
+
+    load = MagicMock()
+
+    # Act
+    loaded = _sync_role_assumptions(
+        MagicMock(),
+        MagicMock(),
+        ["us-east-1", "us-west-2"],
+        "123456789012",
+        1,
+        24,
+        get_events,
+        transform_assume_role_events_to_role_assumptions,
+        load,
+        AssumedRoleMatchLink(),
+        incremental=True,
+    )
+
+    # Assert
+    assert loaded == 1
+    assert mock_set_high_water_mark.call_count == 1
+    assert mock_set_high_water_mark.call_args.args[4] is None
@@ -1,5 +1,11 @@
 from datetime import datetime
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
+import pytest
+
+import cartography.intel.aws.inspector
+from cartography.intel.aws.inspector import sync
 from cartography.intel.aws.inspector import transform_inspector_findings
 from tests.data.aws.inspector import LIST_FINDINGS_EC2_PACKAGE
 from tests.data.aws.inspector import LIST_FINDINGS_NETWORK
@@ -171,3 +177,70 @@ def test_transform_inspector_findings_package():
         expected_finding_to_package_map,
         key=lambda i: (i["findingarn"], i["packageid"]),
     )
+
+
+@patch.object(cartography.intel.aws.inspector, "cleanup")
+@patch.object(cartography.intel.aws.inspector, "_load_findings_batch")
+@patch.object(cartography.intel.aws.inspector, "get_inspector_findings")
+@patch.object(
+    cartography.intel.aws.inspector,
+    "get_member_accounts",
+    side_effect=lambda session, region: ["111111111111", "222222222222"],
+)
+def test_sync_pipelined_loads_all_batches(
+    mock_get_members, mock_get_findings, mock_load_batch, mock_cleanup
+):
+    mock_get_findings.side_effect = lambda session, region, account_id: iter(
+        [LIST_FINDINGS_NETWORK] * 3,
+    )
+    common_job_parameters = {"aws_inspector_workers": 4}
+
+    sync(
+        MagicMock(),
+        MagicMock(),
+        ["us-east-1", "us-west-2", "not-an-inspector-region"],
+        "333333333333",
+        TEST_UPDATE_TAG,
+        common_job_parameters,
+    )
+
+    # 2 regions x 3 accounts (2 members and the current account) x 3 batches
+    assert mock_get_findings.call_count == 6
+    assert mock_load_batch.call_count == 18
+    loaded_pairs = {(c.args[1], c.args[2]) for c in mock_load_batch.call_args_list}
+    assert loaded_pairs == {
+        (region, account)
+        for region in ("us-east-1", "us-west-2")
+        for account in ("111111111111", "222222222222", "333333333333")
+    }
+    mock_cleanup.assert_called_once()
+
+
+@patch.object(cartography.intel.aws.inspector, "cleanup")
+@patch.object(cartography.intel.aws.inspector, "_load_findings_batch")
+@patch.object(cartography.intel.aws.inspector, "get_inspector_findings")
+@patch.object(
+    cartography.intel.aws.inspector,
+    "get_member_accounts",
+    side_effect=lambda session, region: ["111111111111"],
+)
+def test_sync_pipelined_raises_fetch_errors(
+    mock_get_members, mock_get_findings, mock_load_batch, mock_cleanup
+):
+    def get_findings(session, region, account_id):
+        if account_id == "111111111111":
+            raise RuntimeError("fetch failed")
+        return iter([LIST_FINDINGS_NETWORK])
+
+    mock_get_findings.side_effect = get_findings
+
+    with pytest.raises(RuntimeError, match="fetch failed"):
+        sync(
+            MagicMock(),
+            MagicMock(),
+            ["us-east-1"],
+            "333333333333",
+            TEST_UPDATE_TAG,
+            {"aws_inspector_workers": 2},
+        )
+    mock_cleanup.assert_not_called()
@@ -1,3 +1,8 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
 from cartography.intel.aws import permission_relationships
 
 GET_OBJECT_LOWERCASE_RESOURCE_WILDCARD = [
@@ -528,3 +533,270 @@ def test_permissions_list():
         assert False
     except ValueError:
         assert True
+
+
+def test_resource_arn_index_match():
+    index = permission_relationships.ResourceArnIndex(
+        [
+            "arn:aws:s3:::testbucket",
+            "arn:aws:s3:::testbucket/key.txt",
+            "arn:aws:s3:::otherbucket",
+            "arn:aws:dynamodb:us-east-1:000000000000:table/test",
+        ],
+    )
+    assert index.match("ARN:AWS:S3:::TESTBUCKET") == {0}
+    assert index.match("arn:aws:s3:::testbucket/*") == {1}
+    assert index.match("arn:aws:s3:::*bucket") == {0, 2}
+    assert index.match("arn:aws:*:us-east-1:*") == {3}
+    assert index.match("*") == {0, 1, 2, 3}
+    assert index.match("arn:aws:s3:::test") == set()
+
+
+def test_calculate_permission_relationships_matches_per_resource_evaluation():
+    principals = {
+        "reader": {
+            "ReadAll": [
+                {
+                    "action": ["s3:Get*", "s3:List*"],
+                    "resource": ["*"],
+                    "effect": "Allow",
+                },
+            ],
+            "DenySecrets": [
+                {
+                    "action": ["s3:*"],
+                    "resource": ["arn:aws:s3:::secret*"],
+                    "effect": "Deny",
+                },
+            ],
+        },
+        "writer": {
+            "Write": permission_relationships.compile_statement(
+                [
+                    {
+                        "action": ["s3:PutObject"],
+                        "resource": ["arn:aws:s3:::*"],
+                        "notresource": ["arn:aws:s3:::logs"],
+                        "effect": "Allow",
+                    },
+                ],
+            ),
+        },
+        "ordered": {
+            # The first permission that a statement applies to decides for the whole policy.
+            "AllowThenDeny": [
+                {"action": ["s3:GetObject"], "resource": ["*"], "effect": "Allow"},
+                {"action": ["s3:PutObject"], "resource": ["*"], "effect": "Deny"},
+            ],
+        },
+    }
+    resource_arns = [
+        "arn:aws:s3:::data",
+        "arn:aws:s3:::secretdata",
+        "arn:aws:s3:::logs",
+        "arn:aws:dynamodb:us-east-1:000000000000:table/test",
+    ]
+    permissions = ["S3:GetObject", "S3:PutObject"]
+
+    expected = [
+        {"principal_arn": principal_arn, "resource_arn": resource_arn}
+        for resource_arn in resource_arns
+        for principal_arn, policies in principals.items()
+        if permission_relationships.principal_allowed_on_resource(
+            policies,
+            resource_arn,
+            permissions,
+        )
+    ]
+    assert len(expected) == 9
+    assert (
+        permission_relationships.calculate_permission_relationships(
+            principals,
+            resource_arns,
+            permissions,
+        )
+        == expected
+    )
+
+
+def _statement_node(**properties):
+    node = mock.MagicMock()
+    node._properties = properties
+    return node
+
+
+def test_get_principals_for_account_reuses_compiled_managed_policies():
+    permission_relationships.get_compiled_statement_cache().clear()
+    managed_statement = {
+        "id": "arn:aws:iam::aws:policy/ReadOnly/statement/1",
+        "effect": "Allow",
+        "action": ["s3:Get*"],
+        "resource": ["*"],
+    }
+    neo4j_session = mock.MagicMock()
+    principals_by_account = []
+    for account_id in ("000000000000", "111111111111"):
+        neo4j_session.run.return_value = [
+            {
+                "principal_arn": f"arn:aws:iam::{account_id}:role/{name}",
+                "policy_id": "arn:aws:iam::aws:policy/ReadOnly",
+                "statements": [
+                    _statement_node(**managed_statement, lastupdated=account_id),
+                ],
+            }
+            for name in ("a", "b")
+        ]
+        principals_by_account.append(
+            permission_relationships.get_principals_for_account(
+                neo4j_session,
+                account_id,
+            ),
+        )
+
+    compiled = [
+        policies["arn:aws:iam::aws:policy/ReadOnly"][0]
+        for principals in principals_by_account
+        for policies in principals.values()
+    ]
+    assert len(compiled) == 4
+    assert all(statement is compiled[0] for statement in compiled)
+    assert compiled[0]["action"][0].fullmatch("s3:GetObject")
+    cache = permission_relationships.get_compiled_statement_cache()
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    # A statement whose content changed is compiled again.
+    neo4j_session.run.return_value = [
+        {
+            "principal_arn": "arn:aws:iam::000000000000:role/a",
+            "policy_id": "arn:aws:iam::aws:policy/ReadOnly",
+            "statements": [_statement_node(**managed_statement, sid="changed")],
+        },
+    ]
+    permission_relationships.get_principals_for_account(neo4j_session, "000000000000")
+    assert cache.misses == 2
+
+
+def test_calculate_permission_relationships_in_pool(monkeypatch):
+    monkeypatch.setattr(permission_relationships, "MIN_RESOURCES_PER_WORKER", 1)
+    principals = {
+        "reader": {
+            "Read": permission_relationships.compile_statement(
+                [{"action": ["s3:Get*"], "resource": ["*"], "effect": "Allow"}],
+            ),
+        },
+        "writer": {
+            "Write": permission_relationships.compile_statement(
+                [
+                    {
+                        "action": ["s3:PutObject"],
+                        "resource": ["arn:aws:s3:::bucket2*"],
+                        "effect": "Allow",
+                    },
+                ],
+            ),
+        },
+    }
+    resource_arns = [f"arn:aws:s3:::bucket{i}" for i in range(5)]
+    permissions = ["S3:GetObject", "S3:PutObject"]
+
+    pool = permission_relationships.get_evaluation_pool(principals, 2)
+    try:
+        mappings = permission_relationships.calculate_permission_relationships_in_pool(
+            pool,
+            2,
+            resource_arns,
+            permissions,
+        )
+    finally:
+        pool.shutdown()
+
+    assert mappings == permission_relationships.calculate_permission_relationships(
+        principals,
+        resource_arns,
+        permissions,
+    )
+    assert len(mappings) == 6
+
+
+def test_sync_uses_one_evaluation_pool_at_a_time(monkeypatch):
+    lock = threading.Lock()
+    open_pools = []
+    max_open_pools = []
+
+    def get_evaluation_pool(principals, workers):
+        pool = mock.MagicMock()
+        with lock:
+            open_pools.append(pool)
+            max_open_pools.append(len(open_pools))
+        pool.shutdown.side_effect = lambda: open_pools.remove(pool)
+        return pool
+
+    def calculate_permission_relationships_in_pool(*args):
+        time.sleep(0.05)
+        return []
+
+    def load_principal_mappings(*args):
+        # Graph writes don't wait for other accounts' evaluation
+        assert not permission_relationships._evaluation_pool_lock.locked()
+
+    monkeypatch.setattr(
+        permission_relationships, "get_evaluation_pool", get_evaluation_pool
+    )
+    monkeypatch.setattr(
+        permission_relationships,
+        "calculate_permission_relationships_in_pool",
+        calculate_permission_relationships_in_pool,
+    )
+    monkeypatch.setattr(
+        permission_relationships,
+        "get_resource_arns",
+        mock.MagicMock(
+            return_value=[
+                f"arn:aws:s3:::bucket{i}"
+                for i in range(permission_relationships.MIN_RESOURCES_PER_WORKER + 1)
+            ],
+        ),
+    )
+    monkeypatch.setattr(
+        permission_relationships, "load_principal_mappings", load_principal_mappings
+    )
+    monkeypatch.setattr(permission_relationships, "cleanup_rpr", mock.MagicMock())
+    monkeypatch.setattr(
+        permission_relationships, "get_principals_for_account", mock.MagicMock()
+    )
+    monkeypatch.setattr(
+        permission_relationships,
+        "parse_permission_relationships_file",
+        mock.MagicMock(
+            return_value=[
+                {
+                    "permissions": ["S3:GetObject"],
+                    "relationship_name": "CAN_READ",
+                    "target_label": "S3Bucket",
+                },
+            ],
+        ),
+    )
+
+    # Accounts synced concurrently never run more than `workers` evaluation processes
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(
+                permission_relationships.sync,
+                mock.MagicMock(),
+                mock.MagicMock(),
+                [],
+                account_id,
+                1,
+                {
+                    "permission_relationships_file": "rprs.yaml",
+                    "permission_relationships_workers": 2,
+                },
+            )
+            for account_id in ("0", "1", "2", "3")
+        ]
+        for future in futures:
+            future.result()
+
+    assert len(max_open_pools) == 4
+    assert max(max_open_pools) == 1
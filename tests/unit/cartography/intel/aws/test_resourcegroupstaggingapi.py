@@ -1,5 +1,6 @@
 import copy
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import cartography.intel.aws.resourcegroupstaggingapi as rgta
 import tests.data.aws.resourcegroupstaggingapi as test_data
@@ -91,3 +92,49 @@ def test_load_tags_empty_data():
 
     # Assert
     mock_neo4j_session.write_transaction.assert_not_called()
+
+
+@patch.object(rgta, "load_tagged_relationships")
+@patch.object(rgta, "load")
+def test_load_all_tags_deduplicates_tags(mock_load, mock_load_tagged):
+    """
+    Ensure that each distinct tag is loaded once for all resource types and regions, and that only resources that are
+    in the graph are tagged.
+    """
+    # Arrange
+    mock_neo4j_session = MagicMock()
+    mock_neo4j_session.read_transaction.side_effect = [["i-01"], ["bucket"]]
+    tag = {"Key": "env", "Value": "prod"}
+    tag_data_by_resource_type = {
+        "ec2:instance": [
+            {"resource_id": "i-01", "Tags": [tag], "region": "us-east-1"},
+            {"resource_id": "i-01", "Tags": [tag], "region": "us-west-2"},
+            {
+                "resource_id": "i-02",
+                "Tags": [{"Key": "x", "Value": "y"}],
+                "region": "us-east-1",
+            },
+        ],
+        "s3": [
+            {"resource_id": "bucket", "Tags": [tag], "region": "us-east-1"},
+        ],
+        "sqs": [],
+    }
+
+    # Act
+    rgta.load_all_tags(
+        mock_neo4j_session,
+        tag_data_by_resource_type,
+        "123456789012",
+        123456789,
+    )
+
+    # Assert
+    mock_load.assert_called_once()
+    assert mock_load.call_args.args[2] == [
+        {"id": "env:prod", "key": "env", "value": "prod", "region": "us-east-1"},
+    ]
+    assert [c.args[1:3] for c in mock_load_tagged.call_args_list] == [
+        ([{"resource_id": "i-01", "tag_id": "env:prod"}], "ec2:instance"),
+        ([{"resource_id": "bucket", "tag_id": "env:prod"}], "s3"),
+    ]
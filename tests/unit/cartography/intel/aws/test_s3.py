@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from cartography.intel.aws import s3
+
+
+def test_get_s3_bucket_details_bounds_concurrency_per_region(monkeypatch):
+    monkeypatch.setattr(s3, "S3_DETAILS_MAX_WORKERS", 3)
+    monkeypatch.setattr(s3, "S3_DETAILS_MAX_WORKERS_PER_REGION", 2)
+    lock = threading.Lock()
+    in_flight: Counter = Counter()
+    max_in_flight: Counter = Counter()
+
+    def get_acl(bucket, client):
+        with lock:
+            in_flight[bucket["Region"]] += 1
+            max_in_flight[bucket["Region"]] = max(
+                max_in_flight[bucket["Region"]],
+                in_flight[bucket["Region"]],
+            )
+        time.sleep(0.01)
+        with lock:
+            in_flight[bucket["Region"]] -= 1
+        return {"Owner": bucket["Name"]}
+
+    monkeypatch.setattr(s3, "get_acl", get_acl)
+    for getter in (
+        "get_policy",
+        "get_encryption",
+        "get_versioning",
+        "get_public_access_block",
+        "get_bucket_ownership_controls",
+        "get_bucket_logging",
+    ):
+        monkeypatch.setattr(s3, getter, lambda bucket, client: None)
+    boto3_session = MagicMock()
+    bucket_data = {
+        "Buckets": [
+            {"Name": f"bucket{i}", "Region": "us-east-1" if i % 2 else None}
+            for i in range(20)
+        ],
+    }
+
+    details = list(s3.get_s3_bucket_details(boto3_session, bucket_data))
+
+    assert sorted(d[0] for d in details) == sorted(
+        b["Name"] for b in bucket_data["Buckets"]
+    )
+    assert all(d[1] == {"Owner": d[0]} for d in details)
+    assert max(max_in_flight.values()) <= 2
+    # One client per region, reused for all of the region's buckets.
+    assert boto3_session.client.call_count == 2
+
+
+def test_get_s3_details_fingerprint_ignores_response_metadata():
+    details = ("bucket", {"Grants": [], "ResponseMetadata": {"RequestId": "1"}}, None)
+    same_details = (
+        "bucket",
+        {"Grants": [], "ResponseMetadata": {"RequestId": "2"}},
+        None,
+    )
+    changed_details = ("bucket", {"Grants": [{"Permission": "READ"}]}, None)
+
+    assert s3.get_s3_details_fingerprint(details) == s3.get_s3_details_fingerprint(
+        same_details,
+    )
+    assert s3.get_s3_details_fingerprint(details) != s3.get_s3_details_fingerprint(
+        changed_details,
+    )
+
+
+def test_get_buckets_to_refresh():
+    now = 1700000000
+    old_creation_date = datetime.fromtimestamp(now - 100000, tz=timezone.utc)
+    bucket_data = {
+        "Buckets": [
+            {"Name": "fresh", "CreationDate": old_creation_date},
+            {"Name": "stale", "CreationDate": old_creation_date},
+            {"Name": "new", "CreationDate": old_creation_date},
+            {
+                "Name": "recreated",
+                "CreationDate": datetime.fromtimestamp(now - 60, tz=timezone.utc),
+            },
+        ],
+    }
+    details_state = {
+        "fresh": {"fingerprint": "a", "fetched_at": now - 3600},
+        "stale": {"fingerprint": "b", "fetched_at": now - 24 * 3600},
+        "recreated": {"fingerprint": "c", "fetched_at": now - 3600},
+    }
+
+    to_fetch, to_keep = s3.get_buckets_to_refresh(
+        bucket_data,
+        details_state,
+        now,
+        max_age_hours=12,
+    )
+
+    assert [b["Name"] for b in to_fetch["Buckets"]] == ["stale", "new", "recreated"]
+    assert to_keep == ["fresh"]
+
+
+def test_load_s3_details_stores_fingerprints_after_loading(monkeypatch):
+    calls = []
+    monkeypatch.setattr(s3, "run_cleanup_job", MagicMock())
+    monkeypatch.setattr(s3, "refresh_s3_details", MagicMock())
+    monkeypatch.setattr(s3, "_run_s3_acl_analysis", MagicMock())
+    monkeypatch.setattr(s3, "_set_default_values", MagicMock())
+    monkeypatch.setattr(
+        s3,
+        "_load_s3_details_chunk",
+        lambda session, chunk, account_id, update_tag: calls.append(
+            ("details", [details[0] for details in chunk]),
+        ),
+    )
+    monkeypatch.setattr(
+        s3,
+        "_load_s3_details_fingerprints",
+        lambda session, fingerprints, fetched_at: calls.append(
+            ("fingerprints", [f["bucket"] for f in fingerprints], fetched_at),
+        ),
+    )
+    before = int(time.time())
+
+    s3.load_s3_details(
+        MagicMock(),
+        iter([("changed", {"Grants": []}), ("unchanged", None)]),
+        "000000000000",
+        1,
+        previous_fingerprints={
+            "unchanged": s3.get_s3_details_fingerprint(("unchanged", None)),
+        },
+    )
+
+    assert calls[0] == ("details", ["changed"])
+    assert calls[1][:2] == ("fingerprints", ["changed", "unchanged"])
+    # The fetch time is wall-clock time, not the update tag
+    assert calls[1][2] >= before
+
+
+def test_load_s3_details_does_not_store_fingerprints_of_failed_loads(monkeypatch):
+    monkeypatch.setattr(s3, "run_cleanup_job", MagicMock())
+    monkeypatch.setattr(s3, "refresh_s3_details", MagicMock())
+    monkeypatch.setattr(
+        s3,
+        "_load_s3_details_chunk",
+        MagicMock(side_effect=RuntimeError("load failed")),
+    )
+    load_fingerprints = MagicMock()
+    monkeypatch.setattr(s3, "_load_s3_details_fingerprints", load_fingerprints)
+
+    with pytest.raises(RuntimeError):
+        s3.load_s3_details(
+            MagicMock(),
+            iter([("changed", {"Grants": []})]),
+            "000000000000",
+            1,
+            previous_fingerprints={},
+        )
+
+    load_fingerprints.assert_not_called()
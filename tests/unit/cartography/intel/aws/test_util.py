@@ -1,7 +1,14 @@
+import threading
+import time
+from unittest import mock
+
+import botocore.exceptions
 import pytest
 
 from cartography.intel.aws.util.common import parse_and_validate_aws_regions
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
+from cartography.intel.aws.util.regions import get_data_for_regions
+from cartography.intel.aws.util.regions import iter_data_for_regions
 
 
 def test_parse_and_validate_requested_syncs():
@@ -67,3 +74,121 @@ def test_parse_and_validate_aws_regions():
         ValueError, match="`aws-regions` was set but no regions were specified"
     ):
         parse_and_validate_aws_regions(only_empty)
+
+
+def test_get_data_for_regions_runs_concurrently_and_keeps_region_order():
+    regions = ["us-east-1", "us-west-2", "eu-west-1"]
+    # Fails with BrokenBarrierError unless all regions are fetched at the same time
+    all_started = threading.Barrier(len(regions), timeout=5)
+
+    def get_func(boto3_session, region, suffix):
+        all_started.wait()
+        return f"{region}-{suffix}"
+
+    result = get_data_for_regions(
+        get_func,
+        mock.MagicMock(),
+        regions,
+        "ec2",
+        "data",
+    )
+
+    assert list(result.items()) == [
+        ("us-east-1", "us-east-1-data"),
+        ("us-west-2", "us-west-2-data"),
+        ("eu-west-1", "eu-west-1-data"),
+    ]
+
+
+@mock.patch("backoff._sync.time.sleep")
+def test_get_data_for_regions_retries_throttling(mock_sleep):
+    throttled = botocore.exceptions.ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+        "ListThings",
+    )
+    get_func = mock.MagicMock(side_effect=[throttled, ["thing"]])
+
+    result = get_data_for_regions(get_func, mock.MagicMock(), ["us-east-1"], "ec2")
+
+    assert result == {"us-east-1": ["thing"]}
+    assert get_func.call_count == 2
+
+
+def test_get_data_for_regions_raises_other_errors():
+    def get_func(boto3_session, region):
+        if region == "us-west-2":
+            raise ValueError("boom")
+        return []
+
+    with pytest.raises(ValueError, match="boom"):
+        get_data_for_regions(
+            get_func,
+            mock.MagicMock(),
+            ["us-east-1", "us-west-2"],
+            "ec2",
+        )
+
+
+def test_iter_data_for_regions_yields_regions_as_they_finish():
+    regions = ["us-east-1", "us-west-2", "eu-west-1"]
+    us_east_1_may_finish = threading.Event()
+    running = set()
+    max_running = 0
+    lock = threading.Lock()
+
+    def get_func(boto3_session, region):
+        nonlocal max_running
+        with lock:
+            running.add(region)
+            max_running = max(max_running, len(running))
+        if region == "us-east-1":
+            assert us_east_1_may_finish.wait(timeout=5)
+        with lock:
+            running.remove(region)
+        return region
+
+    results = []
+    for region, data in iter_data_for_regions(
+        get_func,
+        mock.MagicMock(),
+        regions,
+        "ec2",
+        max_workers=2,
+    ):
+        results.append(data)
+        # The slow first region does not hold back the others.
+        if len(results) == 2:
+            us_east_1_may_finish.set()
+
+    assert results == ["us-west-2", "eu-west-1", "us-east-1"]
+    # A region only starts when a worker is free.
+    assert max_running == 2
+
+
+def test_iter_data_for_regions_creates_clients_one_at_a_time():
+    boto3_session = mock.MagicMock()
+    creating = threading.Lock()
+
+    def client(*args, **kwargs):
+        # Fails if another thread is creating a client at the same time.
+        assert creating.acquire(blocking=False)
+        time.sleep(0.01)
+        creating.release()
+        return mock.MagicMock()
+
+    boto3_session.client.side_effect = client
+
+    def get_func(boto3_session, region):
+        return boto3_session.client("ec2", region_name=region)
+
+    results = dict(
+        iter_data_for_regions(
+            get_func,
+            boto3_session,
+            ["us-east-1", "us-west-2", "eu-west-1", "eu-central-1"],
+            "ec2",
+        ),
+    )
+
+    assert len(results) == 4
+    assert boto3_session.client.call_count == 4
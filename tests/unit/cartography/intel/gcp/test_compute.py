@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock
+
 import cartography.intel.gcp.compute
 from tests.data.gcp.compute import LIST_FIREWALLS_RESPONSE
 from tests.data.gcp.compute import VPC_RESPONSE
@@ -76,3 +78,48 @@ def test_transform_gcp_firewall():
     assert sample_fw_icmp_rule["fromport"] is None
     assert sample_fw_icmp_rule["toport"] is None
     assert sample_fw_icmp_rule["protocol"] == "icmp"
+
+
+def test_get_gcp_instance_responses_uses_aggregated_list():
+    """
+    Ensure that get_gcp_instance_responses() pages through instances().aggregatedList() once and returns one
+    response per requested zone that has instances, in the form returned by instances().list().
+    """
+    first_page = {
+        "items": {
+            "zones/europe-west2-b": {"instances": [{"name": "instance-1"}]},
+            "zones/us-east1-b": {"warning": {"code": "NO_RESULTS_ON_PAGE"}},
+            "zones/us-west1-a": {"instances": [{"name": "instance-2"}]},
+        },
+        "nextPageToken": "token",
+    }
+    second_page = {
+        "items": {
+            "zones/europe-west2-b": {"instances": [{"name": "instance-3"}]},
+        },
+    }
+    compute = MagicMock()
+    instances = compute.instances.return_value
+    first_req = instances.aggregatedList.return_value
+    first_req.execute.return_value = first_page
+    second_req = MagicMock()
+    second_req.execute.return_value = second_page
+    instances.aggregatedList_next.side_effect = [second_req, None]
+
+    responses = cartography.intel.gcp.compute.get_gcp_instance_responses(
+        "project-abc",
+        [{"name": "europe-west2-b"}, {"name": "us-east1-b"}],
+        compute,
+    )
+
+    instances.aggregatedList.assert_called_once_with(project="project-abc")
+    instances.list.assert_not_called()
+    # us-east1-b has no instances and us-west1-a was not requested.
+    assert responses == [
+        {
+            "id": "projects/project-abc/zones/europe-west2-b/instances",
+            "items": [{"name": "instance-1"}, {"name": "instance-3"}],
+        },
+    ]
+    instance_list = cartography.intel.gcp.compute.transform_gcp_instances(responses)
+    assert [i["zone_name"] for i in instance_list] == ["europe-west2-b"] * 2
@@ -0,0 +1,196 @@
+import json
+import threading
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import googleapiclient.discovery
+import googleapiclient.discovery_cache
+import pytest
+
+import cartography.intel.gcp
+from cartography.intel.gcp import _build_resource
+from cartography.intel.gcp import _get_enabled_services_of_projects
+from cartography.intel.gcp import _sync_multiple_projects
+from cartography.intel.gcp import DiscoveryDocumentCache
+
+TEST_UPDATE_TAG = 123456789
+
+
+@contextmanager
+def _fake_new_neo4j_session(neo4j_driver, neo4j_session, database):
+    yield MagicMock()
+
+
+def _fake_get_enabled_services_of_projects(credentials, project_ids):
+    return {project_id: {f"{project_id}.googleapis.com"} for project_id in project_ids}
+
+
+@patch.object(cartography.intel.gcp, "new_neo4j_session", _fake_new_neo4j_session)
+@patch.object(
+    cartography.intel.gcp,
+    "_get_enabled_services_of_projects",
+    _fake_get_enabled_services_of_projects,
+)
+@patch.object(cartography.intel.gcp, "_initialize_project_resources")
+@patch.object(cartography.intel.gcp, "_cleanup_project")
+@patch.object(cartography.intel.gcp, "_sync_single_project")
+@patch.object(cartography.intel.gcp.crm, "sync_gcp_projects")
+def test_sync_multiple_projects_with_workers(
+    mock_sync_projects,
+    mock_sync_single_project,
+    mock_cleanup_project,
+    mock_initialize_resources,
+):
+    lock = threading.Lock()
+    synced = []
+    events = []
+
+    def sync_single_project(
+        neo4j_session,
+        resources,
+        project_id,
+        enabled_services,
+        update_tag,
+        common_job_parameters,
+        run_cleanup,
+    ):
+        # The workers don't run the cleanup jobs that are not scoped to the project.
+        assert not run_cleanup
+        with lock:
+            synced.append(
+                (project_id, common_job_parameters["PROJECT_ID"], enabled_services),
+            )
+            events.append("sync")
+
+    mock_sync_single_project.side_effect = sync_single_project
+    mock_cleanup_project.side_effect = lambda *args: events.append("cleanup")
+    projects = [{"projectId": f"project-{i}"} for i in range(20)]
+    common_job_parameters = {"UPDATE_TAG": TEST_UPDATE_TAG}
+
+    _sync_multiple_projects(
+        MagicMock(),
+        MagicMock(),
+        projects,
+        TEST_UPDATE_TAG,
+        common_job_parameters,
+        project_workers=4,
+        neo4j_driver=MagicMock(),
+    )
+
+    # Every project is synced once, with its own PROJECT_ID.
+    assert sorted(synced) == sorted(
+        (p["projectId"], p["projectId"], {f"{p['projectId']}.googleapis.com"})
+        for p in projects
+    )
+    # The shared parameters are not modified.
+    assert common_job_parameters == {"UPDATE_TAG": TEST_UPDATE_TAG}
+    # One set of resource objects per worker.
+    assert mock_initialize_resources.call_count == 4
+    # Every project is cleaned up once, after all projects were loaded.
+    assert events == ["sync"] * 20 + ["cleanup"] * 20
+    assert sorted(
+        (c.args[1], c.args[3]["PROJECT_ID"])
+        for c in mock_cleanup_project.call_args_list
+    ) == sorted((p["projectId"], p["projectId"]) for p in projects)
+
+
+@patch.object(cartography.intel.gcp, "new_neo4j_session", _fake_new_neo4j_session)
+@patch.object(
+    cartography.intel.gcp,
+    "_get_enabled_services_of_projects",
+    _fake_get_enabled_services_of_projects,
+)
+@patch.object(cartography.intel.gcp, "_initialize_project_resources")
+@patch.object(cartography.intel.gcp, "_cleanup_project")
+@patch.object(cartography.intel.gcp, "_sync_single_project")
+@patch.object(cartography.intel.gcp.crm, "sync_gcp_projects")
+def test_sync_multiple_projects_with_workers_raises_errors(
+    mock_sync_projects,
+    mock_sync_single_project,
+    mock_cleanup_project,
+    mock_initialize_resources,
+):
+    def sync_single_project(
+        neo4j_session,
+        resources,
+        project_id,
+        enabled_services,
+        update_tag,
+        common_job_parameters,
+        run_cleanup,
+    ):
+        if project_id == "project-3":
+            raise RuntimeError("sync failed")
+
+    mock_sync_single_project.side_effect = sync_single_project
+    projects = [{"projectId": f"project-{i}"} for i in range(20)]
+
+    with pytest.raises(RuntimeError, match="sync failed"):
+        _sync_multiple_projects(
+            MagicMock(),
+            MagicMock(),
+            projects,
+            TEST_UPDATE_TAG,
+            {"UPDATE_TAG": TEST_UPDATE_TAG},
+            project_workers=4,
+            neo4j_driver=MagicMock(),
+        )
+    # Nothing is cleaned up after a failed sync.
+    mock_cleanup_project.assert_not_called()
+
+
+@patch.object(cartography.intel.gcp, "_services_enabled_on_project")
+@patch.object(cartography.intel.gcp, "_get_serviceusage_resource")
+def test_get_enabled_services_of_projects(
+    mock_get_serviceusage, mock_services_enabled_on_project
+):
+    threads = set()
+    lock = threading.Lock()
+
+    def services_enabled_on_project(serviceusage, project_id):
+        with lock:
+            threads.add(threading.get_ident())
+        return {f"{project_id}.googleapis.com"}
+
+    mock_services_enabled_on_project.side_effect = services_enabled_on_project
+    project_ids = [f"project-{i}" for i in range(40)]
+
+    enabled_services = _get_enabled_services_of_projects(MagicMock(), project_ids)
+
+    assert enabled_services == {p: {f"{p}.googleapis.com"} for p in project_ids}
+    # One serviceusage resource object per thread that looked up projects.
+    assert mock_get_serviceusage.call_count == len(threads)
+
+
+def test_discovery_document_cache():
+    cache = DiscoveryDocumentCache()
+
+    # Documents shipped with googleapiclient are read once per cache.
+    compute = cache.get("compute", "v1")
+    assert json.loads(compute)["name"] == "compute"
+    assert cache.get("compute", "v1") is compute
+
+    # Documents that are not shipped are looked up once, and built from the discovery service instead.
+    with patch.object(
+        googleapiclient.discovery_cache,
+        "get_static_doc",
+        wraps=googleapiclient.discovery_cache.get_static_doc,
+    ) as mock_get_static_doc:
+        assert cache.get("myapi", "v1") is None
+        assert cache.get("myapi", "v1") is None
+    assert mock_get_static_doc.call_count == 1
+
+
+@patch.object(googleapiclient.discovery, "build")
+def test_build_resource_falls_back_to_discovery_service(mock_build):
+    credentials = MagicMock()
+
+    _build_resource("myapi", "v1", credentials)
+
+    mock_build.assert_called_once_with(
+        "myapi",
+        "v1",
+        credentials=credentials,
+        cache_discovery=False,
+    )
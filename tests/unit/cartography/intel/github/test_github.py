@@ -10,8 +10,12 @@ import pytest
 from requests import Response
 from requests.exceptions import HTTPError
 
+import cartography.intel.github.util
 from cartography.intel.github.util import _GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD
+from cartography.intel.github.util import configure_retries
 from cartography.intel.github.util import fetch_all
+from cartography.intel.github.util import get_session
+from cartography.intel.github.util import GraphqlRateLimit
 from cartography.intel.github.util import handle_rate_limit_sleep
 from tests.data.github.rate_limit import RATE_LIMIT_RESPONSE_JSON
 
@@ -52,9 +56,9 @@ def test_fetch_all_handles_retries(
 @typing.no_type_check
 @patch("cartography.intel.github.util.time.sleep")
 @patch("cartography.intel.github.util.datetime")
-@patch("cartography.intel.github.util.requests.get")
+@patch("cartography.intel.github.util.get_session")
 def test_handle_rate_limit_sleep(
-    mock_requests_get: Mock,
+    mock_get_session: Mock,
     mock_datetime: Mock,
     mock_sleep: Mock,
 ) -> None:
@@ -91,7 +95,7 @@ def test_handle_rate_limit_sleep(
     )
     resp_1["resources"]["graphql"]["reset"] = reset
 
-    mock_requests_get.side_effect = [
+    mock_get_session.return_value.get.side_effect = [
         Mock(json=Mock(return_value=resp_0)),
         Mock(json=Mock(return_value=resp_1)),
     ]
@@ -111,3 +115,75 @@ def test_handle_rate_limit_sleep(
     # Assert
     mock_datetime.now.assert_called_once_with(tz.utc)
     mock_sleep.assert_called_once_with(expected_sleep_seconds)
+
+
+@patch("cartography.intel.github.util.time.sleep")
+@patch("cartography.intel.github.util.handle_rate_limit_sleep")
+def test_graphql_rate_limit(
+    mock_handle_rate_limit_sleep: Mock,
+    mock_sleep: Mock,
+) -> None:
+    """
+    Ensures that GraphqlRateLimit checks the REST endpoint only once, and then sleeps based on the rateLimit objects of
+    GraphQL responses.
+    """
+    rate_limit = GraphqlRateLimit("my-token")
+    reset_at = datetime.now(tz.utc) + timedelta(minutes=10)
+
+    # The first wait checks the REST endpoint, as the budget is unknown.
+    rate_limit.wait()
+    rate_limit.update({"remaining": 4000, "resetAt": reset_at.isoformat()})
+    rate_limit.wait()
+    assert mock_handle_rate_limit_sleep.call_count == 1
+    mock_sleep.assert_not_called()
+
+    # Under the threshold, it sleeps until one minute after the reset.
+    rate_limit.update(
+        {
+            "remaining": _GRAPHQL_RATE_LIMIT_REMAINING_THRESHOLD - 1,
+            "resetAt": reset_at.isoformat().replace("+00:00", "Z"),
+        },
+    )
+    rate_limit.wait()
+    mock_sleep.assert_called_once()
+    assert 10 * 60 < mock_sleep.call_args[0][0] <= 11 * 60
+
+    # After the reset the budget is full again.
+    rate_limit.wait()
+    assert mock_sleep.call_count == 1
+    assert mock_handle_rate_limit_sleep.call_count == 1
+
+
+@patch.object(cartography.intel.github.util, "_session", None)
+def test_get_session_is_shared() -> None:
+    """
+    Ensures that all GitHub API calls share one pooled session, and that the session does not retry failed requests
+    on top of the retries of fetch_all() and fetch_graphql().
+    """
+    session = get_session()
+    assert get_session() is session
+    assert session.get_adapter("https://api.github.com/graphql").max_retries.total == 0
+
+
+@patch.object(cartography.intel.github.util, "_retries", 5)
+@patch("cartography.intel.github.util.time.sleep")
+@patch("cartography.intel.github.util.handle_rate_limit_sleep")
+@patch("cartography.intel.github.util.fetch_page")
+def test_fetch_all_uses_configured_retries(
+    mock_fetch_page: Mock,
+    mock_handle_rate_limit_sleep: Mock,
+    mock_sleep: Mock,
+) -> None:
+    """
+    Ensures that fetch_all() performs the number of retries set with configure_retries() when it is not given one.
+    """
+    # Arrange
+    response = Response()
+    response.status_code = 500
+    mock_fetch_page.side_effect = HTTPError("my-error", response=response)
+    configure_retries(2)
+    # Act
+    with pytest.raises(HTTPError):
+        fetch_all("my-token", "my-api_url", "my-org", "my-query", "my-resource")
+    # Assert
+    assert mock_fetch_page.call_count == 2
@@ -1,3 +1,7 @@
+import json
+from unittest.mock import patch
+
+from cartography.intel.github.repos import _get_repo_collaborators_for_multiple_repos
 from cartography.intel.github.repos import _transform_dependency_graph
 from cartography.intel.github.repos import _transform_dependency_manifests
 from tests.data.github.repos import DEPENDENCY_GRAPH_WITH_MULTIPLE_ECOSYSTEMS
@@ -100,3 +104,153 @@ def test_transform_dependency_converts_to_expected_format():
     assert react_dep["repo_url"] == repo_url
     assert react_dep["repo_name"] == "test-repo"
     assert react_dep["manifest_file"] == "package.json"
+
+
+def _collaborators_page(users, has_next_page):
+    return {
+        "edges": [{"permission": "WRITE"} for _ in users],
+        "nodes": [{"login": user} for user in users],
+        "pageInfo": {"endCursor": users[-1], "hasNextPage": has_next_page},
+    }
+
+
+@patch("cartography.intel.github.util.handle_rate_limit_sleep")
+@patch("cartography.intel.github.util.call_github_api")
+@patch("cartography.intel.github.repos.GITHUB_REPO_COLLABS_REPOS_PER_QUERY", 2)
+def test_get_repo_collaborators_batches_repos(
+    mock_call_github_api,
+    mock_handle_rate_limit_sleep,
+):
+    """
+    Test that the collaborators of several repos are fetched with one query, that repos with more collaborators are
+    paginated, and that every repo only gets its own collaborators.
+    """
+    # Arrange
+    collaborators = {
+        "repo-a": ["alice", "bob"],
+        "repo-b": ["carol"],
+        "repo-c": ["dave"],
+    }
+    repos = [
+        {
+            "name": name,
+            "url": f"https://github.com/my-org/{name}",
+            "directCollaborators": {"totalCount": len(users)},
+            "outsideCollaborators": {"totalCount": 0},
+        }
+        for name, users in collaborators.items()
+    ]
+    repos.append(
+        {
+            "name": "repo-empty",
+            "url": "https://github.com/my-org/repo-empty",
+            "directCollaborators": {"totalCount": 0},
+            "outsideCollaborators": {"totalCount": 0},
+        },
+    )
+
+    def call_github_api(query, variables, token, api_url):
+        variables = json.loads(variables)
+        org = {}
+        i = 0
+        while f"repo{i}" in variables:
+            users = collaborators[variables[f"repo{i}"]]
+            # One collaborator per page.
+            index = (
+                users.index(variables[f"cursor{i}"]) + 1
+                if variables[f"cursor{i}"]
+                else 0
+            )
+            org[f"repo{i}"] = {
+                "collaborators": _collaborators_page(
+                    [users[index]],
+                    index + 1 < len(users),
+                ),
+            }
+            i += 1
+        return {
+            "data": {
+                "organization": org,
+                "rateLimit": {"remaining": 4000, "resetAt": "2025-01-01T00:00:00Z"},
+            },
+        }
+
+    mock_call_github_api.side_effect = call_github_api
+
+    # Act
+    result = _get_repo_collaborators_for_multiple_repos(
+        repos,
+        "DIRECT",
+        "my-org",
+        "https://api.github.com/graphql",
+        "my-token",
+    )
+
+    # Assert
+    assert {
+        url: [(c.user["login"], c.permission, c.affiliation) for c in collabs]
+        for url, collabs in result.items()
+    } == {
+        "https://github.com/my-org/repo-a": [
+            ("alice", "WRITE", "DIRECT"),
+            ("bob", "WRITE", "DIRECT"),
+        ],
+        "https://github.com/my-org/repo-b": [("carol", "WRITE", "DIRECT")],
+        "https://github.com/my-org/repo-c": [("dave", "WRITE", "DIRECT")],
+        "https://github.com/my-org/repo-empty": [],
+    }
+    # repo-a and repo-b in one query plus a second page for repo-a, and repo-c in another query.
+    assert mock_call_github_api.call_count == 3
+    # The REST rate limit endpoint is only checked before the first query.
+    assert mock_handle_rate_limit_sleep.call_count == 1
+
+
+@patch("cartography.intel.github.util.handle_rate_limit_sleep")
+@patch("cartography.intel.github.util.call_github_api")
+def test_get_repo_collaborators_retries_failed_queries(
+    mock_call_github_api,
+    mock_handle_rate_limit_sleep,
+):
+    """
+    Test that a query that failed as a whole, with top-level errors and no data, is retried instead of being read as
+    repos without collaborators.
+    """
+    # Arrange
+    repos = [
+        {
+            "name": "repo-a",
+            "url": "https://github.com/my-org/repo-a",
+            "directCollaborators": {"totalCount": 1},
+            "outsideCollaborators": {"totalCount": 0},
+        },
+    ]
+    mock_call_github_api.side_effect = [
+        {"data": None, "errors": [{"message": "Something went wrong"}]},
+        {
+            "data": {
+                "organization": {
+                    "repo0": {
+                        "collaborators": _collaborators_page(["alice"], False),
+                    },
+                },
+                "rateLimit": {"remaining": 4000, "resetAt": "2025-01-01T00:00:00Z"},
+            },
+        },
+    ]
+
+    # Act
+    with patch("time.sleep"):
+        result = _get_repo_collaborators_for_multiple_repos(
+            repos,
+            "DIRECT",
+            "my-org",
+            "https://api.github.com/graphql",
+            "my-token",
+        )
+
+    # Assert
+    assert {
+        url: [(c.user["login"], c.permission, c.affiliation) for c in collabs]
+        for url, collabs in result.items()
+    } == {"https://github.com/my-org/repo-a": [("alice", "WRITE", "DIRECT")]}
+    assert mock_call_github_api.call_count == 2
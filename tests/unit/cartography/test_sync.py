@@ -1,11 +1,33 @@
+import importlib
+import inspect
+import pkgutil
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict
+from typing import Set
+from unittest.mock import MagicMock
+
 import pytest
 
+import cartography.intel
+import cartography.models
+from cartography.client.core.writer import BackgroundWriteSession
+from cartography.config import Config
+from cartography.models.core.nodes import CartographyNodeSchema
+from cartography.models.core.relationships import CartographyRelSchema
 from cartography.sync import build_default_sync
 from cartography.sync import build_sync
 from cartography.sync import parse_and_validate_selected_modules
+from cartography.sync import STAGE_DEPENDENCIES
 from cartography.sync import Sync
 from cartography.sync import TOP_LEVEL_MODULES
 
+# A node label in a MERGE or MATCH clause of a Cypher query, e.g. `(h:Human`
+_CYPHER_NODE_LABEL = re.compile(r"\(\s*\w*\s*:\s*([A-Za-z]\w*)")
+_CYPHER_CLAUSE = re.compile(r"\b(MERGE|MATCH)\b(.*)")
+
 
 def test_available_modules_import():
     # Check if all available modules are defined in the TOP_LEVEL_MODULES list
@@ -52,3 +74,180 @@ def test_parse_and_validate_selected_modules():
     absolute_garbage = "#@$@#RDFFHKjsdfkjsd,KDFJHW#@,"
     with pytest.raises(ValueError):
         parse_and_validate_selected_modules(absolute_garbage)
+
+
+def _add_schema_labels(
+    stage: str,
+    created: Dict[str, Set[str]],
+    matched: Dict[str, Set[str]],
+) -> None:
+    """
+    Adds the labels of the nodes that the schemas in cartography.models.<stage> create, and the labels of the other
+    nodes that they match.
+    """
+    package = importlib.import_module(f"cartography.models.{stage}")
+    for module_info in pkgutil.walk_packages(package.__path__, f"{package.__name__}."):
+        module = importlib.import_module(module_info.name)
+        for cls in vars(module).values():
+            if (
+                not inspect.isclass(cls)
+                or cls.__module__ != module.__name__
+                or inspect.isabstract(cls)
+            ):
+                continue
+            if issubclass(cls, CartographyNodeSchema):
+                node_schema = cls()
+                created[stage].add(node_schema.label)
+                if node_schema.extra_node_labels:
+                    created[stage].update(node_schema.extra_node_labels.labels)
+                rels = list(
+                    (
+                        node_schema.other_relationships.rels
+                        if node_schema.other_relationships
+                        else []
+                    ),
+                )
+                if node_schema.sub_resource_relationship:
+                    rels.append(node_schema.sub_resource_relationship)
+                matched[stage].update(rel.target_node_label for rel in rels)
+            elif issubclass(cls, CartographyRelSchema):
+                rel_schema = cls()
+                # MatchLinks match both of their ends.
+                if rel_schema.source_node_label:
+                    matched[stage].add(rel_schema.source_node_label)
+                    matched[stage].add(rel_schema.target_node_label)
+
+
+def _add_cypher_labels(
+    stage: str,
+    created: Dict[str, Set[str]],
+    matched: Dict[str, Set[str]],
+) -> None:
+    """
+    Adds the node labels of the MERGE and MATCH clauses of the Cypher queries written by hand in
+    cartography.intel.<stage>.
+    """
+    for path in (Path(cartography.intel.__path__[0]) / stage).rglob("*.py"):
+        for clause, pattern in _CYPHER_CLAUSE.findall(path.read_text()):
+            labels = _CYPHER_NODE_LABEL.findall(pattern)
+            (created if clause == "MERGE" else matched)[stage].update(labels)
+
+
+def test_stage_dependencies_cover_matched_labels():
+    """
+    Ensures that a stage depends on every stage that creates nodes of a label that it matches but does not create
+    itself. Otherwise, with stage workers, it could run first and silently skip the relationships to those nodes.
+    """
+    created: Dict[str, Set[str]] = defaultdict(set)
+    matched: Dict[str, Set[str]] = defaultdict(set)
+    intel_path = Path(cartography.intel.__path__[0])
+    models_path = Path(cartography.models.__path__[0])
+    for stage in TOP_LEVEL_MODULES:
+        if (models_path / stage).is_dir():
+            _add_schema_labels(stage, created, matched)
+        if (intel_path / stage).is_dir():
+            _add_cypher_labels(stage, created, matched)
+
+    missing = {}
+    for stage in TOP_LEVEL_MODULES:
+        for label in matched[stage] - created[stage]:
+            for upstream_stage in created:
+                if label in created[
+                    upstream_stage
+                ] and upstream_stage not in STAGE_DEPENDENCIES.get(stage, []):
+                    missing.setdefault(stage, set()).add((upstream_stage, label))
+    assert missing == {}
+
+
+def test_build_sync_default_dependencies():
+    sync = build_sync("create-indexes, okta, aws, analysis")
+
+    assert sync.get_upstream_stages("create-indexes") == set()
+    assert sync.get_upstream_stages("aws") == {"create-indexes"}
+    assert sync.get_upstream_stages("okta") == {"create-indexes", "aws"}
+    assert sync.get_upstream_stages("analysis") == {"create-indexes", "okta", "aws"}
+
+
+def test_build_sync_ignores_unselected_dependencies():
+    sync = build_sync("okta, github")
+
+    assert sync.get_upstream_stages("okta") == set()
+    assert sync.get_upstream_stages("github") == set()
+
+
+def test_run_concurrent_stages_respects_dependencies():
+    # Arrange
+    events = []
+    lock = threading.Lock()
+    both_started = threading.Barrier(2, timeout=5)
+
+    def stage(name, wait_for_peer=False):
+        def _stage(neo4j_session, config):
+            with lock:
+                events.append(f"start {name}")
+            if wait_for_peer:
+                # Fails with BrokenBarrierError unless the two stages run at the same time
+                both_started.wait()
+            with lock:
+                events.append(f"end {name}")
+
+        return _stage
+
+    sync = Sync()
+    sync.add_stage("first", stage("first"))
+    sync.add_stage("a", stage("a", wait_for_peer=True), depends_on=["first"])
+    sync.add_stage("b", stage("b", wait_for_peer=True), depends_on=["first"])
+    sync.add_stage("last", stage("last"), depends_on=["a", "b"])
+    config = Config(neo4j_uri="bolt://localhost:7687", update_tag=1, stage_workers=2)
+    neo4j_driver = MagicMock()
+
+    # Act
+    sync.run(neo4j_driver, config)
+
+    # Assert
+    assert events[:2] == ["start first", "end first"]
+    assert events[-2:] == ["start last", "end last"]
+    assert sorted(events[2:6]) == ["end a", "end b", "start a", "start b"]
+    # One session per stage
+    assert neo4j_driver.session.call_count == 4
+
+
+def test_run_concurrent_stages_stops_after_failure():
+    ran = []
+
+    def failing_stage(neo4j_session, config):
+        raise RuntimeError("boom")
+
+    sync = Sync()
+    sync.add_stage("bad", failing_stage)
+    sync.add_stage("after", lambda s, c: ran.append("after"), depends_on=["bad"])
+    config = Config(neo4j_uri="bolt://localhost:7687", update_tag=1, stage_workers=2)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        sync.run(MagicMock(), config)
+    assert ran == []
+
+
+def test_run_concurrent_stages_detects_cycle():
+    sync = Sync()
+    sync.add_stage("a", lambda s, c: None, depends_on=["b"])
+    sync.add_stage("b", lambda s, c: None, depends_on=["a"])
+    config = Config(neo4j_uri="bolt://localhost:7687", update_tag=1, stage_workers=2)
+
+    with pytest.raises(ValueError, match="cycle"):
+        sync.run(MagicMock(), config)
+
+
+def test_run_stage_with_background_writes():
+    sessions = []
+    sync = Sync()
+    sync.add_stage("a", lambda neo4j_session, config: sessions.append(neo4j_session))
+    config = Config(
+        neo4j_uri="bolt://localhost:7687",
+        update_tag=1,
+        neo4j_background_writes=True,
+    )
+
+    sync.run(MagicMock(), config)
+
+    assert isinstance(sessions[0], BackgroundWriteSession)
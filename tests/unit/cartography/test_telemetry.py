@@ -0,0 +1,109 @@
+import json
+
+from cartography.telemetry import TelemetryRecorder
+from cartography.util import timeit
+
+
+def test_telemetry_json_report(tmp_path):
+    recorder = TelemetryRecorder()
+    recorder.incr("rows_loaded", 10, schema="EC2Instance")
+    recorder.incr("rows_loaded", 5, schema="EC2Instance")
+    recorder.record_duration("stage", 2.0, stage="aws")
+    recorder.record_duration("stage", 1.0, stage="aws")
+    recorder.observe("neo4j_write_transaction_seconds", 0.3)
+
+    path = tmp_path / "report.json"
+    recorder.write_report(str(path))
+    report = json.loads(path.read_text())
+
+    assert report["counters"] == [
+        {"name": "rows_loaded", "labels": {"schema": "EC2Instance"}, "value": 15},
+    ]
+    assert report["durations"] == [
+        {
+            "name": "stage",
+            "labels": {"stage": "aws"},
+            "count": 2,
+            "total_seconds": 3.0,
+            "max_seconds": 2.0,
+        },
+    ]
+    histogram = report["histograms"][0]
+    assert histogram["count"] == 1
+    assert histogram["buckets"]["0.25"] == 0
+    assert histogram["buckets"]["0.5"] == 1
+    assert histogram["buckets"]["60.0"] == 1
+
+
+def test_telemetry_prometheus_report(tmp_path):
+    recorder = TelemetryRecorder()
+    recorder.incr("api_calls", api="ec2", operation="DescribeInstances")
+    recorder.record_duration("stage", 2.0, stage="aws")
+    recorder.observe("neo4j_write_transaction_seconds", 0.3)
+
+    path = tmp_path / "report.prom"
+    recorder.write_report(str(path))
+    lines = path.read_text().splitlines()
+
+    assert "# TYPE cartography_api_calls_total counter" in lines
+    assert (
+        'cartography_api_calls_total{api="ec2",operation="DescribeInstances"} 1'
+        in lines
+    )
+    assert 'cartography_stage_duration_seconds_sum{stage="aws"} 2.0' in lines
+    assert 'cartography_stage_duration_seconds_count{stage="aws"} 1' in lines
+    assert 'cartography_neo4j_write_transaction_seconds_bucket{le="0.5"} 1' in lines
+    assert 'cartography_neo4j_write_transaction_seconds_bucket{le="+Inf"} 1' in lines
+
+
+def test_timeit_records_region(mocker):
+    recorder = TelemetryRecorder()
+    mocker.patch("cartography.util.get_telemetry_recorder", return_value=recorder)
+
+    @timeit
+    def sync_things(neo4j_session, region, current_aws_account_id, update_tag):
+        pass
+
+    sync_things(None, "us-east-1", current_aws_account_id="1234", update_tag=1)
+
+    (duration,) = recorder.as_dict()["durations"]
+    assert duration["name"] == "function"
+    assert duration["labels"] == {
+        "function": "sync_things",
+        "module": __name__,
+        "region": "us-east-1",
+    }
+
+
+def test_timeit_records_region_and_account_with_account_labels(mocker):
+    recorder = TelemetryRecorder(account_labels=True)
+    mocker.patch("cartography.util.get_telemetry_recorder", return_value=recorder)
+
+    @timeit
+    def sync_things(neo4j_session, region, current_aws_account_id, update_tag):
+        pass
+
+    sync_things(None, "us-east-1", current_aws_account_id="1234", update_tag=1)
+
+    (duration,) = recorder.as_dict()["durations"]
+    assert duration["labels"] == {
+        "account": "1234",
+        "function": "sync_things",
+        "module": __name__,
+        "region": "us-east-1",
+    }
+
+
+def test_disabled_recorder_records_nothing(mocker):
+    recorder = TelemetryRecorder(enabled=False)
+    mocker.patch("cartography.util.get_telemetry_recorder", return_value=recorder)
+
+    @timeit
+    def sync_things(neo4j_session, region):
+        return "done"
+
+    assert sync_things(None, "us-east-1") == "done"
+    recorder.incr("rows_loaded", 10, schema="EC2Instance")
+    recorder.observe("neo4j_write_transaction_seconds", 0.1)
+
+    assert recorder.as_dict() == {"counters": [], "durations": [], "histograms": []}
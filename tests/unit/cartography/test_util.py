@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 from unittest.mock import Mock
 from unittest.mock import patch
@@ -10,6 +11,8 @@ from cartography import util
 from cartography.util import aws_handle_regions
 from cartography.util import batch
 from cartography.util import run_analysis_and_ensure_deps
+from cartography.util import to_asynchronous
+from cartography.util import to_synchronous
 
 
 def test_run_analysis_job_default_package(mocker):
@@ -209,3 +212,14 @@ def test_run_analysis_and_ensure_deps_no_requirements(
         neo4j_session,
         common_job_parameters,
     )
+
+
+def test_to_synchronous_in_worker_thread():
+    # Sync stages and AWS accounts may run on worker threads, which have no event loop by default.
+    async def add(a, b):
+        return await to_asynchronous(lambda x, y: x + y, a, b)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result = executor.submit(lambda: to_synchronous(add(1, 2), add(3, 4))).result()
+
+    assert result == [3, 7]